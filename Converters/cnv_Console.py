@@ -7,6 +7,9 @@ from typing import TYPE_CHECKING
 from PyFlow.Packages.PythonExporter.Exporters.converter_base import (  # pylint: disable=import-error, no-name-in-module # type: ignore
     ConverterBase
 )
+from PyFlow.Packages.PythonExporter.Exporters.annotations import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    signature
+)
 if TYPE_CHECKING:
     from ..Exporters.converter_base import ConverterBase
 
@@ -32,7 +35,8 @@ class PyCnvConsoleFunctions(ConverterBase):
         if not exporter.is_node_function_processed(node):
             exporter.add_import("platform")
             exporter.add_import("os")
-            exporter.add_sys_function("""def clearConsole():  # pylint: disable=invalid-name
+            header = signature(exporter, 'def', 'clearConsole', [], 'None')
+            exporter.add_sys_function(f"""{header}  # pylint: disable=invalid-name
     \"\"\"Clears the console screen in a platform independent way\"\"\"
     system = platform.system()
     if system != "":
@@ -52,6 +56,8 @@ class PyCnvConsoleFunctions(ConverterBase):
     @staticmethod
     def consoleOutput(exporter, node, inpnames: str, *args, **kwargs):  # pylint: disable=unused-argument,invalid-name
         """Convert the consoleOutput node type"""
+        # not on a thread in async mode: `print` writes the text and the
+        # line end separately, the lines of concurrent threads would mix
         exporter.add_call(f"print({', '.join(inpnames)})")
         exporter.set_node_processed(node)
         exporter.call_named_pin(node, 'outExec')
@@ -1,10 +1,10 @@
 """Standard converters for PyFlowBase package
 FlowControl nodes"""  # pylint: disable=invalid-name
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable, Optional
 
-from PyFlow.Core import NodeBase
-from PyFlow.Core.PyCodeCompiler import Py3CodeCompiler
+from PyFlow.Core import NodeBase, PinBase
+from PyFlow.Core.Common import PinSelectionGroup
 
 # import the converter base from the PythonExporter package
 from PyFlow.Packages.PythonExporter.Exporters.converter_base import (  # pylint: disable=import-error, no-name-in-module # type: ignore
@@ -13,6 +13,24 @@ from PyFlow.Packages.PythonExporter.Exporters.converter_base import (  # pylint:
 from PyFlow.Packages.PythonExporter.Exporters.implementation import (  # pylint: disable=import-error, no-name-in-module # type: ignore
     PythonExporterImpl
 )
+from PyFlow.Packages.PythonExporter.Exporters.annotations import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    pin_annotation, signature
+)
+from PyFlow.Packages.PythonExporter.Exporters.code_cache import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    PYTHON_NODE_CODE, code_digest
+)
+from PyFlow.Packages.PythonExporter.Exporters.async_mode import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    def_keyword
+)
+from PyFlow.Packages.PythonExporter.Exporters.compounds import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    call_compound, exit_value, export_compound_function
+)
+from PyFlow.Packages.PythonExporter.Exporters.numeric import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    vectorise_loop
+)
+from PyFlow.Packages.PythonExporter.Exporters.dependencies import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    analyse_parallel_branches, exec_chain, split_loop_dependencies
+)
 if TYPE_CHECKING:
     from ..Exporters.converter_base import ConverterBase
     from ..Exporters.implementation import PythonExporterImpl
@@ -27,54 +45,8 @@ class PyCnvFlowControls(ConverterBase):
                  inpnames: list[str],  # pylint: disable=unused-argument
                  *args, **kwargs):  # pylint: disable=unused-argument
         """Converts the Compound node"""
-        # export function definition
-        if not exporter.is_node_function_processed(node):
-            # run in subexporter
-            subexporter = PythonExporterImpl(
-                node.rawGraph, # type: ignore
-                exporter.converter_classes,
-                1,
-                exporter.exported_node_functions
-            )
-            execinpins = [pin for pin in node.orderedInputs.values() if pin.isExec()]
-            if len(execinpins)>0:
-                # TODO: why the first pin? actually this is the only place where input
-                # exec pins can lead to different outcomes: on normal nodes it just
-                # executes the node's compute, but here different paths can be connected
-                # to different exec pins. so we need an argument which tells which exec
-                # pin should be executed. that could be passed conditionally as a kwarg.
-                # how does this work in the main execution engine?
-                firstexecpin = list(execinpins[0].affects)[0]
-                subexporter.export_from_pin(firstexecpin)
-            else:
-                # TODO: here again the first graphOutput is processed. but from the input pin
-                # we could actually follow to the real graphOutput needed
-                # TODO: process_node could yield back from graphOutput nodes when they are
-                # reached with exec and then we can yield it further through our exec pins.
-                # or just give a callback to process_node which will call exporter.call_named_pin.
-                # TODO: consider a "parent exporter" concept and make this handled in the exporter?
-                subexporter.process_node(
-                    node.rawGraph.getNodesList( # type: ignore
-                        classNameFilters=["graphOutputs"]
-                    )[0]
-                )
-            # collect the results
-            exporter.collect_subexporter_results(subexporter, node)
-            # don't flag the type as exported: because each compound node has to be exported
-            # separately (inner graph is different)
-        # export call
-        exporter.add_call(f"{exporter.get_out_list(node, post=' = ')}" +
-                          f"{node.name}({', '.join(inpnames)})")
-        exporter.set_node_processed(node)
-        # call first connected execute pin
-        connexecoutpins = [pin
-                           for pin in node.orderedOutputs.values()
-                           if pin.isExec() and pin.hasConnections()]
-        if len(connexecoutpins)>0:
-            exporter.call_named_pin(node, connexecoutpins[0].getName())
-                # TODO: this calls the first connected pin, however there
-                # could be multiple, which should be called from inside the
-                # node
+        export_compound_function(exporter, node)
+        call_compound(exporter, node, node, exporter.node_function_name(node), inpnames)
 
 
     @staticmethod
@@ -83,6 +55,9 @@ class PyCnvFlowControls(ConverterBase):
                           inpnames: list[str],  # pylint: disable=unused-argument
                           *args, **kwargs):  # pylint: disable=unused-argument
         """Converts the GraphOutputs node"""
+        # with several output exec pins the one leaving the compound too
+        if (exit_name := exit_value(exporter, node)) is not None:
+            inpnames = inpnames + [exit_name]
         if len(inpnames)==0:
             return ''
         return f"return {', '.join(inpnames)}"
@@ -96,11 +71,12 @@ class PyCnvFlowControls(ConverterBase):
         """Converts the Sequence node"""
         # flag that this is processed
         exporter.set_node_processed(node)
-        # call execute pins
-        outs = sorted(list(node.outputs.values()), key=lambda pin: int(pin.name))
+        # call execute pins (in the order of their numbers)
+        outs = sorted(exporter.graph_index.exec_outputs(node), key=lambda pin: int(pin.name))
+        if exporter.options.parallel_sequences and _convert_parallel_branches(exporter, node, outs):
+            return
         for pin in outs:
-            if pin.isExec():
-                exporter.call_named_pin(node, pin.name)
+            exporter.call_named_pin(node, pin.name)
 
 
     @staticmethod
@@ -109,8 +85,9 @@ class PyCnvFlowControls(ConverterBase):
                inpnames: list[str],  # pylint: disable=unused-argument
                *args, **kwargs):  # pylint: disable=unused-argument
         """Converts the Branch node"""
-        hasTrue = node.getPinByName('True').hasConnections()  # type: ignore
-        hasFalse = node.getPinByName('False').hasConnections()  # type: ignore
+        index = exporter.graph_index
+        hasTrue = index.is_connected(index.output_pin(node, 'True'))  # type: ignore
+        hasFalse = index.is_connected(index.output_pin(node, 'False'))  # type: ignore
         if not hasTrue and not hasFalse:
             return
         # flag that we are processed
@@ -133,22 +110,97 @@ class PyCnvFlowControls(ConverterBase):
         exporter.call_named_pin(node, 'After')
 
 
+    @staticmethod
+    def forLoop(exporter: PythonExporterImpl,
+                node: NodeBase,
+                inpnames: list[str],  # pylint: disable=unused-argument
+                *args, **kwargs):  # pylint: disable=unused-argument
+        """Converts the forLoop node into a native for loop"""
+        range_expr = _range_expr(exporter, node)
+        exporter.set_node_processed(node)
+        if range_expr is not None:
+            _convert_loop(exporter, node,
+                          f"for {node.getPinByName('Index').getFullName()} in {range_expr}:")  # type: ignore
+        exporter.call_named_pin(node, 'Completed')
+
+
+    @staticmethod
+    def forLoopWithBreak(exporter: PythonExporterImpl,
+                         node: NodeBase,
+                         inpnames: list[str],  # pylint: disable=unused-argument
+                         *args, **kwargs):  # pylint: disable=unused-argument
+        """Converts the forLoopWithBreak node into a native for loop, the
+        Break pin stops it before the next iteration (see
+        `execin_forLoopWithBreak_Break`)"""
+        range_expr = _range_expr(exporter, node)
+        exporter.set_node_processed(node)
+        if range_expr is not None:
+            break_flag = node.getPinByName('Break').getFullName()  # type: ignore
+            exporter.add_call(f"{break_flag} = False")
+            _convert_loop(exporter, node,
+                          f"for {node.getPinByName('Index').getFullName()} in {range_expr}:",  # type: ignore
+                          f"if {break_flag}:\n    break")
+        exporter.call_named_pin(node, 'Completed')
+
+
+    @staticmethod
+    def execin_forLoopWithBreak_Break(exporter: PythonExporterImpl,
+                                      node: NodeBase,  # pylint: disable=unused-argument
+                                      pin: PinBase):
+        """Converts the exec flow into the Break pin of forLoopWithBreak"""
+        exporter.add_call(f"{pin.getFullName()} = True")
+
+
+    @staticmethod
+    def forEachLoop(exporter: PythonExporterImpl,
+                    node: NodeBase,
+                    inpnames: list[str],  # pylint: disable=unused-argument
+                    *args, **kwargs):  # pylint: disable=unused-argument
+        """Converts the forEachLoop node into a native for loop (its
+        elementwise math is vectorised in the `numpy_arrays` mode)"""
+        array = _pin_expr(exporter, node, 'array', '[]')
+        exporter.set_node_processed(node)
+        iteration, vectorised = vectorise_loop(exporter, node, array)
+        _convert_loop(exporter, node, f"for {iteration}:", assigned=vectorised)
+        exporter.call_named_pin(node, 'Completed')
+
+
+    @staticmethod
+    def whileLoop(exporter: PythonExporterImpl,
+                  node: NodeBase,
+                  inpnames: list[str],  # pylint: disable=unused-argument
+                  *args, **kwargs):  # pylint: disable=unused-argument
+        """Converts the whileLoop node into a native while loop (the nodes
+        of the condition are recomputed at the end of each iteration)"""
+        condition = _pin_expr(exporter, node, 'Condition', 'False')
+        exporter.set_node_processed(node)
+        _convert_loop(exporter, node, f"while {condition}:", recompute_inputs=True)
+        exporter.call_named_pin(node, 'Completed')
+
+
     @staticmethod
     def pythonNode(exporter: PythonExporterImpl,
                node: NodeBase,
                inpnames: list[str],  # pylint: disable=unused-argument
                *args, **kwargs):  # pylint: disable=unused-argument
         """Converts the PythonNode node"""
-        # export function definition
-        mem = Py3CodeCompiler().compile(node.nodeData, node.getName(), {})  # type: ignore
-        inputs = ', '.join([pin.name
-                            for pin in node.orderedInputs.values()
-                            if not pin.isExec()])
-        exporter.add_function(f"def {node.name}({inputs}):\n{
-            mem['func_python'](exporter,
-                               node, *args, **kwargs)}\n")
+        # export function definition (the compiled code is cached by its hash,
+        # the nodes with the same generated function share one)
+        mem = PYTHON_NODE_CODE.namespace(node.nodeData)  # type: ignore
+        params = [(pin.name, pin_annotation(pin))
+                  for pin in node.orderedInputs.values()
+                  if not pin.isExec()]
+        body = mem['func_python'](exporter, node, *args, **kwargs)
+        function_key = f"pythonNode_{code_digest(repr((params, body)))}"
+        function_name = exporter.exported_function_name(function_key)
+        if function_name is None:
+            # the body is user code: it may return anything
+            header = signature(exporter, 'def', node.name, params, 'Any')
+            exporter.add_function(f"{header}\n{body}\n")
+            exporter.set_function_exported(function_key, node)
+            function_name = node.name
         # export call
-        exporter.add_call(f"{exporter.get_out_list(node, post=' = ')}{node.name}({
+        exporter.add_call(f"{exporter.get_out_list(node, post=' = ')}{function_name}({
             ', '.join(inpnames)})\n")
         exporter.set_node_processed(node)
         # call execute pins
@@ -168,3 +220,108 @@ class PyCnvFlowControls(ConverterBase):
         """Converts the reroute exec nodes"""
         exporter.set_node_processed(node)
         exporter.call_named_pin(node, 'out')
+
+
+def _pin_expr(exporter: PythonExporterImpl, node: NodeBase, pin_name: str, default: str) -> str:
+    """Gets the expression of an (already processed) input pin"""
+    pin = node.getPinSG(pin_name, PinSelectionGroup.Inputs)
+    if pin is None:
+        return default
+    _, names = exporter.process_pin(pin)
+    return names[0] if len(names)>0 else default
+
+
+def _range_expr(exporter: PythonExporterImpl, node: NodeBase) -> Optional[str]:
+    """Gets the range expression of the for loop nodes (None if the loop
+    never runs because of a zero step)"""
+    start = _pin_expr(exporter, node, 'Start', '0')
+    stop = _pin_expr(exporter, node, 'Stop', '0')
+    step = _pin_expr(exporter, node, 'Step', '1')
+    if step == '1':
+        return f"range({start}, {stop})"
+    if step.lstrip('-').isdigit():
+        return None if int(step)==0 else f"range({start}, {stop}, {step})"
+    # PyFlow skips the loop on a zero step, range() would raise
+    return f"(range({start}, {stop}, {step}) if {step} != 0 else ())"
+
+
+def _convert_loop(exporter: PythonExporterImpl,
+                  node: NodeBase,
+                  header: str,
+                  first_statement: str = '',
+                  recompute_inputs: bool = False,
+                  assigned: Iterable[NodeBase] = ()):
+    """Converts a loop: the loop-invariant pure inputs of the body are
+    hoisted above the header, the LoopBody exec chain is the body of the
+    loop and the already processed loop-variant pure nodes are recomputed
+    at its end.
+
+    Args:
+        header: the header statement of the loop
+        first_statement: a statement to start each iteration with
+        recompute_inputs: recompute the variant inputs of the loop node
+                          too (e.g. the condition of a while loop)
+        assigned: the pure nodes whose outputs the header assigns
+    """
+    body_pin = node.getPinSG('LoopBody', PinSelectionGroup.Outputs)
+    body = exec_chain([body_pin] if body_pin is not None else [], stop_nodes=[node])
+    roots = list(body.values()) + ([node] if recompute_inputs else [])
+    hoisted, recomputed = split_loop_dependencies(node, body, roots, exporter.is_node_processed)
+    assigned_paths = {pure_node.path() for pure_node in assigned}
+    recomputed = [pure_node for pure_node in recomputed if pure_node.path() not in assigned_paths]
+    for pure_node in hoisted:
+        exporter.process_node(pure_node)
+
+    exporter.add_call(header)
+    exporter.increase_indent()
+    call_count = exporter.call_count
+    exporter.add_call(first_statement)
+    exporter.call_named_pin(node, 'LoopBody')
+    for pure_node in recomputed:
+        exporter.unset_node_processed(pure_node)
+    for pure_node in recomputed:
+        exporter.process_node(pure_node)
+    if exporter.call_count == call_count:
+        exporter.add_call("pass")
+    exporter.decrease_indent()
+
+
+def _convert_parallel_branches(exporter: PythonExporterImpl,
+                               node: NodeBase,
+                               pins: list[PinBase]) -> bool:
+    """Converts the branches started by the exec pins into functions run
+    on a thread pool and joined before the flow goes on (in async mode
+    they are coroutines awaited together).
+
+    Returns:
+        bool: False if the branches can't run in parallel (the reasons are
+              reported as diagnostics) and nothing was converted
+    """
+    pins = [pin for pin in pins if exporter.graph_index.is_connected(pin)]
+    if len(pins)<2:
+        return False
+    analysis = analyse_parallel_branches(pins, exporter.is_node_processed)
+    if analysis.conflicts:
+        for conflict in analysis.conflicts:
+            exporter.add_diagnostic(f"branches not parallelised: {conflict}")
+        return False
+    for pure_node in analysis.hoisted:
+        exporter.process_node(pure_node)
+    for pin in pins:
+        # the outputs of the branch are read after the join
+        with exporter.local_function(signature(exporter, def_keyword(exporter, node),
+                                               pin.getFullName(), [], 'None')):
+            exporter.call_named_pin(node, pin.name)
+    if exporter.options.async_mode:
+        exporter.add_import('asyncio')
+        exporter.add_call(f"await asyncio.gather({', '.join(f'{pin.getFullName()}()' for pin in pins)})")
+        return True
+    exporter.add_import('concurrent.futures')
+    executor = f"{node.name}_executor"
+    submits = f",\n{' '*(len(node.name)+20)}".join(f"{executor}.submit({pin.getFullName()})"
+                                                    for pin in pins)
+    exporter.add_call(f"with concurrent.futures.ThreadPoolExecutor(max_workers={len(pins)}) "
+                      f"as {executor}:\n"
+                      f"    for {node.name}_future in [{submits}]:\n"
+                      f"        {node.name}_future.result()")
+    return True
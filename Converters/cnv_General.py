@@ -27,6 +27,8 @@ class PyCnvGeneral(ConverterBase):
                  *args, **kwargs):  # pylint: disable=unused-argument
         """Converts the MakeArray node"""
         linebeg = f"{exporter.get_out_list(node, post=' = ')}"
-        linestart = ' '*len(linebeg)
-        tolist_str = f"{(', \n'+linestart).join(inpnames[:-2])}], True\n"
-        return linebeg+tolist_str
+        linestart = ' '*(len(linebeg)+1)
+        # the constant of the unconnected data pin is not an item
+        items = inpnames[:-2] if node.getPinByName('data').hasConnections() else []  # type: ignore
+        tolist_str = f"[{(', \n'+linestart).join(items)}]"
+        return linebeg+tolist_str+", True\n"
@@ -12,6 +12,12 @@ from PyFlow.Packages.PythonExporter.Exporters.converter_base import (  # pylint:
 from PyFlow.Packages.PythonExporter.Exporters.implementation import (  # pylint: disable=import-error, no-name-in-module # type: ignore
     PythonExporterImpl
 )
+from PyFlow.Packages.PythonExporter.Exporters.async_mode import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    awaited_in_thread
+)
+from PyFlow.Packages.PythonExporter.Exporters.annotations import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    signature
+)
 if TYPE_CHECKING:
     from ..Exporters.converter_base import ConverterBase
     from ..Exporters.implementation import PythonExporterImpl
@@ -25,20 +31,23 @@ class PyCnvIOLib(ConverterBase):
                  node: NodeBase,
                  inpnames: list[str],  # pylint: disable=unused-argument
                  *args, **kwargs):  # pylint: disable=unused-argument
-        """Converts the ReadAllText node"""
+        """Converts the ReadAllText node (one read of the whole file, see the
+        StreamIOLib nodes for large files; awaited in async mode)"""
         # export function definition
         if not exporter.is_node_function_processed(node):
-            exporter.add_sys_function("""def readAllText(file, encoding):
-    with open(file, encoding=encoding) as f:
-        try:
-            return '\\n'.join(f.readlines()), None
-        except Exception as e:
-            return None, e.message
+            header = signature(exporter, 'def', 'readAllText',
+                               [('file', 'str'), ('encoding', 'str')], 'tuple[Any, Any]')
+            exporter.add_sys_function(f"""{header}
+    try:
+        with open(file, encoding=encoding) as f:
+            return f.read(), None
+    except (OSError, LookupError, ValueError) as e:
+        return None, str(e)
 """)
             exporter.set_node_function_processed(node)
         # export call
         exporter.add_call(f"{exporter.get_out_list(node, post=' = ')}" + \
-                          f"readAllText({', '.join(inpnames)})\n")
+                          f"{awaited_in_thread(exporter, 'readAllText', inpnames)}\n")
         exporter.set_node_processed(node)
         # call execute pin
         exporter.call_named_pin(node, 'outExec')
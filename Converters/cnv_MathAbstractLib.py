@@ -12,6 +12,9 @@ from PyFlow.Packages.PythonExporter.Exporters.converter_base import (  # pylint:
 from PyFlow.Packages.PythonExporter.Exporters.implementation import (  # pylint: disable=import-error, no-name-in-module # type: ignore
     PythonExporterImpl
 )
+from PyFlow.Packages.PythonExporter.Exporters.pin_types import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    input_types, is_typed
+)
 if TYPE_CHECKING:
     from ..Exporters.converter_base import ConverterBase
     from ..Exporters.implementation import PythonExporterImpl
@@ -51,6 +54,8 @@ class PyCnvMathAbstractLib(ConverterBase):
                    node: NodeBase,
                    inpnames: list[str],  # pylint: disable=unused-argument
                    *args, **kwargs):  # pylint: disable=unused-argument
-        """Converts the NotEqual node"""
+        """Converts the Power node (integer arithmetic on integers)"""
+        if is_typed(input_types(exporter, node), {'IntPin'}):
+            return f"{exporter.get_out_list(node, post=' = ')}({inpnames[0]} ** {inpnames[1]}), True"
         exporter.add_import('math')
         return f"{exporter.get_out_list(node, post=' = ')}math.pow({inpnames[0]}, {inpnames[1]}), True"
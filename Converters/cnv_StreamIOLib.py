@@ -0,0 +1,103 @@
+"""Converters for the PythonExporter package
+StreamIOLib Function Library"""  # pylint: disable=invalid-name
+
+from typing import TYPE_CHECKING
+
+from PyFlow.Core import NodeBase
+
+# import the converter base from the PythonExporter package
+from PyFlow.Packages.PythonExporter.Exporters.converter_base import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    ConverterBase
+)
+from PyFlow.Packages.PythonExporter.Exporters.implementation import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    PythonExporterImpl
+)
+from PyFlow.Packages.PythonExporter.Exporters.annotations import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    signature
+)
+if TYPE_CHECKING:
+    from ..Exporters.converter_base import ConverterBase
+    from ..Exporters.implementation import PythonExporterImpl
+
+
+def _convert_stream(exporter: PythonExporterImpl,
+                    node: NodeBase,
+                    inpnames: list[str],
+                    params: list[tuple[str, str]],
+                    body: str):
+    """Exports the generator function (once) and the call creating the
+    stream, then follows the exec flow"""
+    if not exporter.is_node_function_processed(node):
+        exporter.add_sys_function(
+            f"{signature(exporter, 'def', node.__class__.__name__, params, 'Iterator[str]')}\n{body}")
+        exporter.set_node_function_processed(node)
+    exporter.add_call(f"{exporter.get_out_list(node, post=' = ')}" +
+                      f"{node.__class__.__name__}({', '.join(inpnames)})")
+    exporter.set_node_processed(node)
+    exporter.call_named_pin(node, 'outExec')
+
+
+class PyCnvStreamIOLib(ConverterBase):
+    """Converters for the PythonExporter package StreamIOLib Function Library
+    nodes (their outputs are generators, see `Exporters/streams.py`)"""
+
+    @staticmethod
+    def readLines(exporter: PythonExporterImpl,
+                  node: NodeBase,
+                  inpnames: list[str],  # pylint: disable=unused-argument
+                  *args, **kwargs):  # pylint: disable=unused-argument
+        """Converts the readLines node"""
+        _convert_stream(exporter, node, inpnames, [('file', 'str'), ('encoding', 'str')],
+                        """    with open(file, encoding=encoding) as f:
+        for line in f:
+            yield line.rstrip('\\n')
+""")
+
+    @staticmethod
+    def readChunks(exporter: PythonExporterImpl,
+                   node: NodeBase,
+                   inpnames: list[str],  # pylint: disable=unused-argument
+                   *args, **kwargs):  # pylint: disable=unused-argument
+        """Converts the readChunks node"""
+        _convert_stream(exporter, node, inpnames,
+                        [('file', 'str'), ('encoding', 'str'), ('chunkSize', 'int')],
+                        """    with open(file, encoding=encoding) as f:
+        while chunk := f.read(chunkSize):
+            yield chunk
+""")
+
+    @staticmethod
+    def mmapLines(exporter: PythonExporterImpl,
+                  node: NodeBase,
+                  inpnames: list[str],  # pylint: disable=unused-argument
+                  *args, **kwargs):  # pylint: disable=unused-argument
+        """Converts the mmapLines node"""
+        exporter.add_import("mmap")
+        exporter.add_import("os")
+        _convert_stream(exporter, node, inpnames, [('file', 'str'), ('encoding', 'str')],
+                        """    with open(file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b''):
+                text = line.decode(encoding)
+                yield text[:-2] if text.endswith('\\r\\n') else text.rstrip('\\n')
+""")
+
+    @staticmethod
+    def writeLines(exporter: PythonExporterImpl,
+                   node: NodeBase,
+                   inpnames: list[str],  # pylint: disable=unused-argument
+                   *args, **kwargs):  # pylint: disable=unused-argument
+        """Converts the writeLines node"""
+        if not exporter.is_node_function_processed(node):
+            header = signature(exporter, 'def', 'writeLines',
+                               [('file', 'str'), ('lines', 'Any'), ('encoding', 'str')], 'None')
+            exporter.add_sys_function(f"{header}\n" + """    with open(file, 'w', encoding=encoding) as f:
+        for line in lines:
+            f.write(f"{line}\\n")
+""")
+            exporter.set_node_function_processed(node)
+        exporter.add_call(f"writeLines({', '.join(inpnames)})")
+        exporter.set_node_processed(node)
+        exporter.call_named_pin(node, 'outExec')
@@ -12,6 +12,12 @@ from PyFlow.Packages.PythonExporter.Exporters.converter_base import (  # pylint:
 from PyFlow.Packages.PythonExporter.Exporters.implementation import (  # pylint: disable=import-error, no-name-in-module # type: ignore
     PythonExporterImpl
 )
+from PyFlow.Packages.PythonExporter.Exporters.streams import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    map_stream, stream_inputs
+)
+from PyFlow.Packages.PythonExporter.Exporters.pin_types import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    input_types
+)
 if TYPE_CHECKING:
     from ..Exporters.converter_base import ConverterBase
     from ..Exporters.implementation import PythonExporterImpl
@@ -25,11 +31,15 @@ class PyCnvStringLib(ConverterBase):
                     node: NodeBase,
                     inpnames: list[str],  # pylint: disable=unused-argument
                     *args, **kwargs):  # pylint: disable=unused-argument
-        """Convert the startsWith node type"""
+        """Convert the startsWith node type (mapped over the items of a
+        streamed input)"""
+        expression = "{0}.startswith({1})"
+        if any(streams := stream_inputs(node)):
+            expression = map_stream(inpnames, streams, expression)
+        else:
+            expression = expression.format(*inpnames)
         # call
-        exporter.add_call(
-            f"{exporter.get_out_list(node, post=' = ')}" +
-            f"{inpnames[0]}.startswith({inpnames[1]})")
+        exporter.add_call(f"{exporter.get_out_list(node, post=' = ')}{expression}")
         # flag that we are processed
         exporter.set_node_processed(node)
 
@@ -38,5 +48,12 @@ class PyCnvStringLib(ConverterBase):
                     node: NodeBase,
                     inpnames: list[str],  # pylint: disable=unused-argument
                     *args, **kwargs):  # pylint: disable=unused-argument
-        """Converts the Concat node"""
-        return f"{exporter.get_out_list(node, post=' = ')}str({inpnames[0]}) + str({inpnames[1]})"
+        """Converts the Concat node (mapped over the items of a streamed input,
+        the strings are not converted)"""
+        expression = " + ".join(f"{{{i}}}" if data_type == 'StringPin' else f"str({{{i}}})"
+                                for i, data_type in enumerate(input_types(exporter, node)))
+        if any(streams := stream_inputs(node)):
+            expression = map_stream(inpnames, streams, expression)
+        else:
+            expression = expression.format(*inpnames)
+        return f"{exporter.get_out_list(node, post=' = ')}{expression}"
@@ -11,6 +11,9 @@ from PyFlow.Packages.PythonExporter.Exporters.converter_base import (  # pylint:
 from PyFlow.Packages.PythonExporter.Exporters.implementation import (  # pylint: disable=import-error, no-name-in-module # type: ignore
     PythonExporterImpl
 )
+from PyFlow.Packages.PythonExporter.Exporters.annotations import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    signature
+)
 if TYPE_CHECKING:
     from ..Exporters.converter_base import ConverterBase
     from ..Exporters.implementation import PythonExporterImpl
@@ -27,7 +30,9 @@ class PyCnvVariables(ConverterBase):
         """Converts the Variable getter node"""
         # export the function definition
         if not exporter.is_node_function_processed(node):
-            exporter.add_sys_function("def getVar(varname):\n    return VARS[varname]\n")
+            exporter.add_sys_function(
+                f"{signature(exporter, 'def', 'getVar', [('varname', 'str')], 'Any')}\n"
+                "    return VARS[varname]\n")
             exporter.set_node_function_processed(node)
         # export the call
         exporter.add_call(f"{exporter.get_out_list(node, post=' = ')}" +
@@ -44,9 +49,11 @@ class PyCnvVariables(ConverterBase):
         # export the function definition
         if not exporter.is_node_function_processed(node):
             exporter.add_sys_function(
-                "def setVar(varname, value):\n    VARS[varname] = value\n    return value\n")
+                f"{signature(exporter, 'def', 'setVar', [('varname', 'str'), ('value', 'Any')], 'Any')}\n"
+                "    VARS[varname] = value\n    return value\n")
             exporter.set_node_function_processed(node)
         # export the call
         exporter.add_call(f"{exporter.get_out_list(node, post=' = ')}" +
                           f"setVar({', '.join([repr(node.var.name)]+inpnames)})") # type: ignore
         exporter.set_node_processed(node)
+        exporter.call_named_pin(node, 'outExec')
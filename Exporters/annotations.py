@@ -0,0 +1,97 @@
+"""The type-annotated output of the generated scripts (the `type_annotations`
+export option): the functions get signatures annotated with the data
+types of the pins, the outputs of the nodes are declared with their types
+before their first assignment and the main program becomes a function, so
+the script has no dynamic globals and compiles with mypyc."""
+import re
+from typing import TYPE_CHECKING
+
+from PyFlow.Core import PinBase
+
+from .pin_types import PYTHON_TYPES
+from .streams import is_stream
+
+if TYPE_CHECKING:
+    from .implementation import PythonExporterImpl
+
+
+TYPED_MAIN_FUNCTION = 'main'
+
+TYPED_MAIN = f'''
+
+{TYPED_MAIN_FUNCTION}()'''
+
+# the names of the annotations imported from `typing` when they are used
+TYPING_NAMES = ['Any', 'Iterator']
+
+
+def pin_annotation(pin: PinBase) -> str:
+    """The annotation of the values of a pin (`Any` if its type has no
+    Python equivalent, e.g. an AnyPin)"""
+    if is_stream(pin):
+        return 'Iterator[Any]'
+    element = PYTHON_TYPES.get(pin.dataType, 'Any')
+    if pin.isArray():
+        return f"list[{element}]"
+    if pin.isDict():
+        return f"dict[Any, {element}]"
+    return element
+
+
+def returns_annotation(pins: list[PinBase]) -> str:
+    """The return annotation of a function returning the values of the pins"""
+    if len(pins)==0:
+        return 'None'
+    if len(pins)==1:
+        return pin_annotation(pins[0])
+    return f"tuple[{', '.join(pin_annotation(pin) for pin in pins)}]"
+
+
+def use_typing(exporter: "PythonExporterImpl", annotations: list[str]):
+    """Imports the names of `typing` used by the annotations"""
+    used = [name
+            for name in TYPING_NAMES
+            if any(re.search(rf"\b{name}\b", annotation) for annotation in annotations)]
+    if len(used)>0:
+        exporter.add_import('typing', imports=used)
+
+
+def annotated(exporter: "PythonExporterImpl", name: str, annotation: str) -> str:
+    """A name with its annotation (if the `type_annotations` option is on)"""
+    if not exporter.options.type_annotations:
+        return name
+    use_typing(exporter, [annotation])
+    return f"{name}: {annotation}"
+
+
+def signature(exporter: "PythonExporterImpl",
+              keyword: str,
+              name: str,
+              params: list[tuple[str, str]],
+              returns: str) -> str:
+    """The header of a function definition, annotated if the
+    `type_annotations` option is on.
+
+    Args:
+        keyword: 'def' or 'async def'
+        params: the names of the parameters and their annotations
+        returns: the return annotation
+    """
+    if not exporter.options.type_annotations:
+        return f"{keyword} {name}({', '.join(param for param, _ in params)}):"
+    use_typing(exporter, [annotation for _, annotation in params] + [returns])
+    return f"{keyword} {name}" \
+           f"({', '.join(f'{param}: {annotation}' for param, annotation in params)})" \
+           f" -> {returns}:"
+
+
+def pin_signature(exporter: "PythonExporterImpl",
+                  keyword: str,
+                  name: str,
+                  inputs: list[PinBase],
+                  outputs: list[PinBase]) -> str:
+    """The header of a function whose parameters are the input pins and
+    which returns the values of the output pins (e.g. a compound)"""
+    return signature(exporter, keyword, name,
+                     [(pin.name, pin_annotation(pin)) for pin in inputs],
+                     returns_annotation(outputs))
@@ -0,0 +1,75 @@
+"""The asyncio output mode of the generated scripts (the `async_mode`
+export option): the main program and the compounds with exec pins become
+coroutines, the I/O nodes are awaited and the independent start pins run
+concurrently under `asyncio.gather`. The pure nodes stay synchronous, only
+the compounds without exec pins awaiting something inside (e.g. a nested
+compound with exec pins) are coroutines too."""
+from typing import TYPE_CHECKING
+
+from PyFlow.Core import NodeBase, PinBase
+
+from .dependencies import analyse_parallel_branches, has_exec_pins
+
+if TYPE_CHECKING:
+    from .implementation import PythonExporterImpl
+
+
+ASYNC_MAIN_FUNCTION = 'main'
+
+ASYNC_MAIN = f'''
+
+asyncio.run({ASYNC_MAIN_FUNCTION}())'''
+
+
+def is_async(exporter: "PythonExporterImpl", node: NodeBase) -> bool:
+    """Returns True if the function of the node (e.g. a compound) has to
+    be a coroutine: in async mode the nodes taking part in the exec flow
+    are, the pure ones stay synchronous"""
+    return exporter.options.async_mode and has_exec_pins(node)
+
+
+def def_keyword(exporter: "PythonExporterImpl", node: NodeBase) -> str:
+    """The keyword starting the definition of the function of the node"""
+    return 'async def' if is_async(exporter, node) else 'def'
+
+
+def await_keyword(exporter: "PythonExporterImpl", function: str) -> str:
+    """The prefix of the call of an exported function (see
+    `PythonExporterImpl.coroutines`)"""
+    return 'await ' if function in exporter.coroutines else ''
+
+
+def awaited_in_thread(exporter: "PythonExporterImpl", function: str, args: list[str]) -> str:
+    """Gets the call of a blocking function: in async mode it runs on the
+    default thread pool of the event loop and is awaited"""
+    if not exporter.options.async_mode:
+        return f"{function}({', '.join(args)})"
+    exporter.add_import('asyncio')
+    return f"await asyncio.to_thread({', '.join([function]+args)})"
+
+
+def prepare_concurrent_start_pins(exporter: "PythonExporterImpl", startpins: list[PinBase]) -> bool:
+    """Checks if the exec chains of the start pins are independent, so they
+    can run as coroutines awaited together, and computes the pure nodes
+    shared by them before.
+
+    Returns:
+        bool: False if the chains are not independent (the reasons are
+              reported as diagnostics)
+    """
+    if len(startpins)<2:
+        return False
+    analysis = analyse_parallel_branches(startpins, exporter.is_node_processed)
+    if analysis.conflicts:
+        for conflict in analysis.conflicts:
+            exporter.add_diagnostic(f"start pins not run concurrently: {conflict}")
+        return False
+    exporter.add_import('asyncio')
+    for pure_node in analysis.hoisted:
+        exporter.process_node(pure_node)
+    return True
+
+
+def gather_start_pins(startpins: list[PinBase]) -> str:
+    """The statement running the coroutines of the start pins concurrently"""
+    return f"await asyncio.gather({', '.join(f'{start.getFullName()}()' for start in startpins)})"
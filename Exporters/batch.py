@@ -0,0 +1,104 @@
+"""The batch mode of the generated scripts: the graph becomes a function of
+its graph inputs (`run_graph`) and the script gets a driver which runs it
+for many input rows read from JSON Lines or CSV, optionally on a
+`multiprocessing` pool."""
+from PyFlow.Core import GraphBase, PinBase
+
+
+BATCH_FUNCTION = 'run_graph'
+
+BATCH_IMPORTS = ['argparse', 'csv', 'json', 'multiprocessing', 'sys']
+
+BATCH_DRIVER = '''def _batch_value(text):
+    """Converts a CSV field (JSON literals are parsed, the rest stays a string)"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _batch_rows(source, fmt):
+    """Iterates over the input rows (dictionaries of graph inputs)"""
+    if fmt == 'csv':
+        for row in csv.DictReader(source):
+            yield {key: _batch_value(value) for key, value in row.items()}
+    else:
+        for line in source:
+            if line.strip():
+                yield json.loads(line)
+
+
+def batch_main(argv=None):
+    """Runs the graph for each row of the input and writes the results as
+    JSON Lines (in the order of the input rows)"""
+    parser = argparse.ArgumentParser(description="Run the graph for many input rows")
+    parser.add_argument("input", nargs='?', default='-',
+                        help="JSON Lines or CSV file of graph inputs ('-' for stdin)")
+    parser.add_argument("-o", "--output", default='-',
+                        help="JSON Lines file of the results ('-' for stdout)")
+    parser.add_argument("-f", "--format", choices=['jsonl', 'csv'], default=None,
+                        help="the input format (default: by the extension, or jsonl)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="the number of worker processes")
+    parser.add_argument("--chunksize", type=int, default=256,
+                        help="the number of rows sent to a worker at once")
+    args = parser.parse_args(argv)
+    fmt = args.format or ('csv' if args.input.lower().endswith('.csv') else 'jsonl')
+    source = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf8', newline='')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf8')
+    try:
+        rows = _batch_rows(source, fmt)
+        if args.jobs > 1:
+            with multiprocessing.Pool(args.jobs) as pool:
+                for result in pool.imap(_batch_run, rows, chunksize=args.chunksize):
+                    target.write(json.dumps(result, default=repr)+'\\n')
+        else:
+            for result in map(_batch_run, rows):
+                target.write(json.dumps(result, default=repr)+'\\n')
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    return 0
+'''
+
+BATCH_RUN = '''def _batch_run(row):
+    """Runs the graph on one row (missing inputs get their default values)"""
+    return run_graph(**{**GRAPH_INPUTS, **row})
+'''
+
+# the graph function is a coroutine in async mode
+BATCH_ASYNC_RUN = '''def _batch_run(row):
+    """Runs the graph on one row (missing inputs get their default values)"""
+    return asyncio.run(run_graph(**{**GRAPH_INPUTS, **row}))
+'''
+
+BATCH_MAIN = '''
+
+if __name__ == '__main__':
+    sys.exit(batch_main())'''
+
+
+def graph_input_pins(graph: GraphBase) -> list[PinBase]:
+    """Gets the (data) output pins of the graphInputs nodes of a graph"""
+    return [pin
+            for node in graph.getNodesList(classNameFilters=['graphInputs'])
+            for pin in node.orderedOutputs.values()
+            if not pin.isExec()]
+
+
+def graph_inputs_literal(pins: list[PinBase]) -> str:
+    """The dictionary literal of the default values of the graph inputs"""
+    if len(pins)==0:
+        return '{}'
+    items = ''.join(f"    {pin.name!r}: {pin.currentData()!r},\n" for pin in pins)
+    return f"{{\n{items}}}"
+
+
+def batch_function_header(pins: list[PinBase], is_async: bool = False) -> str:
+    """The header of the graph function (it starts from an empty variable
+    store like a new run of the script)"""
+    return f"{'async def' if is_async else 'def'} " \
+           f"{BATCH_FUNCTION}({', '.join(pin.name for pin in pins)}):\n" \
+           f"    VARS.clear()"
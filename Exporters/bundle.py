@@ -0,0 +1,128 @@
+"""Precompiled artefacts of the exported scripts (the `bundle` export
+option), so the launches of the script don't recompile its source:
+- 'pyc': `<script>.pyc` next to the script (run with `python script.pyc`),
+- 'zipapp': also `<script>.pyz`, a zipapp of the script, its byte code and
+  a launcher (run with `python script.pyz`).
+
+The byte code is hash-based (PEP 552): it holds the hash of the source it
+was compiled from, so `bundle_is_current` detects the stale artefacts. The
+launcher of the zipapp checks it too: if the script next to the bundle
+changed since the bundle was built, it warns and runs the script instead.
+"""
+import importlib.util
+import os
+import py_compile
+import tempfile
+import zipapp
+import zipfile
+from typing import Optional
+
+BUNDLE_MODES = ('pyc', 'zipapp')
+
+# the name of the script module in the zipapp
+BUNDLE_MODULE = 'script'
+
+# the flags of the hash-based pyc files checked against their source (the
+# header of the pyc files: magic, flags, source hash)
+_PYC_FLAGS_CHECKED_HASH = 0b11
+
+BUNDLE_LAUNCHER = '''"""Runs the bundled script (or the script next to the bundle if it changed
+since the bundle was built)"""
+import importlib.util
+import os
+import runpy
+import sys
+
+SOURCE_HASH = {source_hash!r}
+SCRIPT_NAME = {script_name!r}
+
+
+def main():
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          SCRIPT_NAME)
+    if os.path.exists(script):
+        with open(script, 'rb') as f:
+            if importlib.util.source_hash(f.read()).hex() != SOURCE_HASH:
+                print(f"stale bundle: {{script}} changed since it was built, running the script",
+                      file=sys.stderr)
+                runpy.run_path(script, run_name='__main__')
+                return
+    runpy.run_module({module!r}, run_name='__main__', alter_sys=True)
+
+
+main()
+'''
+
+
+def source_hash(script_path: str) -> str:
+    """Gets the hash of a script as the byte code embeds it (hex)"""
+    with open(script_path, 'rb') as f:
+        return importlib.util.source_hash(f.read()).hex()
+
+
+def pyc_source_hash(pyc_data: bytes) -> Optional[str]:
+    """Gets the source hash embedded in hash-based byte code (hex), None
+    if it is not hash-based or of another Python version"""
+    if pyc_data[:4] != importlib.util.MAGIC_NUMBER:
+        return None
+    if int.from_bytes(pyc_data[4:8], 'little') & _PYC_FLAGS_CHECKED_HASH != _PYC_FLAGS_CHECKED_HASH:
+        return None
+    return pyc_data[8:16].hex()
+
+
+def bundle_paths(script_path: str, mode: str) -> list[str]:
+    """Gets the paths of the artefacts of a bundle mode"""
+    stem = os.path.splitext(script_path)[0]
+    return [stem+'.pyc'] + ([stem+'.pyz'] if mode == 'zipapp' else [])
+
+
+def write_bundle(script_path: str, mode: str, modules: Optional[dict[str, str]] = None) -> list[str]:
+    """Writes the artefacts of a bundle mode next to the script (the zipapp
+    also gets the `modules` the script imports: their content by their
+    relative paths, see `shared_library`)
+
+    Returns:
+        list[str]: the paths of the written artefacts
+    """
+    paths = bundle_paths(script_path, mode)
+    py_compile.compile(script_path, cfile=paths[0], doraise=True,
+                       invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+    if mode == 'zipapp':
+        with tempfile.TemporaryDirectory() as folder:
+            with open(script_path, 'rb') as f:
+                source = f.read()
+            with open(os.path.join(folder, BUNDLE_MODULE+'.py'), 'wb') as f:
+                f.write(source)
+            py_compile.compile(os.path.join(folder, BUNDLE_MODULE+'.py'),
+                               cfile=os.path.join(folder, BUNDLE_MODULE+'.pyc'), doraise=True,
+                               invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+            with open(os.path.join(folder, '__main__.py'), 'w', encoding='utf8') as f:
+                f.write(BUNDLE_LAUNCHER.format(source_hash=importlib.util.source_hash(source).hex(),
+                                               script_name=os.path.basename(script_path),
+                                               module=BUNDLE_MODULE))
+            for relative_path, content in (modules or {}).items():
+                module_path = os.path.join(folder, relative_path)
+                os.makedirs(os.path.dirname(module_path), exist_ok=True)
+                with open(module_path, 'w', encoding='utf8') as f:
+                    f.write(content)
+                # zipimport loads the byte code next to the module
+                py_compile.compile(module_path, cfile=os.path.splitext(module_path)[0]+'.pyc',
+                                   doraise=True,
+                                   invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+            # written next to the target and renamed: a partial bundle never appears
+            tmp_path = paths[1]+'.tmp'
+            zipapp.create_archive(folder, tmp_path, interpreter='/usr/bin/env python3')
+            os.replace(tmp_path, paths[1])
+    return paths
+
+
+def bundle_is_current(script_path: str, bundle_path: str) -> bool:
+    """Returns True if the bundle (.pyc or .pyz) was built from the current
+    content of the script"""
+    if bundle_path.endswith('.pyz'):
+        with zipfile.ZipFile(bundle_path) as archive:
+            pyc_data = archive.read(BUNDLE_MODULE+'.pyc')
+    else:
+        with open(bundle_path, 'rb') as f:
+            pyc_data = f.read(16)
+    return pyc_source_hash(pyc_data) == source_hash(script_path)
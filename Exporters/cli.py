@@ -0,0 +1,160 @@
+"""Command line interface of the exporter: exports .pygraph files without
+the PyFlow UI
+
+Usage:
+    python -m PyFlow.Packages.PythonExporter.Exporters.cli graph.pygraph -o graph.py
+    python -m PyFlow.Packages.PythonExporter.Exporters.cli graph.pygraph -o - | python
+    python -m PyFlow.Packages.PythonExporter.Exporters.cli graphs/*.pygraph --shared-library graphlib
+    python -m PyFlow.Packages.PythonExporter.Exporters.cli graphs/*.pygraph --watch
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Optional
+
+from PyFlow import INITIALIZE
+from PyFlow.Core.GraphManager import GraphManager
+
+from .bundle import BUNDLE_MODES
+from .export_job import ExportJob, collect_converters, script_header
+from .options import ExportOptions
+from .watch import WATCH_DEBOUNCE, GraphWatcher
+
+
+def load_graph(fname: str) -> GraphManager:
+    """Loads a .pygraph file into a new graph manager"""
+    with open(fname, "r", encoding='utf8') as f:
+        data = json.load(f)
+    graph_manager = GraphManager()
+    graph_manager.deserialize(data)
+    return graph_manager
+
+
+def export_file(graph_fname: str,
+                out_fname: str,
+                converters: list[object],
+                options: Optional[ExportOptions] = None) -> ExportJob:
+    """Exports one .pygraph file into a script (or to stdout if `out_fname` is '-')"""
+    graph_manager = load_graph(graph_fname)
+    job = ExportJob(graph_manager.findRootGraph(), converters, options=options)
+    job.run()
+    job.save(out_fname, script_header())
+    return job
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """Parses the command line arguments"""
+    parser = argparse.ArgumentParser(description="Export PyFlow graphs to pure Python scripts")
+    parser.add_argument("graphs", nargs='+', metavar="graph",
+                        help="the .pygraph files to export (each one next to its graph)")
+    parser.add_argument("-o", "--output", default=None,
+                        help="the output script of a single graph ('-' for stdout, "
+                             "default: next to the graph)")
+    parser.add_argument("-p", "--packages", nargs='*', default=[],
+                        help="additional PyFlow package folders")
+    parser.add_argument("--profile-export", action='store_true',
+                        help="measure the exporter and write a summary next to the output")
+    parser.add_argument("--runtime-profile", action='store_true',
+                        help="the generated script measures its node statements and "
+                             "dumps a per-node JSON table at exit")
+    parser.add_argument("--source-map", action='store_true',
+                        help="write the node of each line of the script into <output>.map.json")
+    parser.add_argument("--numpy", action='store_true',
+                        help="vectorise the elementwise math of loops over numeric arrays with NumPy")
+    parser.add_argument("--parallel-sequences", action='store_true',
+                        help="run the independent branches of Sequence nodes in parallel")
+    parser.add_argument("--batch", action='store_true',
+                        help="the script runs the graph for each input row of JSON Lines or CSV")
+    parser.add_argument("--async", dest='async_mode', action='store_true',
+                        help="asyncio script: awaited I/O, independent start pins run concurrently")
+    parser.add_argument("--start-pin-pool", choices=['thread', 'process'], default='',
+                        help="run the independent start pins on a thread or process pool")
+    parser.add_argument("--generic-code", action='store_true',
+                        help="ignore the pin types and emit the generic code of the converters")
+    parser.add_argument("--type-annotations", action='store_true',
+                        help="annotate the script with the pin types (it compiles with mypyc)")
+    parser.add_argument("--lazy-imports", action='store_true',
+                        help="load the imported modules on their first use")
+    parser.add_argument("--bundle", choices=BUNDLE_MODES, default='',
+                        help="also write the byte code (<output>.pyc) or a zipapp "
+                             "(<output>.pyc and <output>.pyz)")
+    parser.add_argument("--shared-library", default='', metavar="PACKAGE",
+                        help="move the system functions and the graph implementation into "
+                             "the shared modules of this package next to the output")
+    parser.add_argument("--watch", action='store_true',
+                        help="after the export, export the graphs again when they change "
+                             "(until interrupted)")
+    parser.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE, metavar="SECONDS",
+                        help="with --watch: export a changed graph when it didn't change for "
+                             f"this time (default: {WATCH_DEBOUNCE})")
+    args = parser.parse_args(argv)
+    if args.watch and args.output == '-':
+        parser.error("--watch needs output files")
+    if args.output is not None and len(args.graphs) > 1:
+        parser.error("-o/--output needs a single graph")
+    if args.shared_library and not args.shared_library.isidentifier():
+        parser.error(f"--shared-library: {args.shared_library!r} is not a package name")
+    return args
+
+
+def options_from_args(args: argparse.Namespace) -> ExportOptions:
+    """Builds the export options from the command line arguments"""
+    return ExportOptions(
+        profile_export=args.profile_export,
+        runtime_profile=args.runtime_profile,
+        source_map=args.source_map,
+        numpy_arrays=args.numpy,
+        parallel_sequences=args.parallel_sequences,
+        batch_mode=args.batch,
+        async_mode=args.async_mode,
+        start_pin_pool=args.start_pin_pool,
+        generic_code=args.generic_code,
+        type_annotations=args.type_annotations,
+        lazy_imports=args.lazy_imports,
+        bundle=args.bundle,
+        shared_library=args.shared_library,
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Entry point of the command line interface"""
+    args = parse_args(argv)
+    INITIALIZE(args.packages)
+    # collected once: the exports (and the re-exports of --watch) reuse them
+    converters = collect_converters()
+    options = options_from_args(args)
+
+    def export(graph_fname: str) -> ExportJob:
+        out_fname = args.output
+        if out_fname is None:
+            out_fname = os.path.splitext(graph_fname)[0] + '.py'
+        job = export_file(graph_fname, out_fname, converters, options)
+        for diagnostic in job.diagnostics:
+            print(diagnostic, file=sys.stderr)
+        if out_fname != '-':
+            print(f"saved {out_fname}", file=sys.stderr)
+        return job
+
+    if not args.watch:
+        for graph_fname in args.graphs:
+            export(graph_fname)
+        return 0
+
+    watcher = GraphWatcher(
+        export, args.graphs, args.debounce,
+        on_exported=lambda fname, seconds: print(f"  ({fname} in {seconds*1000:.0f} ms)",
+                                                 file=sys.stderr),
+        on_failed=lambda fname, e: print(f"export of {fname} failed: {e}", file=sys.stderr))
+    # a graph failing now (e.g. saved half-way) is exported after its next change
+    watcher.export_all()
+    print(f"watching {len(args.graphs)} graph(s), Ctrl+C to stop", file=sys.stderr)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Cache of the compiled code of the python nodes: their code defines the
+`func_python` converter of the node, the namespaces of the compiled code
+are shared by the nodes with the same code and by the exports (the
+least recently used ones are evicted)"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from PyFlow.Core.PyCodeCompiler import Py3CodeCompiler
+
+
+PYTHON_NODE_CACHE_SIZE = 256
+
+
+def code_digest(code: str) -> str:
+    """Gets the hash of a piece of code (or generated text)"""
+    return hashlib.sha1(code.encode('utf8')).hexdigest()
+
+
+class CompiledCodeCache:
+    """An LRU cache of the namespaces of compiled code by the hashes of the
+    code (thread-safe: the exports may run on worker threads)
+
+    Args:
+        maxsize: the number of namespaces kept
+    """
+
+    def __init__(self, maxsize: int = PYTHON_NODE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._namespaces: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def namespace(self, code: str) -> dict:
+        """Gets the namespace of the compiled code (compiles it if not cached)"""
+        key = code_digest(code)
+        with self._lock:
+            namespace = self._namespaces.get(key)
+            if namespace is not None:
+                self._namespaces.move_to_end(key)
+                self.hits += 1
+                return namespace
+            self.misses += 1
+        namespace = Py3CodeCompiler().compile(code, f"pythonNode_{key[:12]}", {})
+        with self._lock:
+            self._namespaces[key] = namespace
+            while len(self._namespaces) > self.maxsize:
+                self._namespaces.popitem(last=False)
+        return namespace
+
+
+    def clear(self):
+        """Empties the cache (and resets its statistics)"""
+        with self._lock:
+            self._namespaces.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+    def __len__(self) -> int:
+        return len(self._namespaces)
+
+
+# shared by the python nodes of all exports
+PYTHON_NODE_CODE = CompiledCodeCache()
@@ -0,0 +1,127 @@
+"""The functions of the compounds (called by the compound nodes and by the
+Function nodes referencing them).
+
+A compound with several input exec pins gets the name of the pin the
+flow enters through as its last argument and runs the flow of that pin.
+A compound with several output exec pins returns the name of the pin the
+flow leaves through (the exec pin of its graphOutputs node) as its last
+value, and the flow after the call goes on from that pin."""
+from typing import TYPE_CHECKING, Callable, Optional
+
+from PyFlow.Core import NodeBase, PinBase
+
+from .annotations import pin_annotation, returns_annotation, signature
+from .async_mode import await_keyword, is_async
+from .exec_paths import analyse_body
+
+if TYPE_CHECKING:
+    from .implementation import PythonExporterImpl
+
+
+ENTRY_PARAMETER = 'entry_pin'
+
+
+def _chained(exporter: "PythonExporterImpl",
+             names: list[str],
+             variable: str,
+             convert: Callable[[str], None]):
+    """Converts the flow of each name under an `if`-`elif` chain testing
+    the variable"""
+    for index, name in enumerate(names):
+        exporter.add_call(f"{'if' if index==0 else 'elif'} {variable} == {name!r}:")
+        exporter.increase_indent()
+        call_count = exporter.call_count
+        with exporter.conditional_part():
+            convert(name)
+        if exporter.call_count == call_count:
+            exporter.add_call("pass")
+        exporter.decrease_indent()
+
+
+def export_compound_function(exporter: "PythonExporterImpl",
+                             compound: NodeBase,
+                             function_node: Optional[NodeBase] = None):
+    """Exports the function of a compound once (`function_node` is the
+    node calling it, e.g. a Function node, by default the compound)"""
+    function_node = compound if function_node is None else function_node
+    if exporter.is_node_function_processed(function_node):
+        return
+    index = exporter.graph_index
+    subexporter = exporter.create_subexporter(compound.rawGraph)  # type: ignore
+    entries = index.exec_inputs(compound)
+    by_name = {pin.name: pin for pin in entries}
+
+    def enter(name: str):
+        for inner_pin in index.targets(by_name[name]):
+            subexporter.export_from_pin(inner_pin)
+
+    if len(entries)>1:
+        # the flow of the input exec pin given by the caller
+        _chained(subexporter, list(by_name), ENTRY_PARAMETER, enter)
+    elif len(entries)>0:
+        enter(entries[0].name)
+    else:
+        # no exec pin: follow the flow back from the outputs
+        for outnode in subexporter.graph_index.graph_outputs:
+            subexporter.process_node(outnode)
+
+    inputs = [(pin.name, pin_annotation(pin)) for pin in index.data_inputs(compound)]
+    outputs = index.data_outputs(compound)
+    returns = returns_annotation(outputs)
+    if len(entries)>1:
+        inputs.append((ENTRY_PARAMETER, 'str'))
+    if len(index.exec_outputs(compound))>1:
+        annotations = [pin_annotation(pin) for pin in outputs]
+        if not analyse_body(subexporter.get_calls()).returns:
+            # the flow may end without leaving the compound
+            subexporter.add_call(f"return {', '.join(['None']*(len(outputs)+1))}")
+            annotations = [f"{annotation} | None" for annotation in annotations]
+        annotations.append('str | None')
+        returns = annotations[0] if len(annotations)==1 else f"tuple[{', '.join(annotations)}]"
+    # a plain function can't await the coroutines called inside
+    coroutine = is_async(exporter, compound) or analyse_body(subexporter.get_calls()).awaits
+    if coroutine:
+        exporter.coroutines.add(compound.name)
+    header = signature(exporter, 'async def' if coroutine else 'def', compound.name, inputs, returns)
+    exporter.collect_subexporter_results(subexporter, compound, header)
+    # flagged by the structure of the inner graph: the compounds with the
+    # same inner graph (e.g. copy-pasted ones) call this function
+    exporter.set_node_function_processed(function_node)
+
+
+def call_compound(exporter: "PythonExporterImpl",
+                  node: NodeBase,
+                  compound: NodeBase,
+                  function_name: str,
+                  args: list[str]):
+    """Converts the call of the function of a compound by a node (the
+    compound or a Function node) and follows the flow after it"""
+    index = exporter.graph_index
+    entries = index.exec_inputs(compound)
+    if len(entries)>1:
+        entry = exporter.entry_pin(node)
+        args = args + [repr(entries[0].name if entry is None else entry.name)]
+    outputs = [pin.getFullName() for pin in index.data_outputs(node)]
+    exits = len(index.exec_outputs(compound))>1
+    exit_variable = f"{node.name}_exit"
+    if exits:
+        outputs.append(exit_variable)
+    exporter.add_call(f"{', '.join(outputs)}{' = ' if outputs else ''}"
+                      f"{await_keyword(exporter, function_name)}{function_name}({', '.join(args)})")
+    exporter.set_node_processed(node)
+    connected = [pin.name for pin in index.exec_outputs(node) if index.is_connected(pin)]
+    if exits:
+        _chained(exporter, connected, exit_variable,
+                 lambda name: exporter.call_named_pin(node, name))
+    else:
+        for name in connected:
+            exporter.call_named_pin(node, name)
+
+
+def exit_value(exporter: "PythonExporterImpl", graph_outputs: NodeBase) -> Optional[str]:
+    """Gets the name of the output exec pin a graphOutputs node returns
+    (None if its compound has only one)"""
+    if len(exporter.graph_index.exec_inputs(graph_outputs))<2:
+        return None
+    pin: Optional[PinBase] = exporter.entry_pin(graph_outputs)
+    return repr(None if pin is None else pin.name)
@@ -4,3 +4,26 @@ class ConverterBase:
     """A base class of converters. Currently it is just for the
     plugin system's filtering mechanism
     """
+
+
+class ConverterRegistry(tuple):
+    """The converter classes of the exports (immutable, so it can remember
+    where it found the converter methods): a registry reused by the
+    exports (e.g. in watch mode) answers the lookups from a warm cache"""
+
+    def __init__(self, converters=()):  # pylint: disable=unused-argument
+        super().__init__()
+        self._methods: dict = {}
+
+
+    def find_method(self, name: str):
+        """Gets a converter method by name from the first converter class
+        which has it (or None)"""
+        try:
+            return self._methods[name]
+        except KeyError:
+            pass
+        method = next((getattr(converter, name) for converter in self
+                       if hasattr(converter, name)), None)
+        self._methods[name] = method
+        return method
@@ -0,0 +1,327 @@
+"""Dependency analysis of the exec and data flow of graphs, used by the
+converters which restructure the generated code (e.g. loops, parallel
+branches)"""
+import os
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+
+from PyFlow.Core import PinBase, NodeBase
+
+
+# pure nodes reading a state which exec nodes can change
+STATE_READER_NODES = {'getVar'}
+# exec nodes changing that state
+STATE_WRITER_NODES = {'setVar'}
+
+# the pins holding the path of a file accessed by a node
+FILE_PIN_NAMES = {'file', 'path'}
+# the nodes only reading the file of their file pin (any other node with a
+# file pin is assumed to write it)
+FILE_READER_NODES = {'readAllText', 'readLines', 'readChunks', 'mmapLines'}
+# the nodes writing to the console
+CONSOLE_NODES = {'consoleOutput', 'clearConsole'}
+
+
+def has_exec_pins(node: NodeBase) -> bool:
+    """Returns True if the node takes part in the exec flow"""
+    return any(pin.isExec() for pin in node.orderedInputs.values()) or \
+           any(pin.isExec() for pin in node.orderedOutputs.values())
+
+
+def data_sources(node: NodeBase) -> list[NodeBase]:
+    """Gets the nodes connected to the data input pins of the node"""
+    sources: list[NodeBase] = []
+    for pin in node.orderedInputs.values():
+        if pin.isExec():
+            continue
+        for affpin in list(pin.affected_by):
+            source = affpin.owningNode()
+            if source not in sources:
+                sources.append(source)
+    return sources
+
+
+def exec_chain(pins: Iterable[PinBase], stop_nodes: Iterable[NodeBase] = ()) -> dict[str, NodeBase]:
+    """Gets the nodes reachable through the exec flow from the given
+    output exec pins (not following the `stop_nodes`)
+
+    Returns:
+        dict[str, NodeBase]: the nodes by their paths in the order of discovery
+    """
+    chain: dict[str, NodeBase] = {}
+    stop_paths = {node.path() for node in stop_nodes}
+    pending = list(pins)
+    while pending:
+        pin = pending.pop(0)
+        for affpin in list(pin.affects):
+            node = affpin.owningNode()
+            if node.path() in chain or node.path() in stop_paths:
+                continue
+            chain[node.path()] = node
+            pending.extend(opin for opin in node.orderedOutputs.values() if opin.isExec())
+    return chain
+
+
+def pin_chain(pin: PinBase) -> dict[str, NodeBase]:
+    """Gets the nodes run by an exec pin: the chain following an output
+    exec pin, or the node started by its input exec pin and its chain"""
+    node = pin.owningNode()
+    if pin is not first_exec_input(node):
+        return exec_chain([pin])
+    chain = {node.path(): node}
+    chain.update(exec_chain([opin for opin in node.orderedOutputs.values() if opin.isExec()],
+                            stop_nodes=[node]))
+    return chain
+
+
+def first_exec_input(node: NodeBase) -> Optional[PinBase]:
+    """Gets the input exec pin which starts the node"""
+    for pin in node.orderedInputs.values():
+        if pin.isExec():
+            return pin
+    return None
+
+
+def branch_names(pins: list[PinBase]) -> list[str]:
+    """Gets the names of the branches started by the exec pins in the
+    diagnostics (the input exec pins are named by their nodes too)"""
+    return [pin.getFullName() if pin is first_exec_input(pin.owningNode()) else pin.name
+            for pin in pins]
+
+
+def nested_nodes(node: NodeBase) -> Iterator[NodeBase]:
+    """Iterates over the node and the nodes of its inner graph (recursively)"""
+    yield node
+    inner_graph = getattr(node, 'rawGraph', None)
+    if inner_graph is not None:
+        for inner_node in inner_graph.getNodesList():
+            yield from nested_nodes(inner_node)
+
+
+def file_accesses(node: NodeBase) -> list[tuple[Optional[str], bool]]:
+    """Gets the files accessed by the node (or by the nodes of its inner
+    graph) as (path, written) pairs, the path is None if it is computed"""
+    accesses: list[tuple[Optional[str], bool]] = []
+    for inner_node in nested_nodes(node):
+        for pin in inner_node.orderedInputs.values():
+            if pin.name not in FILE_PIN_NAMES or pin.isExec():
+                continue
+            path = None if pin.hasConnections() else os.path.normpath(str(pin.currentData()))
+            accesses.append((path, inner_node.__class__.__name__ not in FILE_READER_NODES))
+    return accesses
+
+
+def variable_accesses(node: NodeBase, node_classes: set[str]) -> set[str]:
+    """Gets the names of the variables accessed by the node (or by the
+    nodes of its inner graph) if it is one of `node_classes`"""
+    names: set[str] = set()
+    if node.__class__.__name__ in node_classes and hasattr(node, 'var'):
+        names.add(node.var.name)  # type: ignore
+    inner_graph = getattr(node, 'rawGraph', None)
+    if inner_graph is not None:
+        for inner_node in inner_graph.getNodesList():
+            names |= variable_accesses(inner_node, node_classes)
+    return names
+
+
+def split_loop_dependencies(loop_node: NodeBase,
+                            body: dict[str, NodeBase],
+                            roots: Iterable[NodeBase],
+                            is_processed: Callable[[NodeBase], bool]
+                            ) -> tuple[list[NodeBase], list[NodeBase]]:
+    """Splits the pure nodes feeding the `roots` (the nodes of a loop body)
+    by whether they change between the iterations of the loop.
+
+    A pure node is loop-variant if it depends on the outputs of the loop
+    node or of the body, or it reads a state which the body changes.
+
+    Returns:
+        tuple:
+            list[NodeBase]: the invariant pure nodes not processed yet, which
+                            can be hoisted above the loop
+            list[NodeBase]: the variant pure nodes already processed, which
+                            have to be recomputed in each iteration
+        both in dependency order
+    """
+    writes_state = any(node.__class__.__name__ in STATE_WRITER_NODES for node in body.values())
+    invariant: dict[str, bool] = {}
+    order: list[NodeBase] = []
+
+    def is_invariant(node: NodeBase) -> bool:
+        path = node.path()
+        if path in invariant:
+            return invariant[path]
+        if node is loop_node or path in body:
+            result = False
+        elif node.__class__.__name__ == 'graphInputs':
+            result = True
+        elif has_exec_pins(node):
+            # computed before the loop, or it would be dragged into it
+            result = is_processed(node)
+        else:
+            invariant[path] = True  # guard against cycles
+            results = [is_invariant(source) for source in data_sources(node)]
+            result = all(results) and not (writes_state and
+                                           node.__class__.__name__ in STATE_READER_NODES)
+            order.append(node)
+        invariant[path] = result
+        return result
+
+    for root in roots:
+        for source in data_sources(root):
+            is_invariant(source)
+
+    hoisted = [node for node in order if invariant[node.path()] and not is_processed(node)]
+    recomputed = [node for node in order if not invariant[node.path()] and is_processed(node)]
+    return hoisted, recomputed
+
+
+class ParallelBranches(NamedTuple):
+    """The result of `analyse_parallel_branches`"""
+    branches: list[dict[str, NodeBase]]
+    """the nodes of each branch (exec chain and own pure inputs) by their paths"""
+    hoisted: list[NodeBase]
+    """the pure nodes used by more branches, to be computed before them"""
+    conflicts: list[str]
+    """the reasons why the branches can't run in parallel"""
+
+
+def analyse_parallel_branches(pins: list[PinBase],
+                              is_processed: Callable[[NodeBase], bool]) -> ParallelBranches:
+    """Checks if the exec chains started by the exec pins (see `pin_chain`)
+    can run in parallel, i.e. they share no nodes, no outputs and no
+    variables written by any of them, and they don't leave their chains
+    (through a return or a pin acting on a running node)."""
+    conflicts: list[str] = []
+    chains: list[dict[str, NodeBase]] = []
+    names = branch_names(pins)
+    for index, pin in enumerate(pins):
+        chain = pin_chain(pin)
+        exec_pins = [opin
+                     for node in chain.values()
+                     for opin in node.orderedOutputs.values()
+                     if opin.isExec()]
+        if pin is not first_exec_input(pin.owningNode()):
+            exec_pins.insert(0, pin)
+        for opin in exec_pins:
+            for target_pin in list(opin.affects):
+                target = target_pin.owningNode()
+                if target_pin is not first_exec_input(target):
+                    conflicts.append(f"branch {names[index]} acts on the running node "
+                                     f"{target.name} through its {target_pin.name} pin")
+        for node in chain.values():
+            if node.__class__.__name__ == 'graphOutputs':
+                conflicts.append(f"branch {names[index]} returns from the graph")
+        chains.append(chain)
+
+    for i, chain in enumerate(chains):
+        for j in range(i+1, len(chains)):
+            for path in chain.keys() & chains[j].keys():
+                conflicts.append(f"branches {names[i]} and {names[j]} "
+                                 f"both run node {chain[path].name}")
+
+    # the pure nodes (not computed yet) needed by the chains
+    owner_of_exec = {path: i for i, chain in enumerate(chains) for path in chain}
+    users: dict[str, set[int]] = {}
+    depends: dict[str, set[int]] = {}
+    pure_nodes: dict[str, NodeBase] = {}
+
+    def visit_sources(node: NodeBase, branch: int):
+        for source in data_sources(node):
+            path = source.path()
+            if path in owner_of_exec:
+                if owner_of_exec[path] != branch:
+                    conflicts.append(f"branch {names[branch]} uses the outputs of node "
+                                     f"{source.name} of branch {names[owner_of_exec[path]]}")
+                continue
+            if is_processed(source) or source.__class__.__name__ == 'graphInputs':
+                continue
+            if has_exec_pins(source):
+                conflicts.append(f"branch {names[branch]} needs node {source.name} "
+                                 f"which is not run yet")
+                continue
+            if branch in users.setdefault(path, set()):
+                continue
+            users[path].add(branch)
+            pure_nodes[path] = source
+            visit_sources(source, branch)
+
+    for branch, chain in enumerate(chains):
+        for node in chain.values():
+            visit_sources(node, branch)
+
+    def branch_dependencies(node: NodeBase, seen: set[str]) -> set[int]:
+        path = node.path()
+        if path in depends:
+            return depends[path]
+        result: set[int] = set()
+        if path in seen:
+            return result
+        seen.add(path)
+        for source in data_sources(node):
+            if source.path() in owner_of_exec:
+                result.add(owner_of_exec[source.path()])
+            elif source.path() in pure_nodes:
+                result |= branch_dependencies(source, seen)
+        depends[path] = result
+        return result
+
+    hoisted: list[NodeBase] = []
+    branches = [dict(chain) for chain in chains]
+    for path, node in pure_nodes.items():
+        if len(users[path]) == 1:
+            branches[next(iter(users[path]))][path] = node
+        elif branch_dependencies(node, set()):
+            conflicts.append(f"node {node.name} is computed in a branch and used by more")
+        else:
+            hoisted.append(node)
+
+    # the variables written by a branch must not be accessed by the others
+    writes = [set().union(*(variable_accesses(node, STATE_WRITER_NODES) for node in nodes.values()))
+              for nodes in branches]
+    reads = [set().union(*(variable_accesses(node, STATE_READER_NODES) for node in nodes.values()))
+             for nodes in branches]
+    for i in range(len(branches)):
+        for j in range(len(branches)):
+            if i == j:
+                continue
+            if i < j:
+                for name in sorted(writes[i] & writes[j]):
+                    conflicts.append(f"branches {names[i]} and {names[j]} "
+                                     f"both write variable {name!r}")
+            for name in sorted(writes[i] & reads[j]):
+                conflicts.append(f"branch {names[i]} writes variable {name!r} "
+                                 f"which branch {names[j]} reads")
+
+    return ParallelBranches(branches, hoisted, list(dict.fromkeys(conflicts)))
+
+
+def analyse_start_pins(pins: list[PinBase],
+                       is_processed: Callable[[NodeBase], bool]) -> ParallelBranches:
+    """Checks if the sections of the start pins can run concurrently: besides
+    the rules of `analyse_parallel_branches` they must not share a file
+    written by any of them (a computed path may be any file) and only one
+    of them may write to the console (the order of the lines would change)"""
+    analysis = analyse_parallel_branches(pins, is_processed)
+    names = branch_names(pins)
+    conflicts = list(analysis.conflicts)
+    accesses = [[access for node in nodes.values() for access in file_accesses(node)]
+                for nodes in analysis.branches]
+    for i in range(len(pins)):
+        for j in range(i+1, len(pins)):
+            for path_i, written_i in accesses[i]:
+                for path_j, written_j in accesses[j]:
+                    if not (written_i or written_j):
+                        continue
+                    if path_i is None or path_j is None:
+                        conflicts.append(f"branches {names[i]} and {names[j]} access "
+                                         f"computed file paths and one of them writes")
+                    elif path_i == path_j:
+                        conflicts.append(f"branches {names[i]} and {names[j]} both access "
+                                         f"file {path_i!r} and one of them writes it")
+    printing = [names[i] for i, nodes in enumerate(analysis.branches)
+                if any(inner.__class__.__name__ in CONSOLE_NODES
+                       for node in nodes.values()
+                       for inner in nested_nodes(node))]
+    if len(printing)>1:
+        conflicts.append(f"branches {', '.join(printing)} all write to the console")
+    return analysis._replace(conflicts=list(dict.fromkeys(conflicts)))
@@ -0,0 +1,91 @@
+"""The exec flows reaching an input exec pin from several places (exec
+fan-in): the part of the graph entered through the pin is converted once,
+into a local function called from each place, so the export stays linear
+in the size of the graph instead of converting the part once per path.
+
+The local functions are defined at the start of the function (or of the
+script) the places are in. They write the outputs of their nodes into
+that scope (with `nonlocal` or `global` declarations), so the nodes after
+the calls can read them; the pure nodes they compute are computed again
+outside of them when needed (they didn't run on the paths not calling
+them)."""
+import ast
+import textwrap
+from typing import NamedTuple
+
+_NESTED_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef,
+                  ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+
+class SharedChain(NamedTuple):
+    """The local function of the exec flow entering a pin"""
+    name: str
+    call: str
+    """the statement calling it (returning its result if it returns)"""
+
+
+class BodyInfo(NamedTuple):
+    """What the body of a local function does in its scope"""
+    assigned: list[str]
+    """the assigned names in the order of their first assignment (without
+    the private ones, e.g. of the runtime profiler, which stay local)"""
+    awaits: bool
+    returns: bool
+    """it returns on all of its paths (it has a top level `return`)"""
+    returns_on_some_paths: bool
+
+
+class _BodyVisitor(ast.NodeVisitor):
+    """Collects the names assigned, the awaits and the returns of a body
+    (without descending into the nested scopes)"""
+
+    def __init__(self):
+        self.assigned: dict[str, None] = {}
+        self.awaits = False
+        self.returns = False
+
+    def generic_visit(self, node: ast.AST):
+        if isinstance(node, _NESTED_SCOPES):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                # only their decorators and defaults are evaluated here
+                for child in node.decorator_list:
+                    self.visit(child)
+            return
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store) \
+                and not node.id.startswith('_'):
+            self.assigned.setdefault(node.id, None)
+        elif isinstance(node, (ast.Await, ast.AsyncFor, ast.AsyncWith)):
+            self.awaits = True
+        elif isinstance(node, ast.Return):
+            self.returns = True
+        super().generic_visit(node)
+
+
+def analyse_body(text: str) -> BodyInfo:
+    """Analyses the (indented) statements of the body of a local function"""
+    tree = compile(textwrap.dedent(text), '<chain>', 'exec',
+                   flags=ast.PyCF_ONLY_AST | ast.PyCF_ALLOW_TOP_LEVEL_AWAIT)
+    visitor = _BodyVisitor()
+    for stmt in tree.body:  # type: ignore
+        visitor.visit(stmt)
+    return BodyInfo(list(visitor.assigned),
+                    visitor.awaits,
+                    any(isinstance(stmt, ast.Return) for stmt in tree.body),  # type: ignore
+                    visitor.returns)
+
+
+def shared_chain_call(name: str, info: BodyInfo) -> str:
+    """The statement calling the local function of an exec flow: the
+    function returning (e.g. through a graphOutputs node) ends the caller
+    too"""
+    call = f"{'await ' if info.awaits else ''}{name}()"
+    if info.returns:
+        return f"return {call}"
+    if info.returns_on_some_paths:
+        return f"if ({name}_result := {call}) is not None:\n    return {name}_result"
+    return call
+
+
+def scope_declaration(names: list[str], module_scope: bool) -> str:
+    """The declaration of the names a local function writes into its scope"""
+    return f"{'global' if module_scope else 'nonlocal'} {', '.join(names)}"
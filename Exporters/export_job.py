@@ -0,0 +1,355 @@
+"""Headless part of the export: the traversal of the graph and the
+assembly of the final script, without any UI interaction"""
+import contextlib
+import io
+import os
+import sys
+from datetime import datetime
+from typing import Optional, TextIO
+
+from PyFlow import GET_PACKAGES
+from PyFlow.Core import PinBase, GraphBase
+from PyFlow.Core.version import Version
+
+from .annotations import TYPED_MAIN, TYPED_MAIN_FUNCTION, signature
+from .async_mode import (
+    ASYNC_MAIN, ASYNC_MAIN_FUNCTION, gather_start_pins, prepare_concurrent_start_pins
+)
+from .batch import (
+    BATCH_ASYNC_RUN, BATCH_DRIVER, BATCH_IMPORTS, BATCH_MAIN, BATCH_RUN,
+    batch_function_header, graph_input_pins, graph_inputs_literal
+)
+from .bundle import write_bundle
+from .converter_base import ConverterRegistry
+from .graph_index import GraphIndex
+from .implementation import PythonExporterImpl
+from .instrumentation import ExportProfiler
+from .options import ExportOptions
+from .progress import ExportProgress
+from .script_writer import atomic_open, write_script
+from .shared_library import shared_module_files, split_shared_library, write_shared_library
+from .source_map import SourceMap
+from .start_pins import prepare_pooled_start_pins, run_pooled_start_pins
+
+
+EXPORTER_NAME = "Python exporter"
+EXPORTER_VERSION = Version(1, 0, 0)
+
+
+def creation_date_string() -> str:
+    """The creation date written into the header of the scripts"""
+    return datetime.now().strftime("%I:%M%p on %B %d, %Y")
+
+
+def script_header() -> str:
+    """The header of the exported script (without Qt, e.g. for the
+    command line interface)"""
+    return f"""# -*- coding: utf-8 -*-
+
+\"\"\"This file was auto-generated by PyFlow exporter
+    '{EXPORTER_NAME} v{EXPORTER_VERSION}'
+    Created: {creation_date_string()}
+\"\"\"
+
+EXPORTER_NAME = '{EXPORTER_NAME}'
+EXPORTER_VERSION = '{EXPORTER_VERSION}'
+
+"""
+
+
+# the frames of the traversal per node of an exec chain (export_from_pin,
+# enter_node, process_node, convert_node, _convert_node, the converter and
+# call_named_pin) with some room for the nodes computing their inputs
+TRAVERSAL_FRAMES_PER_NODE = 10
+
+
+def count_nodes(graph: GraphBase) -> int:
+    """Counts the nodes of a graph and of the inner graphs of its compounds"""
+    count = 0
+    graphs = [graph]
+    while graphs:
+        nodes = graphs.pop().getNodesList()
+        count += len(nodes)
+        graphs.extend(inner for node in nodes if (inner := getattr(node, 'rawGraph', None)) is not None)
+    return count
+
+
+@contextlib.contextmanager
+def traversal_recursion_limit(graph: GraphBase):
+    """Raises the recursion limit for the export of a graph: the traversal
+    recurses per node of an exec chain (and per nesting level of the
+    compounds), so a long chain would exceed the default limit (only from
+    Python 3.11 on, where the calls of Python functions don't take the C
+    stack)"""
+    if sys.version_info < (3, 11):
+        yield
+        return
+    previous = sys.getrecursionlimit()
+    limit = max(previous, previous // 2 + TRAVERSAL_FRAMES_PER_NODE*count_nodes(graph))
+    sys.setrecursionlimit(limit)
+    try:
+        yield
+    finally:
+        # not lowered if another export raised it meanwhile (the limit is per process)
+        if sys.getrecursionlimit() == limit:
+            sys.setrecursionlimit(previous)
+
+
+def collect_converters() -> ConverterRegistry:
+    """Gets the converters from all the loaded packages (reuse them for
+    the following exports: they cache the lookups of the converters)"""
+    converters: list[object] = []
+    for pkg in GET_PACKAGES().values():
+        if hasattr(pkg, 'GetCustomClasses'):
+            curconverters = pkg.GetCustomClasses('Converters')
+        elif hasattr(pkg, '_CONVERTERS'):
+            # fallback until analyzePackage gets the second argument
+            curconverters = pkg._CONVERTERS  # pylint: disable=protected-access
+        else:
+            # second fallback until analyzePackage gets the second argument
+            # because normal packages do not have the above 2 attributes
+            curconverters = None
+        if curconverters is not None:
+            converters.extend(curconverters.values())
+    return ConverterRegistry(converters)
+
+
+def find_start_pins(graph: GraphBase, converters: Optional[ConverterRegistry] = None) -> list[PinBase]:
+    """Collects the unconnected entry pins of the nodes (and the exec pins
+    of the graphInputs nodes) of a graph: these are where the export starts
+    (see `GraphIndex.start_pins`)."""
+    return GraphIndex(graph, converters).start_pins
+
+
+class ExportJob:
+    """One export of a root graph into a Python script.
+
+    It doesn't touch any widgets, so it can run on a worker thread
+    (reading a snapshot of the graph) or headless.
+
+    Args:
+        root_graph: the graph to export
+        converters: the converter classes (see `collect_converters`)
+        progress: optional progress reporting and cancellation
+        options: the options of the export
+    """
+
+    def __init__(self,
+                 root_graph: GraphBase,
+                 converters: list[object],
+                 progress: Optional[ExportProgress] = None,
+                 options: Optional[ExportOptions] = None):
+        self._root_graph = root_graph
+        self._converters = converters
+        self._progress = progress
+        self._options = ExportOptions() if options is None else options
+        self._profiler = ExportProfiler() if self._options.profile_export else None
+        self._exporter: Optional[PythonExporterImpl] = None
+        self._source_map: Optional[SourceMap] = None
+        self._shared_modules: dict[str, str] = {}
+
+
+    @property
+    def profiler(self) -> Optional[ExportProfiler]:
+        """The profiler of the export (if `profile_export` is on)"""
+        return self._profiler
+
+
+    @property
+    def exporter(self) -> Optional[PythonExporterImpl]:
+        """The root exporter (available after `run`)"""
+        return self._exporter
+
+
+    @property
+    def source_map(self) -> Optional[SourceMap]:
+        """The source map of the script (with the `source_map` option,
+        available after `write`)"""
+        return self._source_map
+
+
+    @property
+    def shared_modules(self) -> dict[str, str]:
+        """The modules of the shared library by their names (with the
+        `shared_library` option, available after `run`)"""
+        return self._shared_modules
+
+
+    @property
+    def diagnostics(self) -> list[str]:
+        """The diagnostics of the export (available after `run`)"""
+        return [] if self._exporter is None else self._exporter.diagnostics
+
+
+    def run(self) -> PythonExporterImpl:
+        """Traverses the graph from all of its start pins
+
+        Raises:
+            ExportCancelled: if the export was cancelled through `progress`
+        """
+        with traversal_recursion_limit(self._root_graph):
+            return self._traverse()
+
+
+    def _traverse(self) -> PythonExporterImpl:
+        root_exporter = PythonExporterImpl(self._root_graph,
+                                           self._converters,
+                                           progress=self._progress,
+                                           options=self._options,
+                                           profiler=self._profiler)
+        if self._options.batch_mode:
+            # the whole program becomes the body of the graph function
+            input_pins = graph_input_pins(self._root_graph)
+            root_exporter.add_variable('GRAPH_INPUTS', graph_inputs_literal(input_pins))
+            root_exporter.add_call(batch_function_header(input_pins, self._options.async_mode))
+            root_exporter.increase_indent()
+        elif self._options.async_mode:
+            # the whole program becomes the body of the main coroutine
+            root_exporter.add_call(signature(root_exporter, 'async def', ASYNC_MAIN_FUNCTION,
+                                             [], 'None'))
+            root_exporter.increase_indent()
+        elif self._options.type_annotations:
+            # the whole program becomes the body of the main function (no globals)
+            root_exporter.add_call(signature(root_exporter, 'def', TYPED_MAIN_FUNCTION, [], 'None'))
+            root_exporter.increase_indent()
+        # the flows reached from several places become local functions here
+        root_exporter.set_shared_chain_position()
+
+        # iterate over all the start pins
+        startpins = root_exporter.graph_index.start_pins
+        # the keyword defining the functions of the start pins (when they run concurrently)
+        section_def = ''
+        pool = self._options.start_pin_pool
+        if self._options.async_mode:
+            if prepare_concurrent_start_pins(root_exporter, startpins):
+                section_def = 'async def'
+        elif pool:
+            if pool == 'process' and (self._options.batch_mode or self._options.type_annotations):
+                root_exporter.add_diagnostic("the start pins run on threads: a process pool "
+                                             "can't run the inner functions of the "
+                                             f"{'graph' if self._options.batch_mode else 'main'} "
+                                             "function")
+                pool = 'thread'
+            if prepare_pooled_start_pins(root_exporter, startpins):
+                section_def = 'def'
+        for index, start in enumerate(startpins):
+            if self._progress is not None:
+                self._progress.begin_start_pin(index, len(startpins), start.getFullName())
+            if self._profiler is not None:
+                self._profiler.start(ExportProfiler.START_PIN, start.getFullName())
+            root_exporter.add_call(f"""
+
+# ------- {start.getFullName()} -------
+""")
+            if section_def:
+                # each section is a function, they run together at the end
+                root_exporter.add_call(signature(root_exporter, section_def, start.getFullName(),
+                                                 [], 'None'))
+                root_exporter.increase_indent()
+                call_count = root_exporter.call_count
+                root_exporter.export_from_pin(start)
+                if root_exporter.call_count == call_count:
+                    root_exporter.add_call("pass")
+                root_exporter.decrease_indent()
+            else:
+                root_exporter.export_from_pin(start)
+            if self._profiler is not None:
+                self._profiler.stop()
+        if section_def == 'async def':
+            root_exporter.add_call(f"\n{gather_start_pins(startpins)}")
+        elif section_def:
+            root_exporter.add_call(f"\n\n{run_pooled_start_pins(startpins, pool, pool == 'process')}")
+
+        if self._options.batch_mode:
+            root_exporter.decrease_indent()
+            for module_name in BATCH_IMPORTS:
+                root_exporter.add_import(module_name)
+            if self._options.async_mode:
+                root_exporter.add_import('asyncio')
+            root_exporter.add_sys_function(BATCH_ASYNC_RUN if self._options.async_mode else BATCH_RUN)
+            root_exporter.add_sys_function(BATCH_DRIVER)
+            root_exporter.add_call(BATCH_MAIN)
+        elif self._options.async_mode:
+            if root_exporter.call_count == 1:
+                root_exporter.add_call("pass")
+            root_exporter.decrease_indent()
+            root_exporter.add_import('asyncio')
+            root_exporter.add_call(ASYNC_MAIN)
+        elif self._options.type_annotations:
+            if root_exporter.call_count == 1:
+                root_exporter.add_call("pass")
+            root_exporter.decrease_indent()
+            root_exporter.add_call(TYPED_MAIN)
+
+        if self._options.shared_library:
+            if self._profiler is not None:
+                self._profiler.start(ExportProfiler.ASSEMBLY, 'split_shared_library')
+            self._shared_modules = split_shared_library(root_exporter, self._options.shared_library)
+            if self._profiler is not None:
+                self._profiler.stop()
+
+        self._exporter = root_exporter
+        return root_exporter
+
+
+    def write(self, stream: TextIO, header: str):
+        """Writes the final script into a text stream section-by-section"""
+        root_exporter = self._exporter
+        if root_exporter is None:
+            root_exporter = self.run()
+        if self._profiler is not None:
+            self._profiler.start(ExportProfiler.ASSEMBLY, 'write_script')
+        if self._options.source_map:
+            self._source_map = SourceMap(getattr(stream, 'name', ''))
+        write_script(stream, root_exporter, header, self._source_map)
+        if self._profiler is not None:
+            self._profiler.stop()
+
+
+    def render(self, header: str) -> str:
+        """Assembles the final script from the results of `run` into a string"""
+        buffer = io.StringIO()
+        self.write(buffer, header)
+        return buffer.getvalue()
+
+
+    def save(self, out_file_path: str, header: str):
+        """Writes the final script into a file (atomically: a partial file
+        never appears) or to the standard output if the path is '-'.
+
+        With `profile_export` the profile summary is written next to the
+        file (`<out_file_path>.profile.txt`) or to stderr. With `source_map`
+        the map is written next to the file (`<out_file_path>.map.json`).
+        With `bundle` the byte code (and the zipapp) is written next to the
+        file (not for the standard output). With `shared_library` the
+        modules of the library not written yet are written into its package
+        next to the file (and into the zipapp).
+        """
+        if out_file_path == '-':
+            self.write(sys.stdout, header)
+            sys.stdout.flush()
+            if self._profiler is not None:
+                print(self._profiler.format_summary(), file=sys.stderr)
+            if self._options.bundle and self._exporter is not None:
+                self._exporter.add_diagnostic("no bundle is written for the standard output")
+            if self._options.shared_library and self._exporter is not None:
+                self._exporter.add_diagnostic("the shared library is not written for the "
+                                              "standard output")
+            return
+        with atomic_open(out_file_path) as f:
+            self.write(f, header)
+            if self._progress is not None:
+                # still not too late: the file is not renamed yet
+                self._progress.check_cancelled()
+        if self._profiler is not None:
+            self._profiler.write_summary(out_file_path+'.profile.txt')
+        if self._source_map is not None:
+            self._source_map.script = os.path.abspath(out_file_path)
+            self._source_map.save(out_file_path+'.map.json')
+        if self._options.shared_library:
+            write_shared_library(os.path.dirname(os.path.abspath(out_file_path)),
+                                 self._options.shared_library, self._shared_modules)
+        if self._options.bundle:
+            write_bundle(out_file_path, self._options.bundle,
+                         shared_module_files(self._options.shared_library, self._shared_modules)
+                         if self._options.shared_library else None)
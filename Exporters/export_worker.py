@@ -0,0 +1,278 @@
+"""Running the export on a worker thread, so the GUI doesn't freeze
+during the export of large graphs"""
+import sys
+import time
+import traceback
+from typing import Callable, Optional
+
+from qtpy.QtCore import QObject, QThread, QTimer, Signal, Slot  # pylint: disable=no-name-in-module
+from qtpy.QtWidgets import QMessageBox, QProgressDialog, QWidget  # pylint: disable=no-name-in-module
+
+from PyFlow.Core.GraphManager import GraphManager
+
+from .export_job import ExportJob
+from .options import ExportOptions
+from .progress import ExportCancelled, ExportProgress
+
+
+class ExportWorker(QObject):
+    """Exports a snapshot of a graph on a worker thread.
+
+    The worker never touches the live graph (it works on a graph manager
+    deserialized from `graph_data`) nor any widgets: it only reports
+    through its signals.
+
+    Args:
+        graph_data: the serialized graph manager (`GraphManager.serialize()`)
+        converters: the converter classes to use
+        out_file_path: where to save the script
+        header: the header of the script
+        options: the options of the export
+    """
+
+    progress = Signal(int, int, int, str)  # start index, start count, nodes processed, start name
+    saved = Signal(str)  # saved file path
+    failed = Signal(str)  # error message
+    cancelled = Signal()
+    done = Signal()  # emitted after any of the above three
+
+    # minimum time between two progress signals about processed nodes
+    progress_interval = 0.05
+
+    def __init__(self,
+                 graph_data: dict,
+                 converters: list[object],
+                 out_file_path: str,
+                 header: str,
+                 options: Optional[ExportOptions] = None):
+        super().__init__()
+        self._graph_data = graph_data
+        self._converters = converters
+        self._out_file_path = out_file_path
+        self._header = header
+        self._options = options
+        self._progress = ExportProgress(self._on_progress)
+        self._last_progress_time = 0.0
+        self._last_start_index = -1
+
+
+    def cancel(self):
+        """Requests the cancellation of the export (thread-safe)"""
+        self._progress.cancel()
+
+
+    @Slot()
+    def run(self):
+        """Runs the export (connect it to `QThread.started`)"""
+        try:
+            self._progress.check_cancelled()
+            graph_manager = GraphManager()
+            graph_manager.deserialize(self._graph_data)
+            job = ExportJob(graph_manager.findRootGraph(),
+                            self._converters,
+                            self._progress,
+                            self._options)
+            job.run()
+            job.save(self._out_file_path, self._header)
+            for diagnostic in job.diagnostics:
+                print(diagnostic, file=sys.stderr)
+            self.saved.emit(self._out_file_path)
+        except ExportCancelled:
+            self.cancelled.emit()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            traceback.print_exc()
+            self.failed.emit(str(e))
+        self.done.emit()
+
+
+    def _on_progress(self, start_index: int, start_count: int, nodes: int, start_name: str):
+        # throttle the node counter updates, but always report a new start pin
+        now = time.monotonic()
+        if start_index == self._last_start_index and \
+           now - self._last_progress_time < self.progress_interval:
+            return
+        self._last_start_index = start_index
+        self._last_progress_time = now
+        self.progress.emit(start_index, start_count, nodes, start_name)
+
+
+def run_in_thread(worker: ExportWorker) -> QThread:
+    """Moves the worker onto a new thread and starts it. The thread quits
+    when the worker is done."""
+    thread = QThread()
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    worker.done.connect(thread.quit)
+    thread.start()
+    return thread
+
+
+class ExportController(QObject):
+    """Lives on the GUI thread: shows the progress of a background export,
+    lets the user cancel it and shows the results.
+
+    Args:
+        parent: the parent widget of the progress dialog and message boxes
+        worker: the worker to run
+    """
+
+    # keeps the running exports alive until they are done
+    _running: list["ExportController"] = []
+
+    def __init__(self, parent: Optional[QWidget], worker: ExportWorker):
+        super().__init__()
+        self._parent = parent
+        self._worker = worker
+        self._dialog = QProgressDialog("Exporting...", "Cancel", 0, 0, parent)
+        self._dialog.setWindowTitle("Python exporter")
+        self._dialog.setMinimumDuration(500)
+        self._dialog.canceled.connect(self._worker.cancel)
+        self._worker.progress.connect(self.on_progress)
+        self._worker.saved.connect(self.on_saved)
+        self._worker.failed.connect(self.on_failed)
+        self._worker.cancelled.connect(self.on_cancelled)
+        self._worker.done.connect(self.on_done)
+        self._thread: Optional[QThread] = None
+
+
+    @classmethod
+    def start(cls, parent: Optional[QWidget], worker: ExportWorker) -> "ExportController":
+        """Starts the worker on a new thread with a progress dialog"""
+        controller = cls(parent, worker)
+        cls._running.append(controller)
+        controller._thread = run_in_thread(worker)  # pylint: disable=protected-access
+        return controller
+
+
+    @Slot(int, int, int, str)
+    def on_progress(self, start_index: int, start_count: int, nodes: int, start_name: str):
+        """Updates the progress dialog"""
+        self._dialog.setMaximum(start_count)
+        self._dialog.setValue(start_index)
+        self._dialog.setLabelText(f"Exporting {start_name} ({start_index+1}/{start_count})\n"
+                                  f"{nodes} nodes processed")
+
+    @Slot(str)
+    def on_saved(self, out_file_path: str):  # pylint: disable=unused-argument
+        """Reports the successful export"""
+        print('saved!')
+
+    @Slot(str)
+    def on_failed(self, message: str):
+        """Reports the failed export"""
+        QMessageBox.critical(self._parent, "Error", f"Export failed!\n{message}")
+
+    @Slot()
+    def on_cancelled(self):
+        """Reports the cancelled export"""
+        print('export cancelled')
+
+    @Slot()
+    def on_done(self):
+        """Cleans up after the worker"""
+        self._dialog.reset()
+        if self._thread is not None:
+            # connected before the thread's own quit: waiting for the
+            # thread without quitting it would block the GUI forever
+            self._thread.quit()
+            self._thread.wait()
+        self._running.remove(self)
+
+
+class ExportOnEdit(QObject):
+    """The watch mode of the editor: lives on the GUI thread and exports
+    the graph again in the background after its edits. Each edit restarts
+    the debounce timer, so a burst of edits is exported once, and an edit
+    during an export is exported after it. All the exports reuse the
+    converters.
+
+    Args:
+        graph_manager: the graph manager of the editor
+        converters: the converter classes (see `collect_converters`)
+        out_file_path: where to save the script
+        header: gets the header of the script (at each export)
+        options: the options of the exports
+        debounce: the seconds without edits before the export
+    """
+
+    exported = Signal(str, float)  # saved file path, seconds of the export
+
+    def __init__(self,
+                 graph_manager: GraphManager,
+                 converters: list[object],
+                 out_file_path: str,
+                 header: Callable[[], str],
+                 options: Optional[ExportOptions] = None,
+                 debounce: float = 0.3):
+        super().__init__()
+        self._graph_manager = graph_manager
+        self._converters = converters
+        self._out_file_path = out_file_path
+        self._header = header
+        self._options = options
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(int(debounce*1000))
+        self._timer.timeout.connect(self.export)
+        self._edited = None
+        self._worker: Optional[ExportWorker] = None
+        self._thread: Optional[QThread] = None
+        self._pending = False
+        self._started = 0.0
+
+
+    def start(self, edited):
+        """Starts watching the edits: `edited` is a signal of PyFlow
+        (e.g. `EditorHistory.statePushed`) sent after each edit"""
+        self._edited = edited
+        edited.connect(self.on_edit)
+
+
+    def stop(self):
+        """Stops watching (a running export still finishes)"""
+        if self._edited is not None:
+            self._edited.disconnect(self.on_edit)
+            self._edited = None
+        self._timer.stop()
+        self._pending = False
+
+
+    def on_edit(self, *args):  # pylint: disable=unused-argument
+        """(Re)starts the debounce timer after an edit"""
+        self._timer.start()
+
+
+    @Slot()
+    def export(self):
+        """Exports a snapshot of the graph in the background (after the
+        running export if there is one)"""
+        if self._thread is not None:
+            self._pending = True
+            return
+        self._started = time.perf_counter()
+        self._worker = ExportWorker(self._graph_manager.serialize(),
+                                    self._converters,
+                                    self._out_file_path,
+                                    self._header(),
+                                    self._options)
+        self._worker.saved.connect(self._on_saved)
+        self._worker.done.connect(self._on_done)
+        self._thread = run_in_thread(self._worker)
+
+
+    @Slot(str)
+    def _on_saved(self, out_file_path: str):
+        self.exported.emit(out_file_path, time.perf_counter()-self._started)
+
+
+    @Slot()
+    def _on_done(self):
+        if self._thread is not None:
+            # `done` may reach us before the thread's own quit
+            self._thread.quit()
+            self._thread.wait()
+        self._thread = None
+        self._worker = None
+        if self._pending:
+            self._pending = False
+            self.export()
@@ -0,0 +1,198 @@
+"""Index of a graph for its export: the nodes, their pins and links read
+once from PyFlow's objects, so the traversal of the export looks them up
+in dicts (by the ids of the objects) instead of walking the live graph
+again for each pin (e.g. copying `affected_by` or finding a pin by name).
+
+The index is a snapshot: the graph must not change during the export
+(like the snapshot exported on a worker thread)."""
+from typing import NamedTuple, Optional
+
+from PyFlow.Core import GraphBase, NodeBase, PinBase
+
+from .converter_base import ConverterRegistry
+
+
+class PinRecord(NamedTuple):
+    """The indexed data of a pin"""
+    pin: PinBase
+    node: int
+    """the index of the owning node (-1 if it is not in the graph)"""
+    is_exec: bool
+    connected: bool
+    """`hasConnections` of the pin"""
+    sources: tuple[PinBase, ...]
+    """the pins affecting the pin (`affected_by`)"""
+    targets: tuple[PinBase, ...]
+    """the pins affected by the pin (`affects`)"""
+
+
+def _pin_record(pin: PinBase, node: int) -> PinRecord:
+    return PinRecord(pin, node, pin.isExec(), pin.hasConnections(),
+                     tuple(pin.affected_by), tuple(pin.affects))
+
+
+class GraphIndex:
+    """The index of the nodes, pins and links of a graph
+
+    Attributes:
+        nodes: the nodes of the graph (a node id is its index in it)
+        node_classes: the class names of the nodes by node ids
+        inputs: the ordered input pins by node ids
+        outputs: the ordered output pins by node ids
+        graph_inputs: the graphInputs nodes
+        graph_outputs: the graphOutputs nodes
+        start_pins: the pins where the export of the graph starts: the
+                    unconnected entry pins of the nodes (see `entry_pins`)
+                    and the exec pins of the graphInputs nodes
+
+    Args:
+        graph: the indexed graph
+        converters: the converters of the export: an input exec pin with
+                    an `execin_<Node>_<Pin>` converter (e.g. the Break pin
+                    of a loop) acts on a running node, it doesn't enter it
+    """
+
+    def __init__(self, graph: GraphBase, converters: Optional[ConverterRegistry] = None):
+        self.nodes: list[NodeBase] = graph.getNodesList()
+        self._node_ids: dict[int, int] = {id(node): node_id for node_id, node in enumerate(self.nodes)}
+        self.node_classes: list[str] = [node.__class__.__name__ for node in self.nodes]
+        self.inputs: list[tuple[PinBase, ...]] = []
+        self.outputs: list[tuple[PinBase, ...]] = []
+        self._inputs_by_name: list[dict[str, PinBase]] = []
+        self._outputs_by_name: list[dict[str, PinBase]] = []
+        self._pins: dict[int, PinRecord] = {}
+        self.graph_inputs: list[NodeBase] = []
+        self.graph_outputs: list[NodeBase] = []
+        self.start_pins: list[PinBase] = []
+        self._entry_pins: list[list[PinBase]] = []
+        self._fan_in: set[int] = set()
+        for node_id, node in enumerate(self.nodes):
+            inputs = tuple(node.orderedInputs.values())
+            outputs = tuple(node.orderedOutputs.values())
+            self.inputs.append(inputs)
+            self.outputs.append(outputs)
+            self._inputs_by_name.append({pin.name: pin for pin in reversed(inputs)})
+            self._outputs_by_name.append({pin.name: pin for pin in reversed(outputs)})
+            for pin in inputs + outputs:
+                self._pins[id(pin)] = _pin_record(pin, node_id)
+            exec_inputs = [pin for pin in inputs if self._pins[id(pin)].is_exec]
+            self._fan_in.update(id(pin) for pin in exec_inputs
+                                if sum(1 for source in self._pins[id(pin)].sources
+                                       if source.isExec()) > 1)
+            entry_pins = exec_inputs if converters is None else [
+                pin for pin in exec_inputs
+                if converters.find_method(f"execin_{self.node_classes[node_id]}_{pin.name}") is None]
+            self._entry_pins.append(entry_pins)
+            self.start_pins.extend(pin for pin in entry_pins if not self._pins[id(pin)].connected)
+            if self.node_classes[node_id] == "graphInputs":
+                self.graph_inputs.append(node)
+                self.start_pins.extend(pin for pin in node.outputs.values() if pin.isExec())
+            elif self.node_classes[node_id] == "graphOutputs":
+                self.graph_outputs.append(node)
+
+
+    def record(self, pin: PinBase) -> PinRecord:
+        """Gets the record of a pin (the pins out of the graph are indexed
+        when they are first looked up)"""
+        record = self._pins.get(id(pin))
+        if record is None:
+            record = self._pins[id(pin)] = _pin_record(pin, -1)
+        return record
+
+
+    def node_id(self, node: NodeBase) -> int:
+        """Gets the id of a node (-1 if it is not in the graph)"""
+        return self._node_ids.get(id(node), -1)
+
+
+    def node_class(self, node: NodeBase) -> str:
+        """Gets the class name of a node"""
+        node_id = self._node_ids.get(id(node))
+        return node.__class__.__name__ if node_id is None else self.node_classes[node_id]
+
+
+    def owner(self, pin: PinBase) -> NodeBase:
+        """Gets the node owning a pin"""
+        node_id = self.record(pin).node
+        return pin.owningNode() if node_id < 0 else self.nodes[node_id]
+
+
+    def sources(self, pin: PinBase) -> tuple[PinBase, ...]:
+        """Gets the pins affecting a pin (its connected outputs for an input)"""
+        return self.record(pin).sources
+
+
+    def targets(self, pin: PinBase) -> tuple[PinBase, ...]:
+        """Gets the pins affected by a pin (its connected inputs for an output)"""
+        return self.record(pin).targets
+
+
+    def is_exec(self, pin: PinBase) -> bool:
+        """Returns true for an exec pin"""
+        return self.record(pin).is_exec
+
+
+    def is_connected(self, pin: PinBase) -> bool:
+        """Returns true if the pin has connections"""
+        return self.record(pin).connected
+
+
+    def is_fan_in(self, pin: PinBase) -> bool:
+        """Returns true for an input exec pin which the exec flow reaches
+        from several output exec pins"""
+        return id(pin) in self._fan_in
+
+
+    def node_inputs(self, node: NodeBase) -> tuple[PinBase, ...]:
+        """Gets the ordered input pins of a node"""
+        node_id = self._node_ids.get(id(node))
+        return tuple(node.orderedInputs.values()) if node_id is None else self.inputs[node_id]
+
+
+    def node_outputs(self, node: NodeBase) -> tuple[PinBase, ...]:
+        """Gets the ordered output pins of a node"""
+        node_id = self._node_ids.get(id(node))
+        return tuple(node.orderedOutputs.values()) if node_id is None else self.outputs[node_id]
+
+
+    def input_pin(self, node: NodeBase, name: str) -> Optional[PinBase]:
+        """Gets an input pin of a node by its name"""
+        node_id = self._node_ids.get(id(node))
+        if node_id is None:
+            return next((pin for pin in node.orderedInputs.values() if pin.name == name), None)
+        return self._inputs_by_name[node_id].get(name)
+
+
+    def output_pin(self, node: NodeBase, name: str) -> Optional[PinBase]:
+        """Gets an output pin of a node by its name"""
+        node_id = self._node_ids.get(id(node))
+        if node_id is None:
+            return next((pin for pin in node.orderedOutputs.values() if pin.name == name), None)
+        return self._outputs_by_name[node_id].get(name)
+
+
+    def exec_inputs(self, node: NodeBase) -> list[PinBase]:
+        """Gets the ordered input exec pins of a node"""
+        return [pin for pin in self.node_inputs(node) if self.record(pin).is_exec]
+
+
+    def entry_pins(self, node: NodeBase) -> list[PinBase]:
+        """Gets the input exec pins entering a node (without the ones
+        acting on a running node, e.g. the Break pin of a loop)"""
+        node_id = self._node_ids.get(id(node))
+        return self.exec_inputs(node) if node_id is None else self._entry_pins[node_id]
+
+
+    def exec_outputs(self, node: NodeBase) -> list[PinBase]:
+        """Gets the ordered output exec pins of a node"""
+        return [pin for pin in self.node_outputs(node) if self.record(pin).is_exec]
+
+
+    def data_inputs(self, node: NodeBase) -> list[PinBase]:
+        """Gets the ordered input pins of a node which are no exec pins"""
+        return [pin for pin in self.node_inputs(node) if not self.record(pin).is_exec]
+
+
+    def data_outputs(self, node: NodeBase) -> list[PinBase]:
+        """Gets the ordered output pins of a node which are no exec pins"""
+        return [pin for pin in self.node_outputs(node) if not self.record(pin).is_exec]
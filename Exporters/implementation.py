@@ -1,8 +1,43 @@
 """Implementation module of PyFlow graph exporter into pure Python scripts"""
+import contextlib
+import itertools
 from typing import Callable, Iterator, Optional
 
 from PyFlow.Core import PinBase, GraphBase, NodeBase
-from PyFlow.Core.Common import PinSelectionGroup
+
+from .annotations import annotated, pin_annotation, pin_signature, signature
+from .async_mode import def_keyword
+from .converter_base import ConverterRegistry
+from .dependencies import has_exec_pins
+from .exec_paths import BodyInfo, SharedChain, analyse_body, scope_declaration, shared_chain_call
+from .graph_index import GraphIndex
+from .instrumentation import ExportProfiler
+from .lazy_imports import lazy_imports_code
+from .options import ExportOptions
+from .pin_types import constant_expr
+from .progress import ExportProgress
+from .runtime_profile import (
+    RUNTIME_PROFILE_IMPORTS, RUNTIME_PROFILE_SETUP, RUNTIME_PROFILE_SETUP_ID, wrap_statement
+)
+from .source_map import Origin, OriginSpans, join_mapped, shift_spans
+from .structure import structure_hash
+
+
+def imports_code(imports: list[str|tuple[str,str|None]|tuple[str,list[str]]]) -> str:
+    """Gets the import statements of the imports (in the format of
+    `PythonExporterImpl.get_imports_list`)"""
+    prg=""
+    for imp in imports:
+        if isinstance(imp, str):
+            prg+=f"import {imp}\n"
+        elif isinstance(imp[1], str):
+            prg+=f"import {imp[0]} as {imp[1]}\n"
+        elif isinstance(imp[1], list):
+            prg_part=f"from {imp[0]} import ("
+            prg+=f"{prg_part}{(f',{chr(10)}'+' '*len(prg_part)).join(imp[1])}){chr(10)}"
+    while len(prg)>0 and prg[-1] == '\n':
+        prg = prg[:-1]
+    return prg
 
 
 class PythonExporterImpl:
@@ -12,60 +47,292 @@ class PythonExporterImpl:
                  graph: GraphBase,
                  converter_classes: list[object],
                  indent = 0,
-                 exported_node_functions: Optional[dict] = None):
+                 exported_node_functions: Optional[dict] = None,
+                 parent: Optional["PythonExporterImpl"] = None,
+                 progress: Optional[ExportProgress] = None,
+                 options: Optional[ExportOptions] = None,
+                 profiler: Optional[ExportProfiler] = None):
         self._graph = graph
+        self._parent = parent
         self._visited_nodes = {}
         self._exported_node_functions = {} if exported_node_functions is None \
                                         else exported_node_functions
         self._imports: list[str|tuple[str,str|None]|tuple[str,list[str]]] = []
         self._setups: dict[str, str] = {}
-        self._variables = "VARS = {}\n"
-        self._sys_function_part = ""
-        self._function_part = ""
-        self._calling_part = ""
+        # the code-parts are kept as lists of chunks, so they can be
+        # streamed into the output without joining them first
+        self._sys_function_part: list[str] = []
+        self._function_part: list[str] = []
+        self._calling_part: list[str] = []
+        # the origins of the chunks above (only with the `source_map` option)
+        self._sys_function_origins: list[Optional[OriginSpans]] = []
+        self._function_origins: list[Optional[OriginSpans]] = []
+        self._calling_origins: list[Optional[OriginSpans]] = []
         self._indent = indent
-        self._converter_classes = converter_classes
+        # shared by the subexporters (and by the exports reusing the registry)
+        self._converter_classes = converter_classes \
+            if isinstance(converter_classes, ConverterRegistry) else ConverterRegistry(converter_classes)
+        # these are shared by the whole export: subexporters use the root's
+        if parent is None:
+            self._progress = progress
+            self._options = ExportOptions() if options is None else options
+            self._profiler = profiler
+            self._diagnostics: list[str] = []
+            # the structural hashes of the inner graphs of compounds by their ids
+            self._structure_hashes: dict[int, str] = {}
+            # the indexes of the exported graphs by their ids
+            self._graph_indexes: dict[int, GraphIndex] = {}
+            # the names of the exported functions which are coroutines
+            self._coroutines: set[str] = set()
+        else:
+            self._progress = parent.progress
+            self._options = parent.options
+            self._profiler = parent.profiler
+            self._diagnostics = parent.diagnostics
+            self._structure_hashes = parent.structure_hashes
+            self._graph_indexes = parent.graph_indexes
+            self._coroutines = parent.coroutines
+        self._index = self.index_of(graph)
+        # (quoted: the variables come before the imports in the script)
+        self._variables = f"{annotated(self, 'VARS', repr('dict[str, Any]'))} = {{}}\n"
+        # the outputs declared with their types (with the `type_annotations` option)
+        self._declared_names: set[str] = set()
+        self._convert_depth = 0
+        self._node_stack: list[NodeBase] = []
+        self._converter_stack: list[str] = []
+        # the exec edges already followed (by the ids of their pins) and the
+        # input exec pins the nodes were last entered through (by their paths)
+        self._visited_edges: set[tuple[int, int]] = set()
+        self._entry_pins: dict[str, PinBase] = {}
+        # the local functions of the exec flows entering a pin from several
+        # places (by the ids of the pins), see `exec_paths`
+        self._shared_chains: dict[int, SharedChain] = {}
+        # where they are defined (the index of the chunk and the indent)
+        self._shared_position = 0
+        self._shared_indent = indent
+        # the starts of the bodies of the local functions being converted
+        self._shared_body_starts: list[int] = []
+        # the declarations of the outputs first assigned in those bodies
+        self._hoisted_declarations: list[list[str]] = []
+        # the nodes processed in the conditional parts being converted
+        self._processed_logs: list[list[NodeBase]] = []
 
 
     ################################
     ###        PROCESSING        ###
     ################################
-    def export_from_pin(self, pin: PinBase):
-        """Export part of the graph which starts with this Exec Pin"""
-        if not pin.isExec():
+    def export_from_pin(self, pin: PinBase, source: Optional[PinBase] = None):
+        """Export part of the graph which starts with this Exec Pin
+
+        Args:
+            pin: the exec pin
+            source: the output exec pin the flow comes from (None for a
+                    start pin)
+        """
+        if not self._index.is_exec(pin):
             return
 
         # get the owning node
-        owning_node: NodeBase | None = pin.owningNode()
+        owning_node: NodeBase | None = self._index.owner(pin)
         if not isinstance(owning_node, NodeBase):
             return
-        if owning_node.__class__.__name__=="graphInputs":
-            # add the input parameters in _variables
-            for parampin in owning_node.orderedOutputs.values():
-                if not parampin.isExec():
-                    self.add_variable(parampin.name, repr(parampin.currentData()))
-            # start with the node where the exec pin points
-            if len(pin.affects)==0:
-                return
-            owning_node = list(pin.affects)[0].owningNode()
+        node_class = self._index.node_class(owning_node)
+        if node_class=="graphInputs":
+            # add the input parameters in _variables (in batch mode they
+            # are the parameters of the graph function instead)
+            if not (self._options.batch_mode and self._parent is None):
+                for parampin in self._index.data_outputs(owning_node):
+                    self.add_variable(annotated(self, parampin.name, pin_annotation(parampin)),
+                                      repr(parampin.currentData()))
+            # start with the nodes where the exec pin points
+            for target in self._index.targets(pin):
+                self.export_from_pin(target, pin)
+            return
+        if (method := self.get_converter_method(
+                f"execin_{node_class}_{pin.name}")) is not None:
+            # a converter for an additional input exec pin (e.g. a Break pin):
+            # the flow enters a node which is already converted
+            method(self, owning_node, pin)
+            return
 
+        if source is not None and (self._index.is_fan_in(pin) or
+                                   len(self.entry_pins(self._index.owner(source)))>1):
+            # reached from several places (or from a node converted once per
+            # entry pin): converted once, called from each
+            self.call_shared_chain(pin, owning_node)
+            return
+        # each exec edge is converted once
+        edge = (id(source), id(pin))
+        if edge in self._visited_edges:
+            return
+        self._visited_edges.add(edge)
         # convert the graph
-        self.process_node(owning_node)  # type: ignore
-
-
-    def process_node(self, node: NodeBase, *args, **kwargs):
+        self.enter_node(owning_node, pin)
+
+
+    def enter_node(self, node: NodeBase, pin: PinBase):
+        """Converts a node entered by the exec flow through an input exec
+        pin. A node with several input exec pins (e.g. a compound) is
+        converted again when it is entered through another one."""
+        entered = self._entry_pins.get(node.path())
+        self._entry_pins[node.path()] = pin
+        if entered is not None and entered is not pin and len(self.entry_pins(node))>1:
+            self.unset_node_processed(node)
+        self.process_node(node)
+
+
+    def entry_pins(self, node: NodeBase) -> list[PinBase]:
+        """Gets the input exec pins entering a node (without the ones
+        acting on a running node, e.g. the Break pin of a loop)"""
+        return self._index.entry_pins(node)
+
+
+    def entry_pin(self, node: NodeBase) -> Optional[PinBase]:
+        """Gets the input exec pin the node was (last) entered through
+        (None if the exec flow didn't enter it, e.g. a pure node)"""
+        return self._entry_pins.get(node.path())
+
+
+    def call_shared_chain(self, pin: PinBase, node: NodeBase):
+        """Calls the local function converted from the exec flow entering
+        the node through the pin (converts it at the first call)"""
+        chain = self._shared_chains.get(id(pin))
+        if chain is None:
+            chain = self._convert_shared_chain(pin, node)
+        self.add_call(chain.call)
+
+
+    def _convert_shared_chain(self, pin: PinBase, node: NodeBase) -> SharedChain:
+        name = pin.getFullName()
+        # a flow looping back to the pin calls the function being converted
+        self._shared_chains[id(pin)] = SharedChain(name, f"{name}()")
+        indent = self._indent
+        self._indent = self._shared_indent + 1
+        self._shared_body_starts.append(len(self._calling_part))
+        self._hoisted_declarations.append([])
+        try:
+            with self.conditional_part():
+                self.enter_node(node, pin)
+        finally:
+            self._indent = indent
+            start = self._shared_body_starts.pop()
+            declarations = self._hoisted_declarations.pop()
+        body = self._calling_part[start:]
+        body_origins = self._calling_origins[start:]
+        del self._calling_part[start:]
+        del self._calling_origins[start:]
+
+        info = analyse_body(''.join(body))
+        chain = SharedChain(name, shared_chain_call(name, info))
+        self._shared_chains[id(pin)] = chain
+        definition, declaration = self._local_scope(info, declarations)
+        definition += signature(self, 'async def' if info.awaits else 'def', name, [],
+                                'Any' if info.returns_on_some_paths else 'None')
+        if declaration:
+            definition += f"\n    {declaration}"
+        elif not body:
+            definition += "\n    pass"
+        chunks = [self.indent_text(definition, self._shared_indent)+'\n'] + body + ['\n']
+        origins = [self.current_origin_spans()] + body_origins + [self.current_origin_spans()]
+        self._insert_calls(self._shared_position, chunks, origins)
+        return chain
+
+
+    def _local_scope(self, info: BodyInfo, declarations: list[str]) -> tuple[str, str]:
+        """Gets what makes the names a local function assigns visible to
+        the flow after its calls: the statements before its definition (the
+        hoisted declarations of the outputs and, in a function, a binding of
+        the other names) and the declaration of the names in its body"""
+        if not info.assigned:
+            return ''.join(declarations), ''
+        module_scope = self._parent is None and self._shared_indent == 0
+        before = ''.join(declarations)
+        if not module_scope:
+            # the names written by `nonlocal` need a binding in the scope
+            declared = {declaration.partition(':')[0] for declaration in declarations}
+            prebound = [assigned for assigned in info.assigned
+                        if assigned not in declared and assigned not in self._declared_names]
+            if prebound:
+                before += f"{' = '.join(prebound)} = None\n"
+        return before, scope_declaration(info.assigned, module_scope)
+
+
+    @contextlib.contextmanager
+    def local_function(self, header: str):
+        """Converts the statements added in its block into the body of a
+        local function defined by `header` at the current indent (e.g. a
+        parallel branch): the names the body assigns are declared nonlocal
+        or global in it, so the flow after its call can read them"""
+        position = len(self._calling_part)
+        self.add_call(header)
+        self.increase_indent()
+        self._hoisted_declarations.append([])
+        try:
+            yield
+            if self.call_count == position+1:
+                self.add_call("pass")
+        finally:
+            self.decrease_indent()
+            declarations = self._hoisted_declarations.pop()
+        body = self._calling_part[position+1:]
+        before, declaration = self._local_scope(analyse_body(''.join(body)), declarations)
+        origins = [self.current_origin_spans()]
+        if declaration:
+            self._insert_calls(position+1, [self.indent_text(declaration, self._indent+1)+'\n'], origins)
+        if before:
+            self._insert_calls(position, [self.indent_text(before.rstrip('\n'))+'\n'], origins)
+
+
+    def _insert_calls(self, position: int, chunks: list[str], origins: list[OriginSpans]):
+        """Inserts chunks into the main program part before the one at
+        `position` (e.g. the local functions are defined there)"""
+        self._calling_part[position:position] = chunks
+        if self._options.source_map:
+            self._calling_origins[position:position] = origins
+        if position <= self._shared_position:
+            self._shared_position += len(chunks)
+        self._shared_body_starts = [start+len(chunks) if start >= position else start
+                                    for start in self._shared_body_starts]
+
+
+    def set_shared_chain_position(self):
+        """Sets where the local functions of the exec flows entering a pin
+        from several places are defined: here, at the current indent (call
+        it at the start of the body of the main function)"""
+        self._shared_position = len(self._calling_part)
+        self._shared_indent = self._indent
+
+
+    @contextlib.contextmanager
+    def conditional_part(self):
+        """Converts a part of the flow which doesn't run on all paths
+        (e.g. an entry of a compound): the pure nodes processed in it are
+        processed again after it when they are needed"""
+        log: list[NodeBase] = []
+        self._processed_logs.append(log)
+        try:
+            yield
+        finally:
+            self._processed_logs.pop()
+            for node in log:
+                if not has_exec_pins(node):
+                    self.unset_node_processed(node)
+
+
+    def process_node(self, node: NodeBase):
         """This is the gist of the converter: Process one PyFlow Node"""
         if self.is_node_processed(node):
             return
+        if self._progress is not None:
+            self._progress.check_cancelled()
 
         # handle input pins
         allinpnames: list[str] = []
         allparnames: list[str] = []
-        for inpin in node.orderedInputs.values():
-            if not inpin.isExec():
-                curparnames, curinpnames = self.process_pin(inpin)
-                allparnames.extend(curparnames)
-                allinpnames.extend(curinpnames)
+        for inpin in self._index.data_inputs(node):
+            curparnames, curinpnames = self.process_pin(inpin)
+            allparnames.extend(curparnames)
+            allinpnames.extend(curinpnames)
 
         # handle the current node and follow its exec pins
         if self.is_node_processed(node):
@@ -73,7 +340,7 @@ class PythonExporterImpl:
             # the previous steps)
             return
 
-        self.convert_node(node, allparnames, allinpnames, *args, **kwargs)
+        self.convert_node(node, allparnames, allinpnames)
 
 
     def process_pin(self, pin: PinBase) -> tuple[list, list]:
@@ -86,31 +353,32 @@ class PythonExporterImpl:
         """
         parnames: list[str] = []
         inpnames: list[str] = []
-        # convert the inputs and its sources
-        # TODO: multiple connections
+        # convert the inputs and its sources (an input allowing multiple
+        # connections, e.g. the data pin of makeArray, gets all of them)
         parnames.append(pin.name)
-        if len(list(pin.affected_by))==0:
+        sources = self._index.sources(pin)
+        if len(sources)==0:
             # pin is holding a constant value
-            if pin.dataType=='StringPin':
-                inpnames.append(f"{repr(str(pin.currentData()))}")
-            elif pin.dataType in ['BoolPin', 'FloatPin', 'IntPin']:
-                inpnames.append(f"{str(pin.currentData())}")
-            # TODO: handle other data types
+            if (constant := constant_expr(pin)) is not None:
+                inpnames.append(constant)
+            else:
+                self.add_diagnostic(f"the {type(pin.currentData()).__name__} constant of "
+                                    f"pin {pin.name} can't be embedded into the script")
         else:
             # pin is connected to an input -> we find the full name of the
             # `affected_by` pins
+            _inpnodes = [self._index.owner(affpin) for affpin in sources]
             inpnames.extend(
                 [
-                    affpin.name if affpin.owningNode().__class__.__name__=="graphInputs"
+                    affpin.name if self._index.node_class(inpnode)=="graphInputs"
                     else affpin.getFullName()
-                    for affpin in list(pin.affected_by)
+                    for affpin, inpnode in zip(sources, _inpnodes)
                 ]
             )
-            _inpnodes = [affpin.owningNode() for affpin in list(pin.affected_by)]
             # check if they were already exported and process them as neccessary
             for inpnode in _inpnodes:
                 if not self.is_node_processed(inpnode) and \
-                        inpnode.__class__.__name__!="graphInputs":
+                        self._index.node_class(inpnode)!="graphInputs":
                     self.process_node(inpnode)
 
         return parnames, inpnames
@@ -119,35 +387,92 @@ class PythonExporterImpl:
     def convert_node(self,
                      node: NodeBase,
                      parnames: list[str],
-                     inpnames: list[str],
-                     *args,
-                     **kwargs):
+                     inpnames: list[str]):
         """Do the actual conversion of one Node to Python"""
+        # no `*args` passed on in the recursion of the traversal: CPython
+        # doesn't inline such a call of a method, it would take a level of
+        # the C stack per node and limit the length of the exec chains
+        self._node_stack.append(node)
+        self._converter_stack.append('')
+        try:
+            if self._options.type_annotations:
+                self.declare_outputs(node)
+            if self._profiler is None:
+                self._convert_node(node, parnames, inpnames)
+            else:
+                self._convert_node_measured(node, parnames, inpnames)
+        finally:
+            self._node_stack.pop()
+            self._converter_stack.pop()
+
+
+    def _convert_node_measured(self,
+                               node: NodeBase,
+                               parnames: list[str],
+                               inpnames: list[str]):
+        # measure the node class (and the whole subexporter on its top level)
+        if self._parent is not None and self._convert_depth == 0:
+            self._profiler.start(ExportProfiler.SUBEXPORTER, self._graph.name)
+        self._profiler.start(ExportProfiler.NODE, node.__class__.__name__)
+        self._convert_depth += 1
+        try:
+            self._convert_node(node, parnames, inpnames)
+        finally:
+            self._convert_depth -= 1
+            self._profiler.stop()
+            if self._parent is not None and self._convert_depth == 0:
+                self._profiler.stop()
+
+
+    def _convert_node(self,
+                      node: NodeBase,
+                      parnames: list[str],
+                      inpnames: list[str]):
         if hasattr(node, 'to_python'):
             # node has a full way to convert
-            node.to_python(self, inpnames, *args, *kwargs)  # type: ignore
+            self.set_current_converter(f"{node.__class__.__name__}.to_python")
+            self.get_node_method(node, 'to_python')(self, inpnames)
         elif (method := self.get_converter_method(node.__class__.__name__)) is not None:
             # we have a full way in our converter class to convert
-            method(self, node, inpnames, *args, **kwargs)
+            self.set_current_converter(method.__qualname__)
+            method(self, node, inpnames)
         else:
             # we will convert ourselves with drop-ins for each part (if exists)
             if not self.is_node_function_processed(node):
-                self.process_node_function(node, parnames, inpnames, *args, **kwargs)
-            self.process_node_calling(node, parnames, inpnames, *args, **kwargs)
+                self.process_node_function(node, parnames, inpnames)
+            self.process_node_calling(node, parnames, inpnames)
             # call exec pins
-            opins: Iterator[PinBase] = (pin for pin in node.orderedOutputs.values() if pin.isExec())
-            for opin in opins:
+            for opin in self._index.exec_outputs(node):
                 self.call_named_pin(node, opin.name)
 
 
+    def declare_outputs(self, node: NodeBase):
+        """Declares the outputs of a node with the types of their pins
+        before their first assignment (with the `type_annotations` option)"""
+        for pin in self._index.data_outputs(node):
+            if pin.getFullName() in self._declared_names:
+                continue
+            self._declared_names.add(pin.getFullName())
+            if self._hoisted_declarations:
+                # declared in the scope of the local function being converted
+                self._hoisted_declarations[-1].append(
+                    f"{annotated(self, pin.getFullName(), pin_annotation(pin))}\n")
+                continue
+            # not `add_call`: a declaration is no statement to profile
+            self._add_chunk(self._calling_part, self._calling_origins,
+                            self.indent_text(annotated(self, pin.getFullName(),
+                                                       pin_annotation(pin))),
+                            None, '\n')
+
+
     def call_named_pin(self, node: NodeBase, pinname: str):
         """Follows the export with an exec pin by its name"""
-        pin = node.getPinSG(pinname, PinSelectionGroup.Outputs)
+        pin = self._index.output_pin(node, pinname)
         if pin is None:
             print(node, pinname, "not found")
             return
-        for cpin in list(pin.affects):
-            self.export_from_pin(cpin)
+        for cpin in self._index.targets(pin):
+            self.export_from_pin(cpin, pin)
 
 
     def process_node_function(self,
@@ -160,8 +485,10 @@ class PythonExporterImpl:
         fun_str = f"def {node.__class__.__name__}({', '.join(parnames)}):\n"
         if hasattr(node, 'python_func'):
             # we have a function which returns function definition string
-            fun_str += node.python_func(self, *args, **kwargs)  # type: ignore
+            self.set_current_converter(f"{node.__class__.__name__}.python_func")
+            fun_str += self.get_node_method(node, 'python_func')(self, *args, **kwargs)
         elif (method := self.get_converter_method("func_"+node.__class__.__name__)) is not None:
+            self.set_current_converter(method.__qualname__)
             fun_str += method(self, node, *args, **kwargs)
         else:
             fun_str = None
@@ -178,10 +505,13 @@ class PythonExporterImpl:
                              **kwargs):  # pylint: disable=unused-argument
         """Converts the call of a node"""
         if hasattr(node, 'python_call'):
-            self.add_call(node.python_call(self, inpnames, *args, **kwargs)) # type: ignore
+            self.set_current_converter(f"{node.__class__.__name__}.python_call")
+            self.add_call(self.get_node_method(node, 'python_call')(self, inpnames, *args, **kwargs))
         elif (method := self.get_converter_method("call_"+node.__class__.__name__)) is not None:
+            self.set_current_converter(method.__qualname__)
             self.add_call(method(self, node, inpnames, *args, **kwargs))
         else:
+            self.set_current_converter(f"{self.__class__.__name__}.process_node_calling")
             self.add_call(
                 f"{self.get_out_list(node, post=' = ')}" +
                 f"{node.__class__.__name__}({', '.join(inpnames)})"
@@ -194,14 +524,28 @@ class PythonExporterImpl:
         calling statement)
         """
         lst = ', '.join([opin.getFullName()
-                         for opin in node.orderedOutputs.values()
-                         if not opin.isExec()])
+                         for opin in self._index.data_outputs(node)])
         return '' if lst=='' else lst+post
 
 
-    def collect_subexporter_results(self, subexporter: "PythonExporterImpl", node: NodeBase):
+    def create_subexporter(self, graph: GraphBase, indent: int = 1) -> "PythonExporterImpl":
+        """Creates an exporter for a subgraph (e.g. the inner graph of a
+        compound) which shares the converters, the exported functions and
+        the progress reporting with us"""
+        return self.__class__(graph,
+                              self._converter_classes,
+                              indent,
+                              self._exported_node_functions,
+                              parent=self)
+
+
+    def collect_subexporter_results(self,
+                                    subexporter: "PythonExporterImpl",
+                                    node: NodeBase,
+                                    header: Optional[str] = None):
         """Collects all the results from a subexporter and updates our
-        status accordingly"""
+        status accordingly (its calls become the body of the function of
+        the node, with the given header or the signature of its pins)"""
         for key, exp in subexporter.exported_node_functions.items():
             if key not in self._exported_node_functions:
                 self._exported_node_functions[key] = exp
@@ -210,12 +554,18 @@ class PythonExporterImpl:
                 self._visited_nodes[key] = n
         self.add_imports(subexporter.get_imports_list())
         self.add_setups(subexporter.get_setups_list())
-        self.add_sys_function(subexporter.get_sys_functions())
-        self.add_function(subexporter.get_functions())
-        inpinnames = [pin.name
-                      for pin in node.orderedInputs.values()
-                      if not pin.isExec()]
-        self.add_function(f"def {node.name}({', '.join(inpinnames)}):\n{subexporter.get_calls()}")
+        self._add_chunk(self._sys_function_part, self._sys_function_origins,
+                        *subexporter.get_sys_functions_mapped(), '\n\n')
+        self._add_chunk(self._function_part, self._function_origins,
+                        *subexporter.get_functions_mapped(), '\n')
+        if header is None:
+            header = pin_signature(self, def_keyword(self, node), node.name,
+                                   self._index.data_inputs(node), self._index.data_outputs(node))
+        calls, calls_spans = subexporter.get_calls_mapped()
+        self._add_chunk(self._function_part, self._function_origins,
+                        f"{header}\n{calls}",
+                        self.current_origin_spans() + shift_spans(calls_spans, 1),
+                        '\n')
 
 
 
@@ -228,36 +578,144 @@ class PythonExporterImpl:
         """Read-only accessor to our converter classes list"""
         return self._converter_classes
 
+    @property
+    def parent(self) -> Optional["PythonExporterImpl"]:
+        """The exporter which created us as a subexporter (None for the root)"""
+        return self._parent
+
+    @property
+    def progress(self) -> Optional[ExportProgress]:
+        """The progress reporter of the export run (None if not reported)"""
+        return self._progress
+
+    @property
+    def options(self) -> ExportOptions:
+        """The options of the export run"""
+        return self._options
+
+    @property
+    def profiler(self) -> Optional[ExportProfiler]:
+        """The profiler of the exporter itself (None if not measured)"""
+        return self._profiler
+
+    @property
+    def diagnostics(self) -> list[str]:
+        """The diagnostics of the export run (e.g. why a requested
+        optimization was not applied)"""
+        return self._diagnostics
+
+    @property
+    def coroutines(self) -> set[str]:
+        """The names of the exported functions which are coroutines (in
+        async mode), their calls are awaited"""
+        return self._coroutines
+
+    @property
+    def structure_hashes(self) -> dict[int, str]:
+        """The cache of the structural hashes of the inner graphs of the
+        compounds (by the ids of the graphs)"""
+        return self._structure_hashes
+
+    @property
+    def graph_indexes(self) -> dict[int, GraphIndex]:
+        """The indexes of the graphs of the export (by the ids of the graphs)"""
+        return self._graph_indexes
+
+    @property
+    def graph_index(self) -> GraphIndex:
+        """The index of our graph (query it instead of the live graph)"""
+        return self._index
+
+    def index_of(self, graph: GraphBase) -> GraphIndex:
+        """Gets the index of a graph, built at its first use in the export"""
+        index = self._graph_indexes.get(id(graph))
+        if index is None:
+            index = self._graph_indexes[id(graph)] = GraphIndex(graph, self._converter_classes)
+        return index
+
+    def add_diagnostic(self, message: str):
+        """Adds a diagnostic about the node being converted"""
+        if self._node_stack:
+            message = f"{self._node_stack[-1].path()}: {message}"
+        self._diagnostics.append(message)
+
     # node processing status accessors
     def is_node_processed(self, node: NodeBase) -> bool:
         """Returns true if the node was already processed during the export"""
         return node.path() in self._visited_nodes
 
     def set_node_processed(self, node: NodeBase):
-        """Sets the node as processed"""
-        # TODO: actually we could be only sure that from this exec pin (if we are not pure)
-        # we are visited. even more from this connection of this exec pin (because multiple
-        # connections would need the call part to be repeated). maybe we should change this
-        # to nodes-visited-from-pin-through-pin dictionary...
+        """Sets the node as processed (the exec flow is tracked by its
+        edges, see `export_from_pin`)"""
+        if self._processed_logs and node.path() not in self._visited_nodes:
+            self._processed_logs[-1].append(node)
+        if self._progress is not None and node.path() not in self._visited_nodes:
+            self._progress.node_processed(node)
         self._visited_nodes[node.path()] = node
 
+    def unset_node_processed(self, node: NodeBase):
+        """Sets the node as not processed, so it is converted again when
+        needed (e.g. for recomputing it in each iteration of a loop)"""
+        self._visited_nodes.pop(node.path(), None)
+
+    @property
+    def current_node(self) -> Optional[NodeBase]:
+        """The node being converted right now (None outside of conversions)"""
+        return self._node_stack[-1] if self._node_stack else None
+
+    def set_current_converter(self, converter: str):
+        """Sets the name of the converter of the current node (recorded in
+        the source map)"""
+        if self._converter_stack:
+            self._converter_stack[-1] = converter
+
+
+    def current_origin_spans(self) -> OriginSpans:
+        """The origin of the code emitted right now (as the spans of a chunk)"""
+        if not self._node_stack:
+            return []
+        node = self._node_stack[-1]
+        return [(0, Origin(node.path(), str(node.uid), self._converter_stack[-1]))]
+
+
     @property
     def visited_nodes(self):
         """Read-only accessor to our list of already visited nodes"""
         return self._visited_nodes
 
+    def node_function_key(self, node: NodeBase) -> str:
+        """Gets the key of the node's function among the exported ones:
+        the node type, the referenced compound of Function nodes and the
+        structure of the inner graph of compounds (so the compounds with the
+        same inner graphs share their function)"""
+        if node.__class__.__name__ == 'Function':
+            return 'Function_'+node.getData('function')
+        if node.__class__.__name__ == 'compound':
+            return 'compound_'+structure_hash(node.rawGraph, self._structure_hashes)  # type: ignore
+        return node.__class__.__name__
+
     def is_node_function_processed(self, node: NodeBase) -> bool:
         """Returns true if the node's function was already processed during the export"""
-        if node.__class__.__name__=='Function':
-            return 'Function_'+node.getData('function') in self._exported_node_functions
-        return node.__class__.__name__ in self._exported_node_functions
+        return self.node_function_key(node) in self._exported_node_functions
 
     def set_node_function_processed(self, node: NodeBase):
         """Sets the node as its function is processed"""
-        if node.__class__.__name__ == 'Function':
-            self._exported_node_functions['Function_'+node.getData('function')] = node
-        else:
-            self._exported_node_functions[node.__class__.__name__] = node
+        self._exported_node_functions.setdefault(self.node_function_key(node), node)
+
+    def node_function_name(self, node: NodeBase) -> str:
+        """Gets the name of the function exported for the node (e.g. a
+        compound), which is named after the first node exporting it"""
+        return self._exported_node_functions.get(self.node_function_key(node), node).name
+
+    def exported_function_name(self, key: str) -> Optional[str]:
+        """Gets the name of the function exported under the key (e.g. the
+        hash of a generated function), None if it is not exported yet"""
+        node = self._exported_node_functions.get(key)
+        return None if node is None else node.name
+
+    def set_function_exported(self, key: str, node: NodeBase):
+        """Sets the function exported under the key (named after the node)"""
+        self._exported_node_functions.setdefault(key, node)
 
     @property
     def exported_node_functions(self):
@@ -349,24 +807,15 @@ class PythonExporterImpl:
 
     def get_imports(self):
         """Gets the imports code-part calculated on the fly from _imports list"""
-        prg=""
-        for imp in self._imports:
-            if isinstance(imp, str):
-                prg+=f"import {imp}\n"
-            elif isinstance(imp[1], str):
-                prg+=f"import {imp[0]} as {imp[1]}\n"
-            elif isinstance(imp[1], list):
-                prg_part=f"from {imp[0]} import ("
-                prg+=f"{prg_part}{(f',{chr(10)}'+' '*len(prg_part)).join(imp[1])}){chr(10)}"
-        while len(prg)>0 and prg[-1] == '\n':
-            prg = prg[:-1]
-        return prg
+        if self._options.lazy_imports:
+            return lazy_imports_code(self._imports)
+        return imports_code(self._imports)
 
 
     # variable code-part accessors
     def add_variable(self, varname: str, valuestr: str):
         """Add a new variable to the top of the script"""
-        self._variables += f"{self.get_indent_str()}{varname} = {valuestr}\n"
+        self._variables += f"{varname} = {valuestr}\n"
 
 
     def get_variables(self):
@@ -423,12 +872,37 @@ class PythonExporterImpl:
         """Add statements to the system functions code-part"""
         if indent_first:
             sys_func_str = self.indent_text(sys_func_str)
-        self._sys_function_part += f"{sys_func_str}\n\n"
+        self._add_chunk(self._sys_function_part, self._sys_function_origins,
+                        sys_func_str, None, '\n\n')
 
 
     def get_sys_functions(self):
         """A read-only accessor to our system functions code-part string"""
-        return self._sys_function_part
+        return ''.join(self._sys_function_part)
+
+
+    def iter_sys_functions(self) -> Iterator[str]:
+        """Iterates over the chunks of our system functions code-part"""
+        return iter(self._sys_function_part)
+
+
+    def iter_sys_functions_mapped(self) -> Iterator[tuple[str, Optional[OriginSpans]]]:
+        """Iterates over the chunks of our system functions code-part with
+        their origins (see the `source_map` option)"""
+        return zip(self._sys_function_part, self._origins_of(self._sys_function_origins))
+
+
+    def get_sys_functions_mapped(self) -> tuple[str, OriginSpans]:
+        """Our system functions code-part with its origins"""
+        return join_mapped(self.iter_sys_functions_mapped())
+
+
+    def replace_sys_functions(self, chunks: list[tuple[str, Optional[OriginSpans]]]):
+        """Replaces the chunks of our system functions code-part (with
+        their origins, e.g. after some definitions moved into the shared
+        library)"""
+        self._sys_function_part = [text for text, _ in chunks]
+        self._sys_function_origins = [spans for _, spans in chunks]
 
 
     # function code-part accessors
@@ -436,12 +910,36 @@ class PythonExporterImpl:
         """Add statements to the functions code-part"""
         if indent_first:
             func_str = self.indent_text(func_str)
-        self._function_part += f"{func_str}\n"
+        self._add_chunk(self._function_part, self._function_origins,
+                        func_str, None, '\n')
 
 
     def get_functions(self):
         """A read-only accessor to our functions code-part string"""
-        return self._function_part
+        return ''.join(self._function_part)
+
+
+    def iter_functions(self) -> Iterator[str]:
+        """Iterates over the chunks of our functions code-part"""
+        return iter(self._function_part)
+
+
+    def iter_functions_mapped(self) -> Iterator[tuple[str, Optional[OriginSpans]]]:
+        """Iterates over the chunks of our functions code-part with their
+        origins (see the `source_map` option)"""
+        return zip(self._function_part, self._origins_of(self._function_origins))
+
+
+    def get_functions_mapped(self) -> tuple[str, OriginSpans]:
+        """Our functions code-part with its origins"""
+        return join_mapped(self.iter_functions_mapped())
+
+
+    def replace_functions(self, chunks: list[tuple[str, Optional[OriginSpans]]]):
+        """Replaces the chunks of our functions code-part (with their
+        origins, e.g. after some definitions moved into the shared library)"""
+        self._function_part = [text for text, _ in chunks]
+        self._function_origins = [spans for _, spans in chunks]
 
 
     # main code-part accessors
@@ -458,18 +956,82 @@ class PythonExporterImpl:
         """Add statements to the call code-part"""
         if call_str=='':
             return
+        if self._profiler is not None:
+            self._profiler.statement_emitted()
+        if self._options.runtime_profile and self._node_stack:
+            call_str = self.wrap_runtime_profile(call_str)
         if indent_first:
             call_str = self.indent_text(call_str)
-        self._calling_part += f"{call_str}\n"
+        self._add_chunk(self._calling_part, self._calling_origins,
+                        call_str, None, '\n')
+
+
+    def wrap_runtime_profile(self, call_str: str) -> str:
+        """Wraps a statement of the current node into the time accounting
+        of the generated script's runtime profiler (if it is possible)"""
+        wrapped = wrap_statement(call_str, self._node_stack[-1].path())
+        if wrapped is None:
+            return call_str
+        if RUNTIME_PROFILE_SETUP_ID not in self._setups:
+            for module_name in RUNTIME_PROFILE_IMPORTS:
+                self.add_import(module_name)
+            self.add_setup(RUNTIME_PROFILE_SETUP_ID, RUNTIME_PROFILE_SETUP)
+        return wrapped
+
+
+    @property
+    def call_count(self) -> int:
+        """The number of statements added to the main program part so far"""
+        return len(self._calling_part)
 
 
     def get_calls(self):
         """A read-only accessor to our main program part string"""
-        call = self._calling_part
-        while len(call)>0 and call[-1] == '\n':
-            call = call[:-1]
+        return ''.join(self.iter_calls())
+
+
+    def iter_calls(self) -> Iterator[str]:
+        """Iterates over the chunks of our main program part (without the
+        trailing newlines, like `get_calls`)"""
+        return (chunk for chunk, _ in self.iter_calls_mapped())
+
+
+    def iter_calls_mapped(self) -> Iterator[tuple[str, Optional[OriginSpans]]]:
+        """Iterates over the chunks of our main program part with their
+        origins (see the `source_map` option)"""
+        pending = ''
+        for chunk, spans in zip(self._calling_part, self._origins_of(self._calling_origins)):
+            stripped = chunk.rstrip('\n')
+            if stripped == '':
+                # only newlines: hold them back until we see more code
+                pending += chunk
+                continue
+            yield pending + stripped, shift_spans(spans, pending.count('\n'))
+            pending = chunk[len(stripped):]
+
+
+    def get_calls_mapped(self) -> tuple[str, OriginSpans]:
+        """Our main program part with its origins"""
+        return join_mapped(self.iter_calls_mapped())
+
+
+    def _add_chunk(self,
+                   part: list[str],
+                   origins: list[Optional[OriginSpans]],
+                   text: str,
+                   spans: Optional[OriginSpans],
+                   post: str = ''):
+        """Appends a chunk to a code-part (and its origins if a source map
+        is needed). Without `spans` the current node is the origin."""
+        part.append(f"{text}{post}")
+        if self._options.source_map:
+            origins.append(self.current_origin_spans() if spans is None else spans)
+
 
-        return call
+    def _origins_of(self, origins: list[Optional[OriginSpans]]) -> Iterator[Optional[OriginSpans]]:
+        if self._options.source_map:
+            return iter(origins)
+        return itertools.repeat(None)
 
 
     ################################
@@ -481,15 +1043,27 @@ class PythonExporterImpl:
         return '    '*self._indent
 
 
-    def indent_text(self, text: str) -> str:
-        """Indent the given text with our current number of indents"""
-        ind = self.get_indent_str()
-        return '\n'.join(ind+line for line in text.splitlines())
+    def indent_text(self, text: str, indent: Optional[int] = None) -> str:
+        """Indent the given text with our current (or the given) number of indents"""
+        ind = self.get_indent_str() if indent is None else '    '*indent
+        return '\n'.join(ind+line if line.strip() != '' else line for line in text.splitlines())
 
     def get_converter_method(self, name: str) -> Optional[Callable]:
         """Get a converter method by name from all of the loaded
         converters or None if not found"""
-        for converter in self._converter_classes:
-            if hasattr(converter, name):
-                return getattr(converter, name)
-        return None
+        method = self._converter_classes.find_method(name)
+        if method is not None and self._profiler is not None:
+            method = self._profiler.wrap(ExportProfiler.CONVERTER,
+                                         method.__qualname__,
+                                         method)
+        return method
+
+    def get_node_method(self, node: NodeBase, name: str) -> Callable:
+        """Get a converter method implemented by the node itself
+        (`to_python`, `python_func`, `python_call`)"""
+        method = getattr(node, name)
+        if self._profiler is not None:
+            method = self._profiler.wrap(ExportProfiler.CONVERTER,
+                                         f"{node.__class__.__name__}.{name}",
+                                         method)
+        return method
@@ -0,0 +1,116 @@
+"""Instrumentation of the exporter itself: where does the export spend
+its time"""
+import functools
+import time
+from typing import Callable, Optional
+
+
+class _Frame:
+    """One running measurement on the stack of the profiler"""
+    __slots__ = ('category', 'key', 'start', 'children')
+
+    def __init__(self, category: str, key: str, start: float):
+        self.category = category
+        self.key = key
+        self.start = start
+        self.children = 0.0
+
+
+class ExportProfiler:
+    """Collects call counts and timings of an export by category (e.g.
+    converter methods, node classes, subexporters, final assembly).
+
+    Measurements can be nested: for each key both the total (inclusive)
+    time and the self time (without the nested measurements) are kept,
+    because the converters call each other recursively through the exec
+    pins.
+
+    The exporter only calls the profiler if one is given, so without it
+    the cost is a single `is None` check at each hook.
+    """
+
+    CONVERTER = 'converter'
+    NODE = 'node'
+    SUBEXPORTER = 'subexporter'
+    START_PIN = 'start pin'
+    ASSEMBLY = 'assembly'
+
+    def __init__(self):
+        self._stats: dict[str, dict[str, list]] = {}
+        self._stack: list[_Frame] = []
+        self.statements = 0
+
+
+    def start(self, category: str, key: str):
+        """Starts a measurement (must be paired with `stop`)"""
+        self._stack.append(_Frame(category, key, time.perf_counter()))
+
+
+    def stop(self):
+        """Stops the last started measurement"""
+        frame = self._stack.pop()
+        elapsed = time.perf_counter() - frame.start
+        if self._stack:
+            self._stack[-1].children += elapsed
+        stat = self._stats.setdefault(frame.category, {}).setdefault(frame.key, [0, 0.0, 0.0])
+        stat[0] += 1
+        stat[1] += elapsed
+        stat[2] += elapsed - frame.children
+
+
+    def wrap(self, category: str, key: str, func: Callable) -> Callable:
+        """Returns `func` wrapped into a measurement"""
+        @functools.wraps(func)
+        def measured(*args, **kwargs):
+            self.start(category, key)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.stop()
+        return measured
+
+
+    def statement_emitted(self):
+        """Counts one emitted statement"""
+        self.statements += 1
+
+
+    def report(self) -> dict:
+        """The collected data as a dictionary:
+        {category: {key: {'calls': int, 'total': float, 'self': float, 'mean': float}}}
+        plus the number of emitted statements under 'statements'
+        (times are in seconds)
+        """
+        result: dict = {}
+        for category, stats in self._stats.items():
+            result[category] = {
+                key: {
+                    'calls': calls,
+                    'total': total,
+                    'self': self_time,
+                    'mean': total/calls
+                }
+                for key, (calls, total, self_time) in stats.items()
+            }
+        result['statements'] = self.statements
+        return result
+
+
+    def format_summary(self, top: Optional[int] = 10) -> str:
+        """A human readable summary: the `top` keys (by self time) in each
+        category"""
+        lines = [f"Export profile ({self.statements} statements emitted)"]
+        for category, stats in self._stats.items():
+            lines.append("")
+            lines.append(f"{category:<48} {'calls':>8} {'total ms':>10} {'self ms':>10} {'mean ms':>10}")
+            ordered = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+            for key, (calls, total, self_time) in ordered[:top]:
+                lines.append(f"  {key:<46} {calls:>8} {total*1000:>10.3f} "
+                             f"{self_time*1000:>10.3f} {total*1000/calls:>10.3f}")
+        return '\n'.join(lines)+'\n'
+
+
+    def write_summary(self, fname: str, top: Optional[int] = None):
+        """Writes the summary into a file (e.g. next to the exported script)"""
+        with open(fname, "w", encoding='utf8') as f:
+            f.write(self.format_summary(top))
@@ -0,0 +1,53 @@
+"""Lazy imports in the generated scripts (the `lazy_imports` export
+option): the modules are bound at the top of the script as usual, but
+they are only loaded when one of their attributes is first accessed, so
+a start pin or branch which never runs doesn't pay for its imports.
+
+The `from <module> import (...)` imports bind the names themselves, so
+they stay eager."""
+
+
+LAZY_IMPORT_FUNCTION = '_lazy_import'
+
+LAZY_IMPORT_SETUP = f'''import importlib.util
+import sys
+
+
+def {LAZY_IMPORT_FUNCTION}(name, bind_top_level=True):
+    """Imports a module when one of its attributes is first accessed
+    (like `import a.b` it returns `a`, or `a.b` for `import a.b as c`)"""
+    module = sys.modules.get(name)
+    if module is None:
+        spec = importlib.util.find_spec(name)
+        if spec is None or spec.loader is None:
+            # let the regular import raise (or load a namespace package)
+            module = importlib.import_module(name)
+        else:
+            loader = importlib.util.LazyLoader(spec.loader)
+            spec.loader = loader
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[name] = module
+            loader.exec_module(module)
+            parent, _, child = name.rpartition('.')
+            if parent:
+                setattr(sys.modules[parent], child, module)
+    return sys.modules[name.partition('.')[0]] if bind_top_level else module
+'''
+
+
+def lazy_imports_code(imports: list[str|tuple[str,str|None]|tuple[str,list[str]]]) -> str:
+    """Gets the imports code-part binding the modules lazily (the imports
+    are in the format of `PythonExporterImpl.get_imports_list`)"""
+    eager = ''
+    lazy = ''
+    for imp in imports:
+        if isinstance(imp, str):
+            lazy += f"{imp.partition('.')[0]} = {LAZY_IMPORT_FUNCTION}({imp!r})\n"
+        elif isinstance(imp[1], str):
+            lazy += f"{imp[1]} = {LAZY_IMPORT_FUNCTION}({imp[0]!r}, bind_top_level=False)\n"
+        elif isinstance(imp[1], list):
+            prg_part = f"from {imp[0]} import ("
+            eager += f"{prg_part}{(f',{chr(10)}'+' '*len(prg_part)).join(imp[1])})\n"
+    if lazy == '':
+        return eager.rstrip('\n')
+    return f"{eager}{LAZY_IMPORT_SETUP}\n\n{lazy}".rstrip('\n')
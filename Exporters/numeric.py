@@ -0,0 +1,141 @@
+"""Vectorisation of the elementwise math of loops for the NumPy output mode
+(the `numpy_arrays` export option).
+
+The math nodes of a forEachLoop body computing a value from the element
+of a numeric array (e.g. `element * 2.0 + 1.0`) are computed once on the
+whole array with NumPy ufuncs before the loop, and the loop iterates over
+their precomputed values. Only what means the same on the numbers of the
+lists of PyFlow and on NumPy arrays is vectorised: the arithmetic of the
+elements with numeric constants (not the lists themselves, where `+`
+concatenates and `*` repeats, and no comparisons, which would give arrays
+instead of bools). The values are converted back to Python numbers, only
+the integers are of fixed size (int64) in between."""
+from typing import TYPE_CHECKING, Callable
+
+from PyFlow.Core import PinBase, NodeBase
+
+from .dependencies import has_exec_pins
+
+if TYPE_CHECKING:
+    from .implementation import PythonExporterImpl
+
+
+NUMERIC_DATA_TYPES = {'FloatPin', 'IntPin'}
+
+# the nodes computing their output the same way on two numbers and
+# elementwise on NumPy arrays of numbers: node class -> ufunc
+ELEMENTWISE_UFUNCS = {
+    'add': 'np.add',
+    'multiply': 'np.multiply',
+}
+
+
+def is_numeric_scalar(pin: PinBase) -> bool:
+    """Returns True if the pin holds a single number"""
+    return not pin.isArray() and pin.dataType in NUMERIC_DATA_TYPES
+
+
+def numeric_array_type(pin: PinBase) -> str:
+    """Gets the data type of the numbers of a numeric array (an array pin
+    of numbers or a makeArray of numbers of one type), '' if the pin holds
+    no numeric array"""
+    if pin.isArray() and pin.dataType in NUMERIC_DATA_TYPES:
+        return pin.dataType
+    node: NodeBase = pin.owningNode()
+    if node.__class__.__name__ == 'makeArray' and pin.name == 'out':
+        data_pin = node.getPinByName('data')
+        sources = [] if data_pin is None else list(data_pin.affected_by)
+        data_types = {source.dataType for source in sources}
+        if len(data_types)==1 and all(is_numeric_scalar(source) for source in sources):
+            return data_types.pop()
+    return ''
+
+
+def _numeric_constant(pin: PinBase) -> bool:
+    value = pin.currentData()
+    return not pin.hasConnections() and isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def elementwise_nodes(loop_node: NodeBase,
+                      is_processed: Callable[[NodeBase], bool]) -> list[NodeBase]:
+    """Gets the math nodes computing a value elementwise from the element
+    of a forEachLoop over a numeric array (with numeric constants and the
+    values of other such nodes) in dependency order"""
+    element_pin = loop_node.getPinByName('element')
+    array_pin = loop_node.getPinByName('array')
+    if element_pin is None or array_pin is None:
+        return []
+    sources = list(array_pin.affected_by)
+    if len(sources)!=1 or numeric_array_type(sources[0])=='':
+        return []
+    elementwise: dict[str, NodeBase] = {}
+    derived = {id(element_pin)}
+    pending = list(element_pin.affects)
+    while pending:
+        node = pending.pop(0).owningNode()
+        if node.path() in elementwise or is_processed(node) or has_exec_pins(node) or \
+           node.__class__.__name__ not in ELEMENTWISE_UFUNCS:
+            continue
+        inputs = list(node.orderedInputs.values())
+        if not all(_numeric_constant(pin) or (
+                   pin.hasConnections() and all(id(source) in derived for source in pin.affected_by))
+                   for pin in inputs):
+            # not yet (an input computed by a node found later) or never
+            continue
+        elementwise[node.path()] = node
+        for pin in node.orderedOutputs.values():
+            derived.add(id(pin))
+            pending.extend(pin.affects)
+    return list(elementwise.values())
+
+
+def vectorise_loop(exporter: "PythonExporterImpl", loop_node: NodeBase, array: str) -> tuple[str, list[NodeBase]]:
+    """Computes the elementwise math of a forEachLoop over a numeric array
+    on the whole array before the loop (in the NumPy mode)
+
+    Returns:
+        tuple:
+            str: the targets of the loop and its iterable: the element and
+                 the outputs of the vectorised nodes read by other nodes,
+                 e.g. `add_out in add_out_array.tolist()`
+            list[NodeBase]: the vectorised nodes (set as processed, their
+                            outputs are assigned by the loop)
+    """
+    element = loop_node.getPinByName('element').getFullName()  # type: ignore
+    nodes = elementwise_nodes(loop_node, exporter.is_node_processed) \
+        if exporter.options.numpy_arrays else []
+    if len(nodes)==0:
+        return f"{element} in {array}", []
+    exporter.add_import('numpy', alias='np')
+    array_name = f"{element}_array"
+    exporter.add_call(f"{array_name} = np.asarray({array})")
+    names = {element: array_name}
+    vectorised = {node.path() for node in nodes}
+
+    def is_read(pin: PinBase) -> bool:
+        # by the nodes which are not vectorised (e.g. in the loop body)
+        return any(target.owningNode().path() not in vectorised for target in pin.affects)
+
+    targets = [element] if is_read(loop_node.getPinByName('element')) else []  # type: ignore
+    iterables = [array] if targets else []
+    for node in nodes:
+        args = []
+        for pin in node.orderedInputs.values():
+            if pin.hasConnections():
+                args.append(names[list(pin.affected_by)[0].getFullName()])
+            else:
+                args.append(repr(pin.currentData()))
+        out_pin = list(node.orderedOutputs.values())[0]
+        out = out_pin.getFullName()
+        names[out] = f"{out}_array"
+        exporter.add_call(f"{names[out]} = {ELEMENTWISE_UFUNCS[node.__class__.__name__]}({', '.join(args)})")
+        exporter.set_node_processed(node)
+        if is_read(out_pin):
+            targets.append(out)
+            iterables.append(f"{names[out]}.tolist()")
+    if len(targets)==0:
+        # only the number of iterations is left
+        return f"_ in range(len({array_name}))", nodes
+    if len(targets)==1:
+        return f"{targets[0]} in {iterables[0]}", nodes
+    return f"{', '.join(targets)} in zip({', '.join(iterables)})", nodes
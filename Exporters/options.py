@@ -0,0 +1,66 @@
+"""Options of the export"""
+from typing import NamedTuple
+
+
+class ExportOptions(NamedTuple):
+    """Options of one export. Everything is off by default, so the default
+    options produce the plain script.
+
+    Attributes:
+        profile_export: measure the exporter itself (converters, node
+                        classes, subexporters, assembly) and write a summary
+                        next to the exported script
+        runtime_profile: wrap each emitted node statement of the generated
+                         script into time accounting keyed by the node path
+                         and dump the per-node table as JSON at exit
+        source_map: record the node and converter which produced each line
+                    of the generated script into `<script>.map.json`
+        numpy_arrays: compute the elementwise math of the forEachLoop
+                      bodies over numeric arrays on the whole arrays with
+                      NumPy before the loops (see `numeric`)
+        parallel_sequences: run the branches of Sequence nodes on a thread
+                            pool when they share no state (otherwise the
+                            reason is reported as a diagnostic)
+        batch_mode: turn the graph into a function of its graph inputs and
+                    add a driver running it for the rows of a JSON Lines
+                    or CSV input (optionally on a multiprocessing pool)
+        async_mode: make the main program and the compounds with exec pins
+                    coroutines run by asyncio, await the I/O nodes (on
+                    threads) and run the independent start pins concurrently
+        start_pin_pool: run the sections of the start pins as functions on
+                        a 'thread' or 'process' pool when they share no
+                        state, no written files and no console output (the
+                        async mode has its own concurrency and ignores it)
+        generic_code: ignore the data types of the pins and let the
+                      converters emit their generic code (e.g. to compare
+                      it with the type-specialised code)
+        type_annotations: annotate the functions and the node outputs with
+                          the data types of the pins and wrap the main
+                          program into a function, so the script type-checks
+                          and compiles with mypyc (the batch driver stays
+                          unannotated)
+        lazy_imports: load the imported modules on the first access of
+                      their attributes instead of at the start of the
+                      script (the `from ... import` imports stay eager)
+        bundle: also write the byte code of the script ('pyc': into
+                `<script>.pyc`, 'zipapp': also a `<script>.pyz` zipapp),
+                hash-based so the stale artefacts are detected
+        shared_library: move the system functions and the graph
+                        implementation into the content-hashed modules of
+                        this package next to the script, which the script
+                        imports (the scripts exported into a folder share
+                        the modules)
+    """
+    profile_export: bool = False
+    runtime_profile: bool = False
+    source_map: bool = False
+    numpy_arrays: bool = False
+    parallel_sequences: bool = False
+    batch_mode: bool = False
+    async_mode: bool = False
+    start_pin_pool: str = ''
+    generic_code: bool = False
+    type_annotations: bool = False
+    lazy_imports: bool = False
+    bundle: str = ''
+    shared_library: str = ''
@@ -0,0 +1,97 @@
+"""The data types of the pins for the converters: they can emit
+type-specialised code when the types of the inputs of a node are known
+(e.g. no `str()` around strings), and the constants of the unconnected
+pins are embedded as literals"""
+import math
+from typing import TYPE_CHECKING, Any, Optional
+
+from PyFlow.Core import PinBase, NodeBase
+
+if TYPE_CHECKING:
+    from .implementation import PythonExporterImpl
+
+
+# the data type of a pin whose values can be anything
+ANY_TYPE = 'AnyPin'
+
+# the Python types of the pin data types
+PYTHON_TYPES = {
+    'BoolPin': 'bool',
+    'IntPin': 'int',
+    'FloatPin': 'float',
+    'StringPin': 'str',
+}
+
+# the pin data types of the values of constants
+VALUE_TYPES = {python_type: data_type for data_type, python_type in PYTHON_TYPES.items()}
+
+NUMBER_TYPES = {'IntPin', 'FloatPin'}
+
+
+def literal_expr(value: Any) -> Optional[str]:
+    """Gets the Python literal of a constant value (None if the value has no literal)"""
+    if value is None or isinstance(value, (bool, int, str)):
+        return repr(value)
+    if isinstance(value, float):
+        return repr(value) if math.isfinite(value) else f"float('{value}')"
+    if isinstance(value, (list, tuple)):
+        items = [literal_expr(item) for item in value]
+        if any(item is None for item in items):
+            return None
+        if isinstance(value, tuple):
+            return f"({', '.join(items)}{',' if len(items)==1 else ''})"  # type: ignore
+        return f"[{', '.join(items)}]"  # type: ignore
+    if isinstance(value, dict):
+        items = [(literal_expr(key), literal_expr(item)) for key, item in value.items()]
+        if any(key is None or item is None for key, item in items):
+            return None
+        return f"{{{', '.join(f'{key}: {item}' for key, item in items)}}}"
+    return None
+
+
+def constant_expr(pin: PinBase) -> Optional[str]:
+    """Gets the expression of the constant value of an unconnected input pin
+    (None if it can't be embedded into the script)"""
+    value = pin.currentData()
+    if pin.dataType == 'StringPin':
+        return repr(str(value))
+    return literal_expr(value)
+
+
+def value_type(pin: PinBase) -> str:
+    """Gets the data type of the single values flowing into an input pin:
+    the type of the pin connected to it or of its constant value
+    (`ANY_TYPE` if it is not known or the values are arrays/dictionaries)"""
+    if pin.isArray() or pin.isDict():
+        return ANY_TYPE
+    sources = list(pin.affected_by)
+    if len(sources)>0:
+        if len(sources)>1 or sources[0].isArray() or sources[0].isDict():
+            return ANY_TYPE
+        return sources[0].dataType
+    if pin.dataType != ANY_TYPE:
+        return pin.dataType
+    return VALUE_TYPES.get(type(pin.currentData()).__name__, ANY_TYPE)
+
+
+def input_types(exporter: "PythonExporterImpl", node: NodeBase) -> list[str]:
+    """Gets the data types of the inputs of a node in the order of the input
+    names given to its converter (`ANY_TYPE` for all of them if the
+    `generic_code` option is on)"""
+    types: list[str] = []
+    for pin in node.orderedInputs.values():
+        if pin.isExec():
+            continue
+        sources = list(pin.affected_by)
+        if len(sources)>1:
+            types.extend([ANY_TYPE]*len(sources))
+        elif len(sources)==1 or constant_expr(pin) is not None:
+            types.append(value_type(pin))
+    if exporter.options.generic_code:
+        return [ANY_TYPE]*len(types)
+    return types
+
+
+def is_typed(types: list[str], data_types: set[str]) -> bool:
+    """Returns True if all the types are among the `data_types`"""
+    return len(types)>0 and all(data_type in data_types for data_type in types)
@@ -0,0 +1,69 @@
+"""Progress reporting and cancellation of a running export"""
+import threading
+from typing import Callable, Optional
+
+from PyFlow.Core import NodeBase
+
+
+class ExportCancelled(Exception):
+    """Raised inside the export when it was cancelled by the user"""
+
+
+class ExportProgress:
+    """Progress reporting and cancellation of one export run.
+
+    It is shared by the root exporter and all of its subexporters. The
+    export may run on a worker thread, so the callback is called from
+    that thread: it is the callback's job to marshal the values to the
+    GUI thread (e.g. by emitting a Qt signal).
+
+    Args:
+        callback: called with (start_index, start_count, nodes_processed,
+                  start_name) whenever the progress changes
+    """
+
+    def __init__(self,
+                 callback: Optional[Callable[[int, int, int, str], None]] = None):
+        self._callback = callback
+        self._cancel_event = threading.Event()
+        self.start_index = 0
+        self.start_count = 0
+        self.start_name = ''
+        self.nodes_processed = 0
+
+
+    def begin_start_pin(self, index: int, count: int, name: str):
+        """Signals that the export of a new start pin begins"""
+        self.start_index = index
+        self.start_count = count
+        self.start_name = name
+        self.nodes_processed = 0
+        self._notify()
+
+
+    def node_processed(self, node: NodeBase):  # pylint: disable=unused-argument
+        """Signals that one more node has been processed"""
+        self.nodes_processed += 1
+        self._notify()
+
+
+    def cancel(self):
+        """Requests the cancellation of the export (thread-safe)"""
+        self._cancel_event.set()
+
+
+    def is_cancelled(self) -> bool:
+        """Returns True if the cancellation was requested"""
+        return self._cancel_event.is_set()
+
+
+    def check_cancelled(self):
+        """Raises ExportCancelled if the cancellation was requested"""
+        if self._cancel_event.is_set():
+            raise ExportCancelled()
+
+
+    def _notify(self):
+        if self._callback is not None:
+            self._callback(self.start_index, self.start_count,
+                           self.nodes_processed, self.start_name)
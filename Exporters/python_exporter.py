@@ -1,19 +1,25 @@
 """A PyFlow exporter definintion module"""
 
-from datetime import datetime
+import sys
+from typing import Optional
 from qtpy.QtWidgets import QFileDialog, QMessageBox  # pylint: disable=no-name-in-module
 
 from PyFlow.UI.UIInterfaces import IDataExporter
-from PyFlow.Core.version import Version
-from PyFlow import GET_PACKAGES
 
 
-from .implementation import PythonExporterImpl
+from .export_job import (
+    EXPORTER_NAME, EXPORTER_VERSION, ExportJob, collect_converters, creation_date_string, script_header
+)
+from .export_worker import ExportController, ExportOnEdit, ExportWorker
+from .options import ExportOptions
 
 
 class PythonExporter(IDataExporter):
     """This exporter writes the PyFlow graph into a pure Python script.
     
+    The interactive export runs on a worker thread (see `ExportWorker`),
+    the GUI only shows its progress.
+
     LIMITATIONS:
       - multiple exec out pins are not fully supported
       - most of the heavy lifting is manual: for each node type a manual
@@ -24,17 +30,23 @@ class PythonExporter(IDataExporter):
 
     name_filter = "PyFlow pure python scripts (*.py)"
 
+    # the options used when no options are given to doExport (e.g. from the menu)
+    options = ExportOptions()
+
+    # the watch mode of the editor while it's on (see `toggleWatch`)
+    watch: Optional[ExportOnEdit] = None
+
     @staticmethod
     def createImporterMenu():  # type: ignore
         return False
 
     @staticmethod
     def creationDateString():
-        return datetime.now().strftime("%I:%M%p on %B %d, %Y")
+        return creation_date_string()
 
     @staticmethod
     def version():
-        return Version(1, 0, 0)
+        return EXPORTER_VERSION
 
     @staticmethod
     def toolTip():  # type: ignore
@@ -42,98 +54,110 @@ class PythonExporter(IDataExporter):
 
     @staticmethod
     def displayName():
-        return "Python exporter"
+        return EXPORTER_NAME
 
     @staticmethod
     def doImport(pyFlowInstance):
         print("Import is not implemented!")
 
     @staticmethod
-    def doExport(pyFlowInstance, outFilePath: str = ''):
-        """Export graph as a runnable Python script."""
-
-        header = f"""# -*- coding: utf-8 -*-
-
-\"\"\"This file was auto-generated by PyFlow exporter
-    '{PythonExporter.displayName()} v{PythonExporter.version()}'
-    Created: {PythonExporter.creationDateString()}
-\"\"\"
-
-EXPORTER_NAME = '{PythonExporter.displayName()}'
-EXPORTER_VERSION = '{PythonExporter.version()}'
-
-"""
+    def scriptHeader() -> str:  # pylint: disable=invalid-name
+        """The header of the exported script (see `script_header`)"""
+        return script_header()
 
+    @staticmethod
+    def doExport(pyFlowInstance,
+                 outFilePath: str = '',
+                 background: Optional[bool] = None,
+                 options: Optional[ExportOptions] = None):
+        """Export graph as a runnable Python script.
+
+        Args:
+            pyFlowInstance: the PyFlow application
+            outFilePath: the file to save into (asked from the user if empty,
+                         '-' for the standard output)
+            background: run the export on a worker thread with a progress
+                        dialog (defaults to True when the file is asked
+                        from the user)
+            options: the options of the export (`PythonExporter.options`
+                     if not given)
+        """
         root_graph = pyFlowInstance.graphManager.get().findRootGraph()
 
         if len(root_graph.getNodesList()) == 0:
             QMessageBox.warning(pyFlowInstance, "Warning", "Nothing to export!")
             return
 
-        # get the list of converters
-        converters: list[object] = []
-        for pkg in GET_PACKAGES().values():
-            if hasattr(pkg, 'GetCustomClasses'):
-                curconverters = pkg.GetCustomClasses('Converters')
-            elif hasattr(pkg, '_CONVERTERS'):
-                # fallback until analyzePackage gets the second argument
-                curconverters = pkg._CONVERTERS  # pylint: disable=protected-access
-            else:
-                # second fallback until analyzePackage gets the second argument
-                # because normal packages do not have the above 2 attributes
-                curconverters = None
-            if curconverters is not None:
-                converters.extend(curconverters.values())
-
-        # initialize exporter
-        root_exporter = PythonExporterImpl(root_graph, converters)
-
-        # collect unconnected input exec pins in the root graph
-        startpins = []
-        for node in root_graph.getNodesList():
-            for pin in node.inputs.values():
-                if pin.isExec() and not pin.hasConnections():
-                    startpins.append(pin)
-            if node.__class__.__name__ == "graphInputs":
-                for pin in node.outputs.values():
-                    if pin.isExec():
-                        startpins.append(pin)
-
-        # iterate over all of them
-        for start in startpins:
-            root_exporter.add_call(f"""
-
-# ------- {start.getFullName()} -------
-""")
-            root_exporter.export_from_pin(start)
-
-        # save the script
+        converters = collect_converters()
+
+        # ask for the file before exporting (dialogs are on the GUI thread only)
+        if background is None:
+            background = outFilePath == ''
         if outFilePath=='':
             outFilePath, _ = QFileDialog.getSaveFileName(
                 filter=PythonExporter.name_filter
             )
-        if outFilePath != "":
-            with open(outFilePath, "w", encoding='utf8') as f:
-                f.write(f"""{header}
-# ======================== VARIABLES AND PARAMETERS SETUP =========================
-{root_exporter.get_variables()}
-
-# ================================ PACKAGE IMPORTS ================================
-# pylint: disable=wrong-import-position
-{root_exporter.get_imports()}
-# pylint: enable=wrong-import-position
-
-# ================================= PACKAGE SETUPS ================================
-{root_exporter.get_setups()}
-
-# ================================ SYSTEM FUNCTIONS ===============================
-{root_exporter.get_sys_functions()}
-
-# ============================== GRAPH IMPLEMENTATION =============================
-{root_exporter.get_functions()}
-
-# ================================== MAIN PROGRAM =================================
-{root_exporter.get_calls()}
-"""
-                )
+        if outFilePath == "":
+            return
+
+        header = PythonExporter.scriptHeader()
+        if options is None:
+            options = PythonExporter.options
+        if background:
+            # the worker exports a snapshot, so the graph can be edited meanwhile
+            worker = ExportWorker(pyFlowInstance.graphManager.get().serialize(),
+                                  converters,
+                                  outFilePath,
+                                  header,
+                                  options)
+            ExportController.start(pyFlowInstance, worker)
+            return
+
+        job = ExportJob(root_graph, converters, options=options)
+        job.run()
+        job.save(outFilePath, header)
+        for diagnostic in job.diagnostics:
+            print(diagnostic, file=sys.stderr)
+        if outFilePath != '-':
+            # stdout may be piped into something
             print('saved!')
+
+    @staticmethod
+    def toggleWatch(pyFlowInstance,  # pylint: disable=invalid-name
+                    outFilePath: str = '',
+                    options: Optional[ExportOptions] = None) -> bool:
+        """Turns the watch mode on or off: while it's on, the graph is
+        exported again in the background after each burst of edits (the
+        `PythonExporterWatchTool` of the shelf toggles it).
+
+        Args:
+            pyFlowInstance: the PyFlow application
+            outFilePath: the file to save into (asked from the user if empty)
+            options: the options of the exports (`PythonExporter.options`
+                     if not given)
+
+        Returns:
+            bool: whether the watch mode is on
+        """
+        if PythonExporter.watch is not None:
+            PythonExporter.watch.stop()
+            PythonExporter.watch = None
+            return False
+        if outFilePath == '':
+            outFilePath, _ = QFileDialog.getSaveFileName(
+                filter=PythonExporter.name_filter
+            )
+        if outFilePath in ('', '-'):
+            return False
+        # the edits of the editor are the states pushed into its history
+        from PyFlow.UI.EditorHistory import EditorHistory  # pylint: disable=import-outside-toplevel
+
+        watch = ExportOnEdit(pyFlowInstance.graphManager.get(),
+                             collect_converters(),
+                             outFilePath,
+                             PythonExporter.scriptHeader,
+                             PythonExporter.options if options is None else options)
+        watch.start(EditorHistory(pyFlowInstance).statePushed)
+        watch.export()
+        PythonExporter.watch = watch
+        return True
@@ -0,0 +1,74 @@
+"""The built-in runtime profiler of the generated scripts: each emitted
+node statement is wrapped into cheap `time.perf_counter_ns` accounting
+keyed by the path of the node, and the per-node table is dumped as JSON
+at exit.
+
+The start time of a statement is kept in `_prof_t0`, a local of the
+function the statement is in: the parts of a script running concurrently
+(the coroutines of the async mode, the workers of the start pin pools and
+of the parallel Sequence branches) are functions, so each one measures
+into its own variable. Only the statements at the module level share the
+global one, and they run one after the other."""
+import ast
+from typing import Optional
+
+
+RUNTIME_PROFILE_SETUP_ID = 'runtime_profile'
+
+RUNTIME_PROFILE_IMPORTS = ['atexit', 'json', 'os', 'time']
+
+RUNTIME_PROFILE_SETUP = '''_PROF_STATS = {}
+_PROF_OUT = os.environ.get('PYFLOW_PROFILE_OUT',
+                           os.path.splitext(os.path.abspath(__file__))[0]+'.nodeprofile.json')
+_prof_clock = time.perf_counter_ns
+
+
+def _prof_add(node_path, start):
+    """Accounts the time of one node statement (started at `start`)"""
+    elapsed = _prof_clock() - start
+    stat = _PROF_STATS.get(node_path)
+    if stat is None:
+        _PROF_STATS[node_path] = [1, elapsed]
+    else:
+        stat[0] += 1
+        stat[1] += elapsed
+
+
+def _prof_dump():
+    """Writes the per-node profile as JSON (the times of compound and
+    Function calls include the times of their inner nodes)"""
+    table = {
+        node_path: {'calls': calls, 'total_ns': total, 'mean_ns': total/calls}
+        for node_path, (calls, total) in sorted(_PROF_STATS.items(),
+                                                key=lambda item: item[1][1],
+                                                reverse=True)
+    }
+    with open(_PROF_OUT, 'w', encoding='utf8') as f:
+        json.dump(table, f, indent=2)
+
+
+atexit.register(_prof_dump)
+'''
+
+
+def is_simple_statement(statement: str) -> bool:
+    """Returns True if the statement can be wrapped (it compiles on its
+    own: block headers like `if x:`/`else:`, `return` or `break` don't,
+    awaited statements do)"""
+    try:
+        compile(statement, '<node>', 'exec', flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT)
+    except SyntaxError:
+        return False
+    # comments and empty lines would compile too
+    return any(line.strip() != '' and not line.strip().startswith('#')
+               for line in statement.splitlines())
+
+
+def wrap_statement(statement: str, node_path: str) -> Optional[str]:
+    """Wraps a (not yet indented) statement into the time accounting of
+    the given node, or returns None if the statement can't be wrapped"""
+    if not is_simple_statement(statement):
+        return None
+    return f"_prof_t0 = _prof_clock()\n" \
+           f"{statement.rstrip(chr(10))}\n" \
+           f"_prof_add({node_path!r}, _prof_t0)"
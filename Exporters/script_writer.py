@@ -0,0 +1,102 @@
+"""Writing the final script section-by-section into a text stream"""
+import os
+import stat
+import uuid
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional, TextIO
+
+from .implementation import PythonExporterImpl
+from .source_map import LineCountingStream, OriginSpans, SourceMap
+
+
+SECTION_VARIABLES = "# ======================== VARIABLES AND PARAMETERS SETUP ========================="
+SECTION_IMPORTS = "# ================================ PACKAGE IMPORTS ================================"
+SECTION_SETUPS = "# ================================= PACKAGE SETUPS ================================"
+SECTION_SYS_FUNCTIONS = "# ================================ SYSTEM FUNCTIONS ==============================="
+SECTION_FUNCTIONS = "# ============================== GRAPH IMPLEMENTATION ============================="
+SECTION_MAIN = "# ================================== MAIN PROGRAM ================================="
+
+
+def write_chunks(stream: TextIO, chunks: Iterable[str]):
+    """Writes the chunks of a code-part one after the other"""
+    for chunk in chunks:
+        stream.write(chunk)
+
+
+def write_mapped_chunks(stream: LineCountingStream,
+                        chunks: Iterable[tuple[str, Optional[OriginSpans]]],
+                        source_map: SourceMap):
+    """Writes the chunks of a code-part and records their origins"""
+    for chunk, spans in chunks:
+        source_map.add_chunk(stream.line, chunk, spans)
+        stream.write(chunk)
+
+
+def write_script(stream: TextIO,
+                 exporter: PythonExporterImpl,
+                 header: str,
+                 source_map: Optional[SourceMap] = None):
+    """Writes the script assembled from the code-parts of the (root)
+    exporter into the stream, one section after the other, without
+    building the whole script in memory.
+
+    Args:
+        stream: any text stream (a file, sys.stdout, io.StringIO...)
+        exporter: the root exporter after the export
+        header: the header of the script
+        source_map: the map to fill with the origins of the lines (needs
+                    the `source_map` option of the export)
+    """
+    if source_map is not None:
+        stream = LineCountingStream(stream)  # type: ignore
+
+    def write_part(chunks, mapped_chunks):
+        if source_map is None:
+            write_chunks(stream, chunks())
+        else:
+            write_mapped_chunks(stream, mapped_chunks(), source_map)  # type: ignore
+
+    stream.write(f"{header}\n{SECTION_VARIABLES}\n")
+    stream.write(exporter.get_variables())
+
+    stream.write(f"\n\n{SECTION_IMPORTS}\n# pylint: disable=wrong-import-position\n")
+    stream.write(exporter.get_imports())
+    stream.write("\n# pylint: enable=wrong-import-position\n")
+
+    stream.write(f"\n{SECTION_SETUPS}\n")
+    stream.write(exporter.get_setups())
+
+    stream.write(f"\n\n{SECTION_SYS_FUNCTIONS}\n")
+    write_part(exporter.iter_sys_functions, exporter.iter_sys_functions_mapped)
+
+    stream.write(f"\n\n{SECTION_FUNCTIONS}\n")
+    write_part(exporter.iter_functions, exporter.iter_functions_mapped)
+
+    stream.write(f"\n\n{SECTION_MAIN}\n")
+    write_part(exporter.iter_calls, exporter.iter_calls_mapped)
+    stream.write("\n")
+
+
+@contextmanager
+def atomic_open(out_file_path: str, encoding: str = 'utf8') -> Iterator[TextIO]:
+    """Opens a buffered temporary file next to `out_file_path` for writing
+    and renames it to `out_file_path` when the block succeeds. If the
+    block raises, the temporary file is removed, so a partial file never
+    appears in place of the output. The new file keeps the permissions of
+    the file it replaces (e.g. an executable script stays executable).
+    """
+    directory, fname = os.path.split(os.path.abspath(out_file_path))
+    # not mkstemp: the file should get the usual permissions (umask)
+    tmp_path = os.path.join(directory, f".{fname}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, "x", encoding=encoding) as f:
+            yield f
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(out_file_path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, out_file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,246 @@
+"""Shared library of the exported scripts (the `shared_library` export
+option): the definitions of the system functions and of the graph
+implementation (compounds, Functions, python nodes...) move into the
+modules of a package next to the script, which the script imports.
+
+The name of each module is the hash of its content, so the scripts
+exported with the same definitions import the same modules and an export
+reuses the modules already written by the previous ones.
+
+A definition moves only if all the names it uses resolve in its module:
+the builtins, the imports of the script, the other moved definitions and
+the variables of the script (e.g. `VARS`), which the script binds in the
+modules after importing them. The others (e.g. the definitions using the
+setups of the script) stay in the script. The modules keep their bound
+variables in their globals, so the scripts run as programs (one script
+per process)."""
+import ast
+import builtins
+import os
+import symtable
+from typing import NamedTuple, Optional
+
+from .code_cache import code_digest
+from .implementation import PythonExporterImpl, imports_code
+from .script_writer import atomic_open
+from .source_map import OriginSpans, cut_spans
+
+
+SHARED_MODULE_HEADER = '"""Shared definitions of the exported PyFlow graphs (generated, the name ' \
+                       'of the module is the hash of its content)"""\n'
+
+# the builtins the definitions can use (the module attributes differ by module)
+_BUILTINS = set(dir(builtins)) - {'__name__', '__doc__', '__file__', '__spec__',
+                                  '__loader__', '__package__'}
+
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+class Definition(NamedTuple):
+    """A top-level definition in a chunk of a code-part"""
+    part: int
+    chunk: int
+    start: int
+    end: int
+    source: str
+    names: set[str]
+    used: set[str]
+    rebinds_globals: bool
+
+
+def _used_names(source: str, names: set[str]) -> tuple[set[str], bool]:
+    """Gets the global names a definition uses (without the ones it
+    defines), and whether it assigns any other global"""
+    used: set[str] = set()
+    rebinds = False
+    tables = [symtable.symtable(source, '<definition>', 'exec')]
+    while tables:
+        table = tables.pop()
+        top_level = table.get_type() == 'module'
+        for symbol in table.get_symbols():
+            if symbol.is_referenced() and (symbol.is_global() if not top_level else
+                                           not (symbol.is_assigned() or symbol.is_imported())):
+                used.add(symbol.get_name())
+            if not top_level and symbol.is_declared_global() and symbol.is_assigned():
+                rebinds = rebinds or symbol.get_name() not in names
+        tables.extend(table.get_children())
+    return used - names, rebinds
+
+
+def _definitions(part: int, chunk: int, text: str) -> list[Definition]:
+    """Finds the top-level definitions in a chunk (none if it doesn't parse
+    on its own or has other statements)"""
+    try:
+        tree = ast.parse(text)
+    except SyntaxError:
+        return []
+    if not all(isinstance(stmt, _DEFINITIONS) for stmt in tree.body):
+        return []
+    lines = text.splitlines(keepends=True)
+    definitions = []
+    for stmt in tree.body:
+        start = min([stmt.lineno]+[decorator.lineno for decorator in stmt.decorator_list]) - 1
+        end = stmt.end_lineno or stmt.lineno
+        # the blank lines after the definition go with it
+        while end < len(lines) and lines[end].strip() == '':
+            end += 1
+        source = ''.join(lines[start:end]).rstrip('\n') + '\n'
+        used, rebinds = _used_names(source, {stmt.name})
+        definitions.append(Definition(part, chunk, start, end, source, {stmt.name}, used, rebinds))
+    return definitions
+
+
+def _import_bindings(imports: list) -> dict[str, list]:
+    """Gets the imports (in the format of `get_imports_list`) binding each name"""
+    bindings: dict[str, list] = {}
+    for imp in imports:
+        if isinstance(imp, str):
+            bindings.setdefault(imp.partition('.')[0], []).append(imp)
+        elif isinstance(imp[1], str):
+            bindings.setdefault(imp[1], []).append(imp)
+        else:
+            for name in imp[1]:
+                bindings.setdefault(name, []).append((imp[0], [name]))
+    return bindings
+
+
+def _variables(exporter: PythonExporterImpl) -> dict[str, Optional[str]]:
+    """Gets the variables of the script with their annotations"""
+    variables: dict[str, Optional[str]] = {}
+    for stmt in ast.parse(exporter.get_variables()).body:
+        if isinstance(stmt, ast.AnnAssign) and isinstance(stmt.target, ast.Name):
+            variables[stmt.target.id] = ast.unparse(stmt.annotation)
+        elif isinstance(stmt, ast.Assign):
+            for target in stmt.targets:
+                if isinstance(target, ast.Name):
+                    variables[target.id] = None
+    return variables
+
+
+def _shareable(definitions: list[Definition],
+               resolved: set[str]) -> list[Definition]:
+    """Selects the definitions whose names all resolve (the names in
+    `resolved` or the names of the other selected definitions), in the
+    order of their dependencies"""
+    providers: dict[str, list[Definition]] = {}
+    for definition in definitions:
+        for name in definition.names:
+            providers.setdefault(name, []).append(definition)
+    # a name defined twice is the last definition in the script: keep both there
+    candidates = [definition for definition in definitions
+                  if not definition.rebinds_globals
+                  and all(len(providers[name]) == 1 for name in definition.names)]
+    changed = True
+    while changed:
+        provided = {name for definition in candidates for name in definition.names}
+        kept = [definition for definition in candidates
+                if all(name in provided or name in resolved for name in definition.used)]
+        changed = len(kept) != len(candidates)
+        candidates = kept
+    # the order of the dependencies (the mutually dependent ones stay in the script)
+    provided = {name for definition in candidates for name in definition.names}
+    ordered: list[Definition] = []
+    done: set[str] = set()
+    pending = candidates
+    while pending:
+        ready = [definition for definition in pending
+                 if all(name in done or name not in provided for name in definition.used)]
+        if not ready:
+            break
+        ordered.extend(ready)
+        done.update(name for definition in ready for name in definition.names)
+        pending = [definition for definition in pending
+                   if not definition.names <= done]
+    return ordered
+
+
+def split_shared_library(exporter: PythonExporterImpl, library: str) -> dict[str, str]:
+    """Moves the shareable definitions of the (root) exporter into the
+    modules of the library and imports them into the script instead
+
+    Returns:
+        dict[str, str]: the content of the modules by their names
+    """
+    parts = [list(exporter.iter_sys_functions_mapped()), list(exporter.iter_functions_mapped())]
+    definitions = [definition
+                   for part_index, chunks in enumerate(parts)
+                   for chunk_index, (text, _) in enumerate(chunks)
+                   for definition in _definitions(part_index, chunk_index, text)]
+    import_bindings = _import_bindings(exporter.get_imports_list())
+    variables = _variables(exporter)
+    shared = _shareable(definitions, _BUILTINS | set(import_bindings) | set(variables))
+
+    modules: dict[str, str] = {}
+    module_of: dict[str, str] = {}
+    for definition in shared:
+        imports: list = []
+        dependencies: dict[str, list[str]] = {}
+        bound = []
+        for name in sorted(definition.used):
+            if name in module_of:
+                dependencies.setdefault(module_of[name], []).append(name)
+            elif name in _BUILTINS:
+                continue
+            elif name in import_bindings:
+                imports.extend(imp for imp in import_bindings[name] if imp not in imports)
+            else:
+                bound.append(name)
+        imports.extend((f".{module}", names) for module, names in sorted(dependencies.items()))
+        content = SHARED_MODULE_HEADER
+        if imports:
+            content += imports_code(imports) + '\n'
+        for name in bound:
+            annotation = variables[name]
+            content += f"{name}{'' if annotation is None else ': '+annotation} = None" \
+                       "  # bound by the importing script\n"
+        content += f"\n\n{definition.source}"
+        module = f"m_{code_digest(content)[:16]}"
+        modules[module] = content
+        for name in definition.names:
+            module_of[name] = module
+        exporter.add_import(f"{library}.{module}", imports=sorted(definition.names))
+        if bound:
+            exporter.add_import(library, imports=[module])
+            exporter.add_setup(f"{library}.{module}",
+                               ''.join(f"{module}.{name} = {name}\n" for name in bound))
+
+    # remove the moved definitions from their chunks (from the last one)
+    for definition in sorted(shared, key=lambda definition: definition.start, reverse=True):
+        text, spans = parts[definition.part][definition.chunk]
+        lines = text.splitlines(keepends=True)
+        parts[definition.part][definition.chunk] = \
+            (''.join(lines[:definition.start]+lines[definition.end:]),
+             cut_spans(spans, definition.start, definition.end) if spans is not None else None)
+    chunks_left: list[list[tuple[str, Optional[OriginSpans]]]] = [
+        [(text, spans) for text, spans in chunks if text.strip() != ''] for chunks in parts]
+    exporter.replace_sys_functions(chunks_left[0])
+    exporter.replace_functions(chunks_left[1])
+    return modules
+
+
+def shared_module_files(library: str, modules: dict[str, str]) -> dict[str, str]:
+    """Gets the files of the library package (relative paths) with their
+    content"""
+    files = {os.path.join(library, '__init__.py'): ''}
+    files.update((os.path.join(library, module+'.py'), content)
+                 for module, content in modules.items())
+    return files
+
+
+def write_shared_library(folder: str, library: str, modules: dict[str, str]) -> list[str]:
+    """Writes the modules of the library into its package in the folder,
+    except the ones already written (by a previous export)
+
+    Returns:
+        list[str]: the paths of the written files
+    """
+    os.makedirs(os.path.join(folder, library), exist_ok=True)
+    written = []
+    for relative_path, content in shared_module_files(library, modules).items():
+        path = os.path.join(folder, relative_path)
+        if os.path.exists(path):
+            continue
+        with atomic_open(path) as f:
+            f.write(content)
+        written.append(path)
+    return written
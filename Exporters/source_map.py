@@ -0,0 +1,261 @@
+"""Source map of the generated scripts: which graph node (and converter)
+produced which lines of the script.
+
+The map is written as a sidecar `<script>.map.json` file. This module
+can also be run to attribute a traceback or a `pstats` profile of the
+generated script to the graph nodes:
+
+    python -m PyFlow.Packages.PythonExporter.Exporters.source_map script.py.map.json --traceback tb.txt
+    python -m PyFlow.Packages.PythonExporter.Exporters.source_map script.py.map.json --pstats prof.out
+"""
+import argparse
+import bisect
+import json
+import os
+import pstats
+import re
+import sys
+from typing import NamedTuple, Optional, TextIO
+
+
+class Origin(NamedTuple):
+    """The origin of some generated lines"""
+    node_path: str
+    node_uid: str
+    converter: str
+
+
+# (line offset in the chunk, origin of the lines from there)
+OriginSpans = list[tuple[int, Origin]]
+
+
+def join_mapped(chunks) -> tuple[str, OriginSpans]:
+    """Joins (text, spans) chunks into one text with the spans shifted to
+    their line offsets in the joined text"""
+    texts = []
+    spans: OriginSpans = []
+    line = 0
+    for text, chunk_spans in chunks:
+        if chunk_spans:
+            spans.extend((line+offset, origin) for offset, origin in chunk_spans)
+        texts.append(text)
+        line += text.count('\n')
+    return ''.join(texts), spans
+
+
+def shift_spans(spans: Optional[OriginSpans], by: int) -> OriginSpans:
+    """Shifts the spans by some lines"""
+    if not spans:
+        return []
+    return [(offset+by, origin) for offset, origin in spans]
+
+
+def cut_spans(spans: Optional[OriginSpans], start: int, end: int) -> OriginSpans:
+    """Adjusts the spans of a chunk to the removal of its lines from
+    `start` to `end` (exclusive): the origin of the removed lines goes on
+    after them if no other span starts there"""
+    if not spans:
+        return []
+    cut: OriginSpans = []
+    for offset, origin in spans:
+        if offset >= end:
+            offset -= end-start
+        elif offset > start:
+            offset = start
+        if cut and cut[-1][0] == offset:
+            cut.pop()
+        cut.append((offset, origin))
+    return cut
+
+
+class SourceMap:
+    """Line ranges of a generated script mapped to their origins"""
+
+    def __init__(self, script: str = ''):
+        self.script = script
+        self._starts: list[int] = []
+        self._ranges: list[tuple[int, int, Origin]] = []
+
+
+    def add_range(self, start: int, end: int, origin: Origin):
+        """Adds the (1-based, inclusive) line range [start, end]"""
+        if end < start:
+            return
+        if self._ranges and self._ranges[-1][1] == start-1 and self._ranges[-1][2] == origin:
+            # continuation of the previous range
+            self._ranges[-1] = (self._ranges[-1][0], end, origin)
+            return
+        self._starts.append(start)
+        self._ranges.append((start, end, origin))
+
+
+    def add_chunk(self, first_line: int, text: str, spans: Optional[OriginSpans]):
+        """Adds the spans of a chunk of text written from `first_line`"""
+        if not spans:
+            return
+        line_count = text.count('\n') + (0 if text.endswith('\n') or text == '' else 1)
+        for i, (offset, origin) in enumerate(spans):
+            end = spans[i+1][0] if i+1 < len(spans) else line_count
+            self.add_range(first_line+offset, first_line+min(end, line_count)-1, origin)
+
+
+    def lookup(self, line: int) -> Optional[Origin]:
+        """Gets the origin of a (1-based) line of the script"""
+        index = bisect.bisect_right(self._starts, line) - 1
+        if index < 0:
+            return None
+        start, end, origin = self._ranges[index]
+        return origin if start <= line <= end else None
+
+
+    def to_json(self) -> dict:
+        """The map as a JSON serializable dictionary"""
+        return {
+            'version': 1,
+            'script': self.script,
+            'ranges': [
+                {
+                    'start': start,
+                    'end': end,
+                    'node': origin.node_path,
+                    'uid': origin.node_uid,
+                    'converter': origin.converter
+                }
+                for start, end, origin in self._ranges
+            ]
+        }
+
+
+    @classmethod
+    def from_json(cls, data: dict) -> "SourceMap":
+        """Creates the map from the output of `to_json`"""
+        source_map = cls(data.get('script', ''))
+        for rng in data['ranges']:
+            source_map.add_range(rng['start'], rng['end'],
+                                 Origin(rng['node'], rng['uid'], rng['converter']))
+        return source_map
+
+
+    def save(self, fname: str):
+        """Saves the map as JSON"""
+        with open(fname, "w", encoding='utf8') as f:
+            json.dump(self.to_json(), f, indent=1)
+
+
+    @classmethod
+    def load(cls, fname: str) -> "SourceMap":
+        """Loads a map saved by `save`"""
+        with open(fname, "r", encoding='utf8') as f:
+            return cls.from_json(json.load(f))
+
+
+    def is_script(self, fname: str) -> bool:
+        """Returns True if the file name refers to our script"""
+        return self.script != '' and \
+            os.path.basename(fname) == os.path.basename(self.script)
+
+
+class LineCountingStream:
+    """Wraps a text stream and counts the lines written into it"""
+
+    def __init__(self, stream: TextIO):
+        self._stream = stream
+        self.newlines = 0
+
+    @property
+    def line(self) -> int:
+        """The (1-based) line where the next write starts"""
+        return self.newlines + 1
+
+    def write(self, text: str) -> int:
+        """Writes into the wrapped stream"""
+        self.newlines += text.count('\n')
+        return self._stream.write(text)
+
+
+_TRACEBACK_LINE = re.compile(r'^(\s*File "(?P<file>[^"]+)", line (?P<line>\d+).*)$')
+
+
+def attribute_traceback(traceback_text: str, source_map: SourceMap) -> str:
+    """Appends the originating node to each frame of a traceback which
+    points into the generated script"""
+    result = []
+    for line in traceback_text.splitlines():
+        match = _TRACEBACK_LINE.match(line)
+        if match and source_map.is_script(match.group('file')):
+            origin = source_map.lookup(int(match.group('line')))
+            if origin is not None:
+                line += f"  [node {origin.node_path} ({origin.converter})]"
+        result.append(line)
+    return '\n'.join(result)
+
+
+def attribute_stats(stats: pstats.Stats, source_map: SourceMap) -> dict[str, dict]:
+    """Aggregates a cProfile profile of the generated script by nodes: the
+    functions defined in the script are mapped to the node which produced
+    their definition (e.g. a compound), everything else is attributed to
+    the script functions calling it.
+
+    Returns:
+        {node path: {'calls': int, 'tottime': float, 'cumtime': float, 'functions': [str]}}
+    """
+    def node_of(func) -> Optional[str]:
+        fname, line, _ = func
+        if not source_map.is_script(fname):
+            return None
+        origin = source_map.lookup(line)
+        return None if origin is None else origin.node_path
+
+    result: dict[str, dict] = {}
+    for func, (_, ncalls, tottime, cumtime, callers) in stats.stats.items():  # type: ignore
+        node_path = node_of(func)
+        if node_path is None:
+            # attribute library calls to the script functions calling them
+            caller_nodes = {node_of(caller) for caller in callers}
+            caller_nodes.discard(None)
+            if len(caller_nodes) != 1:
+                continue
+            node_path = caller_nodes.pop()
+        stat = result.setdefault(node_path, {'calls': 0, 'tottime': 0.0,
+                                             'cumtime': 0.0, 'functions': []})
+        stat['calls'] += ncalls
+        stat['tottime'] += tottime
+        stat['cumtime'] = max(stat['cumtime'], cumtime)
+        stat['functions'].append(pstats.func_std_string(func))
+    return result
+
+
+def format_node_stats(node_stats: dict[str, dict]) -> str:
+    """Formats the output of `attribute_stats` as a table"""
+    lines = [f"{'node':<48} {'calls':>8} {'tottime':>10} {'cumtime':>10}"]
+    for node_path, stat in sorted(node_stats.items(),
+                                  key=lambda item: item[1]['tottime'],
+                                  reverse=True):
+        lines.append(f"{node_path:<48} {stat['calls']:>8} "
+                     f"{stat['tottime']:>10.6f} {stat['cumtime']:>10.6f}")
+    return '\n'.join(lines)+'\n'
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Attributes a traceback or a pstats profile to the graph nodes"""
+    parser = argparse.ArgumentParser(description="Attribute tracebacks and profiles "
+                                                 "of exported scripts to graph nodes")
+    parser.add_argument("map", help="the .map.json file of the script")
+    parser.add_argument("--traceback", help="a file containing a traceback ('-' for stdin)")
+    parser.add_argument("--pstats", help="a profile saved by cProfile")
+    args = parser.parse_args(argv)
+    source_map = SourceMap.load(args.map)
+    if args.traceback is not None:
+        if args.traceback == '-':
+            text = sys.stdin.read()
+        else:
+            with open(args.traceback, "r", encoding='utf8') as f:
+                text = f.read()
+        print(attribute_traceback(text, source_map))
+    if args.pstats is not None:
+        print(format_node_stats(attribute_stats(pstats.Stats(args.pstats), source_map)), end='')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
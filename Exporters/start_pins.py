@@ -0,0 +1,56 @@
+"""Concurrent start pins in the generated scripts (the `start_pin_pool`
+export option): the independent sections of the start pins become
+functions run on a thread or process pool"""
+from typing import TYPE_CHECKING
+
+from PyFlow.Core import PinBase
+
+from .dependencies import analyse_start_pins
+
+if TYPE_CHECKING:
+    from .implementation import PythonExporterImpl
+
+
+# the executors of the pools by the values of the option
+START_PIN_POOLS = {
+    'thread': 'concurrent.futures.ThreadPoolExecutor',
+    'process': 'concurrent.futures.ProcessPoolExecutor',
+}
+
+
+def prepare_pooled_start_pins(exporter: "PythonExporterImpl", startpins: list[PinBase]) -> bool:
+    """Checks if the sections of the start pins are independent, so they
+    can run on a pool, and computes the pure nodes shared by them before.
+
+    Returns:
+        bool: False if the sections are not independent (the reasons are
+              reported as diagnostics)
+    """
+    if len(startpins)<2:
+        return False
+    analysis = analyse_start_pins(startpins, exporter.is_node_processed)
+    if analysis.conflicts:
+        for conflict in analysis.conflicts:
+            exporter.add_diagnostic(f"start pins not run concurrently: {conflict}")
+        return False
+    exporter.add_import('concurrent.futures')
+    for pure_node in analysis.hoisted:
+        exporter.process_node(pure_node)
+    return True
+
+
+def run_pooled_start_pins(startpins: list[PinBase], pool: str, main_guard: bool) -> str:
+    """The statement running the functions of the start pins on a pool and
+    waiting for all of them (a process pool starting new interpreters
+    imports the script, so its top level is guarded then)"""
+    loop = "    for start_pin_future in ["
+    submits = f",\n{' '*len(loop)}".join(f"start_pin_executor.submit({start.getFullName()})"
+                                          for start in startpins)
+    statement = f"with {START_PIN_POOLS[pool]}(max_workers={len(startpins)}) " \
+                f"as start_pin_executor:\n" \
+                f"{loop}{submits}]:\n" \
+                f"        start_pin_future.result()"
+    if main_guard:
+        statement = "if __name__ == '__main__':\n" + \
+                    '\n'.join('    '+line for line in statement.splitlines())
+    return statement
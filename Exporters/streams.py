@@ -0,0 +1,49 @@
+"""Recognition of streamed pins: the outputs of the streaming file reading
+nodes are generators, and the string nodes consuming them are converted
+into generator expressions so the data is processed item by item instead
+of as one giant string"""
+from PyFlow.Core import PinBase, NodeBase
+
+
+# the nodes producing a generator of strings
+STREAM_NODES = {'readLines', 'readChunks', 'mmapLines'}
+
+# the (pure) string nodes mapped over the items of a stream flowing into them
+STREAM_MAPPING_NODES = {'startsWith', 'concat'}
+
+
+def is_stream(pin: PinBase) -> bool:
+    """Returns True if the (output) pin holds a stream: the output of a
+    streaming node, or of a string node mapped over a stream"""
+    node: NodeBase = pin.owningNode()
+    node_class = node.__class__.__name__
+    if node_class in STREAM_NODES:
+        return pin.name == 'out'
+    if node_class in STREAM_MAPPING_NODES:
+        return any(stream_inputs(node))
+    return False
+
+
+def stream_inputs(node: NodeBase) -> list[bool]:
+    """Gets for each data input pin of the node if a stream flows into it"""
+    return [any(is_stream(source) for source in list(pin.affected_by))
+            for pin in node.orderedInputs.values()
+            if not pin.isExec()]
+
+
+def map_stream(inpnames: list[str], streams: list[bool], expression: str) -> str:
+    """Gets the generator expression mapping `expression` over the items of
+    the streamed inputs (the other inputs are used as they are)
+
+    Args:
+        inpnames: the names of the inputs
+        streams: for each input if it is a stream (see `stream_inputs`)
+        expression: the expression with `{0}`, `{1}`... as the inputs
+    """
+    items = [f"item_{i}" if stream else name
+             for i, (name, stream) in enumerate(zip(inpnames, streams))]
+    sources = [name for name, stream in zip(inpnames, streams) if stream]
+    targets = [item for item, stream in zip(items, streams) if stream]
+    if len(sources)==1:
+        return f"({expression.format(*items)} for {targets[0]} in {sources[0]})"
+    return f"({expression.format(*items)} for {', '.join(targets)} in zip({', '.join(sources)}))"
@@ -0,0 +1,73 @@
+"""Structural hashes of graphs: the inner graphs of compounds with the same
+hash have the same node types, links and constant pin values (their node
+names may differ, e.g. of copy-pasted compounds), so the compounds can
+share one exported function.
+
+The hash refines the labels of the nodes by those of their neighbours
+(Weisfeiler-Lehman) until the partition of the nodes is stable."""
+import hashlib
+from typing import Optional
+
+from PyFlow.Core import GraphBase, NodeBase
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode('utf8')).hexdigest()
+
+
+def node_label(node: NodeBase, cache: Optional[dict[int, str]] = None) -> str:
+    """The label of a node without its name and links: its type, its pins
+    with the constant values of the unconnected inputs, its variable, its
+    code (of a python node) and the structure of its inner graph"""
+    parts = [node.__class__.__name__]
+    for pin in node.orderedInputs.values():
+        value = '' if pin.isExec() or pin.hasConnections() else repr(pin.currentData())
+        parts.append(f"<{pin.name}:{pin.dataType}:{pin.structureType}={value}")
+    for pin in node.orderedOutputs.values():
+        parts.append(f">{pin.name}:{pin.dataType}:{pin.structureType}")
+    var = getattr(node, 'var', None)
+    if var is not None:
+        parts.append(f"var={var.name}")
+    code = getattr(node, 'nodeData', None)
+    if isinstance(code, str):
+        parts.append(f"code={code}")
+    inner_graph = getattr(node, 'rawGraph', None)
+    if inner_graph is not None:
+        parts.append(f"graph={structure_hash(inner_graph, cache)}")
+    return _digest('\n'.join(parts))
+
+
+def _links(node: NodeBase, labels: dict[int, str]) -> list[str]:
+    """The links of a node described by the labels of the nodes at their
+    other ends"""
+    links = []
+    for pin in node.orderedOutputs.values():
+        for target in list(pin.affects):
+            links.append(f">{pin.name}:{labels.get(id(target.owningNode()))}.{target.name}")
+    for pin in node.orderedInputs.values():
+        for source in list(pin.affected_by):
+            links.append(f"<{pin.name}:{labels.get(id(source.owningNode()))}.{source.name}")
+    return sorted(links)
+
+
+def structure_hash(graph: GraphBase, cache: Optional[dict[int, str]] = None) -> str:
+    """Gets the structural hash of a graph (the hashes of the inner graphs
+    are cached by their ids in `cache` if given)"""
+    if cache is not None and id(graph) in cache:
+        return cache[id(graph)]
+    nodes = graph.getNodesList()
+    labels = {id(node): node_label(node, cache) for node in nodes}
+    classes = len(set(labels.values()))
+    for _ in range(len(nodes)):
+        refined = {id(node): _digest('\n'.join([labels[id(node)]] + _links(node, labels)))
+                   for node in nodes}
+        refined_classes = len(set(refined.values()))
+        labels = refined
+        if refined_classes == classes:
+            break
+        classes = refined_classes
+    result = _digest('\n'.join(sorted(labels[id(node)] + ''.join(_links(node, labels))
+                                      for node in nodes)))
+    if cache is not None:
+        cache[id(graph)] = result
+    return result
@@ -0,0 +1,131 @@
+"""Watch mode: re-exports the graph files when they change.
+
+The files are polled (their modification time and size, no platform
+specific notification API). A burst of edits (e.g. a save writing the
+file in several steps) is exported once: a changed file is exported when
+it didn't change for the debounce time. Only the changed graphs are
+exported again, by the same export function, so the already initialised
+packages and converters (see `ConverterRegistry`) are reused.
+"""
+import os
+import threading
+import time
+import traceback
+from typing import Callable, Optional
+
+# (size, modification time) of a file or None if it doesn't exist
+FileStamp = Optional[tuple[int, int]]
+
+WATCH_INTERVAL = 0.2
+WATCH_DEBOUNCE = 0.3
+
+
+def file_stamp(path: str) -> FileStamp:
+    """Gets what tells a change of a file"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class GraphWatcher:
+    """Re-exports the changed graph files
+
+    Args:
+        export: exports a graph file (its only argument), e.g. with the
+                converters collected once
+        graph_fnames: the watched graph files
+        debounce: the seconds a changed file must stay unchanged before it
+                  is exported
+        on_exported: called with the graph file and the seconds of its
+                     export after each export
+        on_failed: called with the graph file and the exception if its
+                   export fails (it's exported again after its next change)
+    """
+
+    def __init__(self,
+                 export: Callable[[str], object],
+                 graph_fnames: list[str],
+                 debounce: float = WATCH_DEBOUNCE,
+                 on_exported: Optional[Callable[[str, float], None]] = None,
+                 on_failed: Optional[Callable[[str, Exception], None]] = None):
+        self._export = export
+        self._debounce = debounce
+        self._on_exported = on_exported
+        self._on_failed = on_failed
+        # the stamps of the exported files
+        self._exported: dict[str, FileStamp] = {fname: file_stamp(fname) for fname in graph_fnames}
+        # the changed files: their last stamp and since when it is unchanged
+        self._changed: dict[str, tuple[FileStamp, float]] = {}
+
+
+    def poll(self, now: Optional[float] = None) -> list[str]:
+        """Checks the files once and exports the ones which changed and
+        then stayed unchanged for the debounce time
+
+        Returns:
+            list[str]: the exported graph files
+        """
+        if now is None:
+            now = time.monotonic()
+        ready = []
+        for fname, exported_stamp in self._exported.items():
+            stamp = file_stamp(fname)
+            if stamp == exported_stamp:
+                self._changed.pop(fname, None)
+                continue
+            changed = self._changed.get(fname)
+            if changed is None or changed[0] != stamp:
+                # a new change: wait for the end of the burst
+                self._changed[fname] = (stamp, now)
+            elif now - changed[1] >= self._debounce:
+                ready.append(fname)
+        exported = []
+        for fname in ready:
+            stamp, _ = self._changed.pop(fname)
+            self._exported[fname] = stamp
+            # removed: exported again when it comes back
+            if stamp is not None and self._export_graph(fname):
+                exported.append(fname)
+        return exported
+
+
+    def export_all(self) -> list[str]:
+        """Exports all the files now (e.g. at the start of the watch)
+
+        Returns:
+            list[str]: the exported graph files (without the failed ones)
+        """
+        exported = []
+        for fname in self._exported:
+            self._exported[fname] = file_stamp(fname)
+            self._changed.pop(fname, None)
+            if self._export_graph(fname):
+                exported.append(fname)
+        return exported
+
+
+    def _export_graph(self, fname: str) -> bool:
+        """Exports a file, reports a failure instead of raising it"""
+        start = time.perf_counter()
+        try:
+            self._export(fname)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            if self._on_failed is None:
+                traceback.print_exc()
+            else:
+                self._on_failed(fname, e)
+            return False
+        if self._on_exported is not None:
+            self._on_exported(fname, time.perf_counter()-start)
+        return True
+
+
+    def run(self, stop: Optional[threading.Event] = None, interval: float = WATCH_INTERVAL):
+        """Polls the files until `stop` is set (or forever)"""
+        if stop is None:
+            stop = threading.Event()
+        while not stop.is_set():
+            self.poll()
+            stop.wait(interval)
@@ -0,0 +1,68 @@
+"""Streaming file nodes: the reading ones output generators, so a large
+file is processed piece by piece (e.g. by a forEachLoop or the string
+nodes mapped over the stream in the exported script), writeLines consumes
+a stream (or any iterable) line by line"""  # pylint: disable=invalid-name
+import mmap
+import os
+
+from PyFlow.Core import FunctionLibraryBase, IMPLEMENT_NODE  # pylint: disable=import-error # type: ignore
+from PyFlow.Core.Common import (  # pylint: disable=import-error # type: ignore
+    NodeMeta, NodeTypes, PinOptions, PinSpecifiers
+)
+
+
+STREAM_OUT = ('AnyPin', None, {PinSpecifiers.ENABLED_OPTIONS: PinOptions.AllowAny})
+
+
+class StreamIOLib(FunctionLibraryBase):
+    """Streaming file nodes"""
+
+    def __init__(self, packageName):
+        super().__init__(packageName)
+
+    @staticmethod
+    @IMPLEMENT_NODE(returns=STREAM_OUT, nodeType=NodeTypes.Callable,
+                    meta={NodeMeta.CATEGORY: 'IO|Streams',
+                          NodeMeta.KEYWORDS: ['read', 'file', 'lines']})
+    def readLines(file=('StringPin', ''), encoding=('StringPin', 'utf-8')):  # pylint: disable=invalid-name
+        """Iterates over the lines of a text file (without the line ends)"""
+        with open(file, encoding=encoding) as f:
+            for line in f:
+                yield line.rstrip('\n')
+
+    @staticmethod
+    @IMPLEMENT_NODE(returns=STREAM_OUT, nodeType=NodeTypes.Callable,
+                    meta={NodeMeta.CATEGORY: 'IO|Streams',
+                          NodeMeta.KEYWORDS: ['read', 'file', 'chunks']})
+    def readChunks(file=('StringPin', ''), encoding=('StringPin', 'utf-8'),  # pylint: disable=invalid-name
+                   chunkSize=('IntPin', 1 << 20)):  # pylint: disable=invalid-name
+        """Iterates over a text file in chunks of `chunkSize` characters"""
+        with open(file, encoding=encoding) as f:
+            while chunk := f.read(chunkSize):
+                yield chunk
+
+    @staticmethod
+    @IMPLEMENT_NODE(returns=STREAM_OUT, nodeType=NodeTypes.Callable,
+                    meta={NodeMeta.CATEGORY: 'IO|Streams',
+                          NodeMeta.KEYWORDS: ['read', 'file', 'lines', 'mmap']})
+    def mmapLines(file=('StringPin', ''), encoding=('StringPin', 'utf-8')):  # pylint: disable=invalid-name
+        """Iterates over the lines of a read-only memory mapped text file
+        (without the line ends, the encoding must keep '\\n' a single byte)"""
+        with open(file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for line in iter(mm.readline, b''):
+                    line = line.decode(encoding)
+                    yield line[:-2] if line.endswith('\r\n') else line.rstrip('\n')
+
+    @staticmethod
+    @IMPLEMENT_NODE(returns=None, nodeType=NodeTypes.Callable,
+                    meta={NodeMeta.CATEGORY: 'IO|Streams',
+                          NodeMeta.KEYWORDS: ['write', 'file', 'lines']})
+    def writeLines(file=('StringPin', ''), lines=STREAM_OUT,  # pylint: disable=invalid-name
+                   encoding=('StringPin', 'utf-8')):
+        """Writes the lines (e.g. a stream) into a text file, each with a line end"""
+        with open(file, 'w', encoding=encoding) as f:
+            for line in lines:
+                f.write(f"{line}\n")
@@ -7,6 +7,7 @@ from PyFlow.Core.Common import clearSignal, PinSelectionGroup
 from PyFlow.Core import NodeBase, PinBase, GraphBase
 from PyFlow.Core.Common import PinOptions
 from PyFlow.Packages.PyFlowBase.Nodes import FLOW_CONTROL_COLOR
+from PyFlow.Packages.PythonExporter.Exporters.compounds import call_compound, export_compound_function  # pylint: disable=import-error, no-name-in-module # type: ignore
 from blinker import Signal
 
 if TYPE_CHECKING:
@@ -196,52 +197,9 @@ class Function(NodeBase):
         if node is None:
             return
         node = cast('compound', node)
-        if not exporter.is_node_function_processed(self):
-            subexporter = exporter.__class__(node.rawGraph, # type: ignore
-                                             exporter.converter_classes,
-                                             1,
-                                             exporter.exported_node_functions
-                                            )
-            exec_in_pins: list[PinBase] = [
-                pin
-                for pin
-                in node.orderedInputs.values()
-                if pin.isExec()
-            ]
-            if len(exec_in_pins)>0: # follow the flow fom first exec pin
-                first_exec_pin = list(exec_in_pins[0].affects)[0]
-                subexporter.export_from_pin(first_exec_pin)
-            else: # no exec pin -> follow he flow back from output pins
-                graph_output_nodes = cast(GraphBase, node.rawGraph) \
-                    .getNodesList(classNameFilters=['graphOutputs'])
-                for outnode in graph_output_nodes:
-                    subexporter.process_node(outnode)
-            for key, exp in subexporter.exported_node_functions.items():
-                if key not in exporter.exported_node_functions:
-                    exporter.set_node_function_processed(exp)
-            for key, visited_node in subexporter.visited_nodes.items():
-                if key not in exporter.visited_nodes:
-                    exporter.set_node_processed(visited_node)
-            exporter.add_imports(subexporter.get_imports_list())
-            exporter.add_setups(subexporter.get_setups_list())
-            in_pin_names = [pin.name
-                            for pin
-                            in node.orderedInputs.values()
-                            if not pin.isExec()
-                           ]
-            exporter.add_sys_function(subexporter.get_sys_functions())
-            exporter.add_function(subexporter.get_functions() +
-                                  f"\ndef {node.name}({', '.join(in_pin_names)}):\n" +
-                                  f"{subexporter.get_calls()}")
-            exporter.set_node_function_processed(self)
-        # export call
-        exporter.add_call(f"{exporter.get_out_list(self, post=' = ')}{node.name}(" +
-                          f"{', '.join(inpnames[1:])})\n")
-        exporter.set_node_processed(self)
-        if self.getPinSG('out', PinSelectionGroup.Outputs) is not None:
-            exporter.call_named_pin(self, 'out')
-                # TODO: this is an actual example not a generalized one
-                # (could be multople which should be called from inside the exported function)
+        export_compound_function(exporter, node, self)
+        # the first argument is the referenced function
+        call_compound(exporter, self, node, node.name, inpnames[1:])
 
 
     def compute(self, *args, **kwargs):
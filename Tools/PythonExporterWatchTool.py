@@ -0,0 +1,31 @@
+"""A shelf tool toggling the watch mode of the Python exporter"""  # pylint: disable=invalid-name
+
+from qtpy import QtGui
+
+from PyFlow.UI.Tool.Tool import ShelfTool
+
+from PyFlow.Packages.PythonExporter.Exporters.python_exporter import (  # pylint: disable=import-error, no-name-in-module # type: ignore
+    PythonExporter
+)
+
+
+class PythonExporterWatchTool(ShelfTool):
+    """Turns the watch mode of the Python exporter on or off: while it's
+    on, the graph is exported again after each burst of edits"""
+
+    @staticmethod
+    def toolTip():  # pylint: disable=invalid-name
+        return "Export the graph to a Python script after each edit (on/off)"
+
+    @staticmethod
+    def getIcon():  # pylint: disable=invalid-name
+        return QtGui.QIcon.fromTheme("view-refresh")
+
+    @staticmethod
+    def name():
+        return "PythonExporterWatchTool"
+
+    def do(self):
+        """Toggles the watch mode"""
+        watching = PythonExporter.toggleWatch(self.pyFlowInstance)
+        print(f"Python exporter watch mode {'on' if watching else 'off'}")
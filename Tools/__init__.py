@@ -0,0 +1 @@
+"""The tools of the Python exporter in the PyFlow editor"""
@@ -0,0 +1 @@
+"""Benchmarks of the exporter and of the generated scripts"""
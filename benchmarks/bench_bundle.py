@@ -0,0 +1,65 @@
+"""Benchmark of the bundles of the scripts (`bundle` option): the cold
+start of a large generated script (a Sequence with many branches, see
+`synthetic.py`) run from its source, which is compiled at each launch,
+from its byte code and from its zipapp.
+
+Each launch is a new interpreter, the times are the best of the runs.
+
+Usage:
+    python -m PyFlow.Packages.PythonExporter.benchmarks.bench_bundle [--size 10000 --repeat 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from PyFlow import INITIALIZE
+from PyFlow.Core.GraphManager import GraphManager
+
+from .synthetic import sequence_fanout
+from ..Exporters.bundle import bundle_paths
+from ..Exporters.export_job import ExportJob, collect_converters
+from ..Exporters.options import ExportOptions
+
+
+def time_launch(fname: str, repeat: int) -> float:
+    """Runs a script in new interpreters (the best wall time of `repeat` runs)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, fname], stdout=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter()-start)
+    return best
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Runs the benchmark and prints the timings"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=10000, help="the number of branches")
+    parser.add_argument("--repeat", type=int, default=10, help="the number of timed launches")
+    args = parser.parse_args(argv)
+    INITIALIZE([])
+
+    graph_manager = GraphManager()
+    graph_manager.deserialize(sequence_fanout(args.size))
+    job = ExportJob(graph_manager.findRootGraph(), collect_converters(),
+                    options=ExportOptions(bundle='zipapp'))
+    job.run()
+    with tempfile.TemporaryDirectory() as folder:
+        fname = os.path.join(folder, 'script.py')
+        job.save(fname, "")
+        with open(fname, 'r', encoding='utf8') as f:
+            lines = sum(1 for _ in f)
+        print(f"script: {lines} lines")
+        baseline = time_launch(os.devnull, args.repeat)
+        print(f"{'interpreter':12} {baseline*1000:9.2f} ms")
+        for name, launched in zip(['source', 'pyc', 'zipapp'], [fname]+bundle_paths(fname, 'zipapp')):
+            print(f"{name:12} {time_launch(launched, args.repeat)*1000:9.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""Benchmark of the export itself on synthetic graphs (see `synthetic.py`)
+of several shapes and sizes: the wall time of the export (traversal and
+assembly of the script), its peak memory (`tracemalloc`) and the size of
+the script.
+
+The results are written as JSON and compared with a stored baseline: the
+benchmark fails (exit code 1) if a metric grew beyond the threshold, or
+a case which exported before fails now. The timings depend on the
+machine, update the baseline on the machine running the comparison.
+
+Usage:
+    python -m PyFlow.Packages.PythonExporter.benchmarks.bench_export [--sizes 25 100 400]
+    python -m PyFlow.Packages.PythonExporter.benchmarks.bench_export --update-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Optional
+
+from PyFlow import INITIALIZE
+from PyFlow.Core.GraphManager import GraphManager
+
+from .synthetic import SHAPES
+from ..Exporters.export_job import ExportJob, collect_converters
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'baselines', 'export_baseline.json')
+
+DEFAULT_SIZES = [25, 100, 400]
+
+# the growth of the metrics below these amounts is noise, not a regression
+METRIC_SLACK = {
+    'seconds': 0.002,
+    'peak_bytes': 64*1024,
+    'output_bytes': 0,
+}
+
+
+def export(graph_manager: GraphManager, converters: list[object]) -> str:
+    """Exports the root graph of the graph manager into a script string"""
+    job = ExportJob(graph_manager.findRootGraph(), converters)
+    job.run()
+    return job.render("")
+
+
+def measure(shape: str, size: int, converters: list[object], repeat: int) -> dict:
+    """Measures the export of one synthetic graph (the best time of
+    `repeat` exports, the peak memory of one more traced export)"""
+    result: dict = {'name': f"{shape}[{size}]", 'shape': shape, 'size': size}
+    try:
+        graph_manager = GraphManager()
+        graph_manager.deserialize(SHAPES[shape](size))
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # e.g. a RecursionError of PyFlow on a too deep graph: nothing to export
+        result.update({'error': type(e).__name__, 'phase': 'load'})
+        return result
+    try:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            script = export(graph_manager, converters)
+            best = min(best, time.perf_counter()-start)
+        tracemalloc.start()
+        try:
+            export(graph_manager, converters)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # a failing export is a result too
+        result.update({'error': type(e).__name__, 'phase': 'export'})
+        return result
+    result.update({'seconds': best, 'peak_bytes': peak, 'output_bytes': len(script.encode('utf8'))})
+    return result
+
+
+def compare(results: list[dict], baseline: list[dict], threshold: float,
+            metric_slack: Optional[dict[str, float]] = None) -> list[str]:
+    """Gets the regressions of the results compared with the baseline (the
+    cases are matched by their names, the metrics are the keys of
+    `metric_slack`, by default those of the export, and the outputs of
+    the scripts must not change)"""
+    if metric_slack is None:
+        metric_slack = METRIC_SLACK
+    base_cases = {case['name']: case for case in baseline}
+    regressions = []
+    for case in results:
+        base = base_cases.get(case['name'])
+        name = case['name']
+        if base is None:
+            continue
+        if 'error' in case:
+            if 'error' not in base:
+                regressions.append(f"{name}: fails with {case['error']}")
+            continue
+        if 'error' in base:
+            continue
+        if 'output' in base and case.get('output') != base['output']:
+            regressions.append(f"{name}: output {base['output']} -> {case.get('output')}")
+        for metric, slack in metric_slack.items():
+            if case[metric] > base[metric]*(1+threshold) + slack:
+                regressions.append(f"{name}: {metric} {base[metric]:g} -> {case[metric]:g} "
+                                   f"(+{case[metric]/base[metric]-1:.0%})")
+    return regressions
+
+
+def store_and_compare(report: dict, output: Optional[str], baseline_fname: str,
+                      update_baseline: bool, threshold: float,
+                      metric_slack: Optional[dict[str, float]] = None) -> int:
+    """Writes the report of a benchmark (as the results and/or the new
+    baseline) and compares its results with the baseline (the exit code:
+    1 if there are regressions)"""
+    if output is not None:
+        with open(output, 'w', encoding='utf8') as f:
+            json.dump(report, f, indent=2)
+    if update_baseline:
+        os.makedirs(os.path.dirname(baseline_fname), exist_ok=True)
+        with open(baseline_fname, 'w', encoding='utf8') as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline saved: {baseline_fname}")
+        return 0
+    if not os.path.exists(baseline_fname):
+        print(f"no baseline: {baseline_fname}", file=sys.stderr)
+        return 0
+    with open(baseline_fname, 'r', encoding='utf8') as f:
+        baseline = json.load(f)['results']
+    regressions = compare(report['results'], baseline, threshold, metric_slack)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def format_case(case: dict) -> str:
+    """A line of the results table"""
+    name = f"{case['shape']:20} {case['size']:6}"
+    if 'error' in case:
+        return f"{name}   {case['error']} in the {case.get('phase', 'export')}"
+    return f"{name} {case['seconds']*1000:10.2f} ms {case['peak_bytes']/1024:10.1f} KiB " \
+           f"{case['output_bytes']:10} B"
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Runs the benchmark, writes the results and compares them with the baseline"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shapes", nargs='*', choices=list(SHAPES), default=list(SHAPES),
+                        help="the shapes of the graphs")
+    parser.add_argument("--sizes", nargs='*', type=int, default=DEFAULT_SIZES,
+                        help="the sizes of the graphs")
+    parser.add_argument("--repeat", type=int, default=5, help="the number of timed exports")
+    parser.add_argument("-o", "--output", default=None, help="the JSON file of the results")
+    parser.add_argument("--baseline", default=BASELINE, help="the JSON file of the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="the allowed relative growth of the metrics")
+    parser.add_argument("--update-baseline", action='store_true',
+                        help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+    INITIALIZE([])
+    converters = collect_converters()
+
+    results = []
+    for shape in args.shapes:
+        for size in args.sizes:
+            results.append(measure(shape, size, converters, args.repeat))
+            print(format_case(results[-1]))
+    report = {'python': platform.python_version(), 'machine': platform.machine(),
+              'results': results}
+    return store_and_compare(report, args.output, args.baseline,
+                             args.update_baseline, args.threshold)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Benchmark of the lazy imports (`lazy_imports` option): short-lived
+scripts whose imports are mostly not needed by the run, exported with
+eager and lazy imports:
+- a branch doing NumPy math which is not taken (`numpy_arrays` mode),
+- a batch script run on one row (`multiprocessing` is only used with -j).
+
+The scripts run as new interpreters with `python -X importtime`: the
+import time is the sum of the self times it reports (the best of the
+runs), next to the wall time of the whole run.
+
+Usage:
+    python -m PyFlow.Packages.PythonExporter.benchmarks.bench_lazy_imports [--repeat 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import NamedTuple, Optional
+
+from PyFlow import INITIALIZE
+
+from .bench_numpy_mode import export_script
+from ..Exporters.options import ExportOptions
+
+
+class Case(NamedTuple):
+    """A graph of the benchmark with its export options and standard input"""
+    graph: str
+    options: ExportOptions
+    stdin: str = ''
+
+
+CASES = {
+    'NumPy branch': Case('lazy_numpy_branch.pygraph', ExportOptions(numpy_arrays=True)),
+    'batch (1 row)': Case('lazy_batch.pygraph', ExportOptions(batch_mode=True),
+                          '{"a": 3.0, "b": 4.0}\n'),
+}
+
+
+def import_time(stderr: str) -> tuple[int, int]:
+    """Parses the output of `-X importtime`: the number of imported modules
+    and the sum of their self times (in microseconds)"""
+    modules = 0
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us = line.split(':', 1)[1].split('|')[0].strip()
+        if self_us.isdigit():
+            modules += 1
+            total += int(self_us)
+    return modules, total
+
+
+def time_script(fname: str, stdin: str, repeat: int) -> tuple[float, int, int]:
+    """Runs a script with `-X importtime` (the best wall and import times of
+    `repeat` runs, in seconds and microseconds, and the number of modules)"""
+    best_wall = float('inf')
+    best_import = None
+    modules = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', fname],
+                                input=stdin, capture_output=True, text=True, check=True)
+        best_wall = min(best_wall, time.perf_counter()-start)
+        modules, total = import_time(result.stderr)
+        best_import = total if best_import is None else min(best_import, total)
+    return best_wall, best_import or 0, modules
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Runs the benchmark and prints the timings"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="the number of timed runs")
+    args = parser.parse_args(argv)
+    INITIALIZE([])
+
+    with tempfile.TemporaryDirectory() as folder:
+        for case_name, case in CASES.items():
+            for mode, lazy in [('eager', False), ('lazy', True)]:
+                fname = os.path.join(folder, f"{mode}_{case.graph}.py")
+                with open(fname, 'w', encoding='utf8') as f:
+                    f.write(export_script(case.graph, case.options._replace(lazy_imports=lazy)))
+                wall, imports, modules = time_script(fname, case.stdin, args.repeat)
+                print(f"{case_name:14} {mode:6} modules: {modules:4}   "
+                      f"imports: {imports/1000:8.2f} ms   wall: {wall*1000:8.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
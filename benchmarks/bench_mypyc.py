@@ -0,0 +1,72 @@
+"""Benchmark of the type-annotated scripts (`type_annotations` option):
+a compute-heavy graph (nested loops of integer math) exported as the plain
+script and as the annotated one, run by the interpreter and compiled by
+mypyc (needs mypy and a C compiler).
+
+The whole scripts are timed as new interpreters in a temporary folder
+(the compiled one is imported as an extension module).
+
+Usage:
+    python -m PyFlow.Packages.PythonExporter.benchmarks.bench_mypyc [--repeat 5]
+"""
+import argparse
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from PyFlow import INITIALIZE
+
+from .bench_numpy_mode import export_script
+from ..Exporters.options import ExportOptions
+
+
+GRAPH = 'typed_compute.pygraph'
+
+
+def time_command(command: list[str], folder: str, repeat: int) -> float:
+    """Runs a command (the best of `repeat` runs, in seconds)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=folder, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter()-start)
+    return best
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Runs the benchmark and prints the timings"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="the number of timed runs")
+    args = parser.parse_args(argv)
+    if importlib.util.find_spec('mypyc') is None:
+        print("mypyc is not installed (pip install mypy)", file=sys.stderr)
+        return 1
+    INITIALIZE([])
+
+    with tempfile.TemporaryDirectory() as folder:
+        for module, options in [('plain', ExportOptions()),
+                                ('annotated', ExportOptions(type_annotations=True))]:
+            with open(os.path.join(folder, module+'.py'), 'w', encoding='utf8') as f:
+                f.write(export_script(GRAPH, options))
+        timings = {
+            'plain interpreted': time_command([sys.executable, 'plain.py'], folder, args.repeat),
+            'annotated interpreted': time_command([sys.executable, 'annotated.py'],
+                                                  folder, args.repeat),
+        }
+        subprocess.run([sys.executable, '-m', 'mypyc', 'annotated.py'], cwd=folder, check=True,
+                       stdout=subprocess.DEVNULL)
+        # the extension module is imported instead of the source next to it
+        timings['annotated compiled'] = time_command([sys.executable, '-c', 'import annotated'],
+                                                     folder, args.repeat)
+    baseline = timings['plain interpreted']
+    for name, elapsed in timings.items():
+        print(f"{name:22} {elapsed*1000:10.2f} ms {baseline/elapsed:6.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
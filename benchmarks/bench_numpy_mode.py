@@ -0,0 +1,80 @@
+"""Benchmark of the vectorised NumPy mode (`numpy_arrays` option): the
+same graph, a loop over a large array with elementwise math in its body,
+exported in the default mode (the math runs in the loop) and in the NumPy
+mode (the math runs on the whole array before the loop, the loop only
+runs the rest of the body).
+
+Only the main program of the scripts is timed (the array is put into
+their namespace instead of the script literal).
+
+Usage:
+    python -m PyFlow.Packages.PythonExporter.benchmarks.bench_numpy_mode [--size 1000000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Optional
+
+from PyFlow import INITIALIZE
+from PyFlow.Core.GraphManager import GraphManager
+
+from ..Exporters.export_job import ExportJob, collect_converters
+from ..Exporters.options import ExportOptions
+from ..Exporters.script_writer import SECTION_MAIN
+
+
+GRAPHS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'graphs')
+
+
+def export_script(graph_fname: str, options: ExportOptions) -> str:
+    """Exports a graph of the benchmark into a script string"""
+    with open(os.path.join(GRAPHS_FOLDER, graph_fname), "r", encoding='utf8') as f:
+        data = json.load(f)
+    graph_manager = GraphManager()
+    graph_manager.deserialize(data)
+    job = ExportJob(graph_manager.findRootGraph(), collect_converters(), options=options)
+    job.run()
+    return job.render("")
+
+
+def time_main(script: str, values: list[float], repeat: int) -> float:
+    """Runs the setup part of the script once, then times its main program
+    on `values` (the best of `repeat` runs, in seconds)"""
+    setup, main = script.split(SECTION_MAIN, 1)
+    namespace: dict = {'__name__': '__bench__'}
+    exec(compile(setup, '<setup>', 'exec'), namespace)  # pylint: disable=exec-used
+    code = compile(main, '<main>', 'exec')
+    best = float('inf')
+    for _ in range(repeat):
+        namespace['values'] = values
+        start = time.perf_counter()
+        exec(code, namespace)  # pylint: disable=exec-used
+        best = min(best, time.perf_counter()-start)
+    return best
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Runs the benchmark and prints the timings"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1_000_000, help="the length of the array")
+    parser.add_argument("--repeat", type=int, default=5, help="the number of timed runs")
+    args = parser.parse_args(argv)
+    INITIALIZE([])
+    values = [float(i % 1000) for i in range(args.size)]
+
+    scalar = time_main(export_script('numeric_scalar_loop.pygraph', ExportOptions()),
+                       values, args.repeat)
+    vectorised = time_main(export_script('numeric_scalar_loop.pygraph',
+                                         ExportOptions(numpy_arrays=True)),
+                           values, args.repeat)
+    print(f"array size:       {args.size}")
+    print(f"scalar loop:      {scalar*1000:10.2f} ms")
+    print(f"NumPy vectorised: {vectorised*1000:10.2f} ms")
+    print(f"speedup:          {scalar/vectorised:10.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""Benchmark of the generated scripts: each graph of `tests/graphs` (with
+the export options its tests use) and the synthetic graphs (see
+`synthetic.py`) are exported and run in new interpreters, each running
+the script many times:
+- the startup time is that of the first run (the compile of the script,
+  the imports of its modules and its first execution), the best of the
+  processes,
+- the steady-state time is the best of the other runs (the noise of the
+  machine only adds to the times),
+- the peak RSS is the maximum resident memory of the processes,
+- the output is what one more run of the script prints (its first lines,
+  sorted: the order of the concurrent parts varies), so a broken script
+  shows in the results and a changed output is a regression.
+
+The results are written as JSON and compared with a stored baseline like
+those of `bench_export`, so a converter change making the generated code
+slower shows up as a regression. The timings depend on the machine,
+update the baseline on the machine running the comparison. The startup
+times (mostly imports) are noisy, hence the larger default threshold than
+that of `bench_export`.
+
+Usage:
+    python -m PyFlow.Packages.PythonExporter.benchmarks.bench_runtime [--runs 20 --processes 5]
+    python -m PyFlow.Packages.PythonExporter.benchmarks.bench_runtime --update-baseline
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from typing import NamedTuple, Optional
+
+from PyFlow import INITIALIZE
+from PyFlow.Core.GraphManager import GraphManager
+
+from .bench_export import store_and_compare
+from .synthetic import SHAPES
+from ..Exporters.export_job import ExportJob, collect_converters
+from ..Exporters.options import ExportOptions
+
+
+TEST_GRAPHS_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  'tests', 'graphs')
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'baselines', 'runtime_baseline.json')
+
+# the export options of the test graphs by the prefix of their names
+PREFIX_OPTIONS = {
+    'async': ExportOptions(async_mode=True),
+    'batch': ExportOptions(batch_mode=True),
+    'numpy': ExportOptions(numpy_arrays=True),
+    'parallel': ExportOptions(parallel_sequences=True),
+    'pool': ExportOptions(start_pin_pool='thread'),
+}
+
+# the standard input of the test graphs reading it
+STDIN = {
+    'batch_001_inputs': '{"a": 2, "b": 3}\n{"a": 0.5}\n{"b": 10}\n',
+}
+
+# the files the test graphs read (in the working folder of the runs)
+DATA_FILES = {
+    'a.txt': 'A',
+    'b.txt': 'B',
+    'data.txt': 'x',
+    'small.txt': 'line1\nline2',
+    'big.log': ''.join(f"{'ERR ' if i%8==0 else 'INFO'} {i:010d} {'.'*40}\n" for i in range(10000)),
+}
+
+# the growth of the metrics below these amounts is noise, not a regression
+METRIC_SLACK = {
+    'startup_seconds': 0.005,
+    'steady_seconds': 0.001,
+    'peak_rss_kb': 1024,
+}
+
+# the number of lines of the output kept in the results
+OUTPUT_LINES = 5
+
+# runs a script `runs` times in the process (the arguments: the script,
+# the number of runs and the JSON file of the results), each run reading
+# the same standard input
+DRIVER = '''import io, json, resource, sys, time
+fname, runs, result_fname = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+stdin = sys.stdin.read()
+start = time.perf_counter()
+with open(fname, encoding='utf8') as f:
+    code = compile(f.read(), fname, 'exec')
+times = []
+for _ in range(runs):
+    sys.stdin = io.StringIO(stdin)
+    sys.argv = [fname]
+    run_start = start if not times else time.perf_counter()
+    try:
+        exec(code, {'__name__': '__main__', '__file__': fname})
+    except SystemExit as e:
+        if e.code:
+            raise
+    times.append(time.perf_counter()-run_start)
+try:
+    # (ru_maxrss may keep the peak of the forked parent on Linux)
+    with open('/proc/self/status', encoding='utf8') as f:
+        peak_rss_kb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+except OSError:
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+with open(result_fname, 'w', encoding='utf8') as f:
+    json.dump({'times': times, 'peak_rss_kb': peak_rss_kb}, f)
+'''
+
+
+class Case(NamedTuple):
+    """A graph of the benchmark with its export options and standard input"""
+    name: str
+    data: dict
+    options: ExportOptions
+    stdin: str = ''
+
+
+def graph_cases() -> list[Case]:
+    """The cases of the graphs of the tests"""
+    cases = []
+    for fname in sorted(glob.glob(os.path.join(TEST_GRAPHS_FOLDER, '*.pygraph'))):
+        name = os.path.splitext(os.path.basename(fname))[0]
+        with open(fname, 'r', encoding='utf8') as f:
+            data = json.load(f)
+        options = PREFIX_OPTIONS.get(name.split('_', 1)[0], ExportOptions())
+        cases.append(Case(name, data, options, STDIN.get(name, '')))
+    return cases
+
+
+def synthetic_cases(size: int) -> list[Case]:
+    """The cases of the synthetic graphs"""
+    return [Case(f"{shape}[{size}]", generator(size), ExportOptions())
+            for shape, generator in SHAPES.items()]
+
+
+def export(case: Case, converters: list[object]) -> str:
+    """Exports the graph of a case into a script string"""
+    graph_manager = GraphManager()
+    graph_manager.deserialize(case.data)
+    job = ExportJob(graph_manager.findRootGraph(), converters, options=case.options)
+    job.run()
+    return job.render("")
+
+
+def measure(case: Case, converters: list[object], folder: str,
+            runs: int, processes: int, timeout: float) -> dict:
+    """Exports a case and measures the runs of its script"""
+    result: dict = {'name': case.name}
+    fname = os.path.join(folder, case.name+'.py')
+    result_fname = os.path.join(folder, case.name+'.json')
+    startups = []
+    steady = []
+    peak_rss = 0
+    try:
+        with open(fname, 'w', encoding='utf8') as f:
+            f.write(export(case, converters))
+        output = subprocess.run([sys.executable, fname], input=case.stdin, cwd=folder,
+                                capture_output=True, text=True, timeout=timeout, check=True).stdout
+        for _ in range(processes):
+            subprocess.run([sys.executable, '-c', DRIVER, fname, str(runs), result_fname],
+                           input=case.stdin, cwd=folder, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.PIPE, text=True, timeout=timeout, check=True)
+            with open(result_fname, 'r', encoding='utf8') as f:
+                measured = json.load(f)
+            startups.append(measured['times'][0])
+            steady += measured['times'][1:]
+            peak_rss = max(peak_rss, measured['peak_rss_kb'])
+    except subprocess.CalledProcessError as e:
+        lines = e.stderr.strip().splitlines()
+        result['error'] = lines[-1] if lines else f"exit code {e.returncode}"
+        return result
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # e.g. a RecursionError of the export or a timeout: it's a result too
+        result['error'] = type(e).__name__
+        return result
+    result.update({'startup_seconds': min(startups),
+                   'steady_seconds': min(steady) if steady else min(startups),
+                   'peak_rss_kb': peak_rss,
+                   'output': sorted(output.splitlines())[:OUTPUT_LINES]})
+    return result
+
+
+def format_case(case: dict) -> str:
+    """A line of the results table"""
+    if 'error' in case:
+        return f"{case['name']:30}   {case['error']}"
+    return f"{case['name']:30} startup: {case['startup_seconds']*1000:9.2f} ms   " \
+           f"steady: {case['steady_seconds']*1000:9.3f} ms   peak RSS: {case['peak_rss_kb']:8} KiB"
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Runs the benchmark, writes the results and compares them with the baseline"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="the number of runs in a process")
+    parser.add_argument("--processes", type=int, default=5, help="the number of processes")
+    parser.add_argument("--synthetic-size", type=int, default=100,
+                        help="the size of the synthetic graphs (0: none)")
+    parser.add_argument("--timeout", type=float, default=120, help="the timeout of a process")
+    parser.add_argument("-o", "--output", default=None, help="the JSON file of the results")
+    parser.add_argument("--baseline", default=BASELINE, help="the JSON file of the baseline")
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="the allowed relative growth of the metrics")
+    parser.add_argument("--update-baseline", action='store_true',
+                        help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+    INITIALIZE([])
+    converters = collect_converters()
+
+    cases = graph_cases()
+    if args.synthetic_size > 0:
+        cases += synthetic_cases(args.synthetic_size)
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for data_fname, content in DATA_FILES.items():
+            with open(os.path.join(folder, data_fname), 'w', encoding='utf8') as f:
+                f.write(content)
+        for case in cases:
+            results.append(measure(case, converters, folder, args.runs, args.processes, args.timeout))
+            print(format_case(results[-1]))
+    report = {'python': platform.python_version(), 'machine': platform.machine(),
+              'results': results}
+    return store_and_compare(report, args.output, args.baseline,
+                             args.update_baseline, args.threshold, METRIC_SLACK)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Benchmark of the concurrent start pins (`start_pin_pool` option): graphs
+with four independent start pins, CPU-bound (loops of sums) and I/O-bound
+(reads of large files), exported sequentially and on thread and process
+pools.
+
+The whole scripts are timed as new interpreters (a process pool needs
+the script to be the main module), in a temporary folder holding the
+files read by the I/O-bound graph.
+
+Usage:
+    python -m PyFlow.Packages.PythonExporter.benchmarks.bench_start_pins [--file-size 64]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from PyFlow import INITIALIZE
+
+from .bench_numpy_mode import export_script
+from ..Exporters.options import ExportOptions
+
+
+GRAPHS = {
+    'CPU-bound': 'start_pins_cpu.pygraph',
+    'I/O-bound': 'start_pins_io.pygraph',
+}
+
+POOLS = {
+    'sequential': '',
+    'thread pool': 'thread',
+    'process pool': 'process',
+}
+
+
+def time_script(fname: str, folder: str, repeat: int) -> float:
+    """Runs a script in a new interpreter (the best of `repeat` runs, in seconds)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, fname], cwd=folder, check=True)
+        best = min(best, time.perf_counter()-start)
+    return best
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Runs the benchmark and prints the timings"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file-size", type=int, default=64,
+                        help="the size of each file read by the I/O-bound graph (MB)")
+    parser.add_argument("--repeat", type=int, default=3, help="the number of timed runs")
+    args = parser.parse_args(argv)
+    INITIALIZE([])
+
+    print(f"CPUs: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as folder:
+        line = 'x' * 99 + '\n'
+        for i in range(4):
+            with open(os.path.join(folder, f"data_{i}.txt"), 'w', encoding='utf8') as f:
+                for _ in range(args.file_size * 1024 * 1024 // len(line)):
+                    f.write(line)
+        for graph_name, graph_fname in GRAPHS.items():
+            baseline = None
+            for pool_name, pool in POOLS.items():
+                fname = os.path.join(folder, f"{pool or 'sequential'}_{graph_fname}.py")
+                with open(fname, 'w', encoding='utf8') as f:
+                    f.write(export_script(graph_fname, ExportOptions(start_pin_pool=pool)))
+                elapsed = time_script(fname, folder, args.repeat)
+                baseline = elapsed if baseline is None else baseline
+                print(f"{graph_name:10} {pool_name:13} {elapsed*1000:10.2f} ms "
+                      f"{baseline/elapsed:6.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
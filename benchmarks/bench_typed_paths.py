@@ -0,0 +1,43 @@
+"""Benchmark of the type-specialised code: string- and math-heavy loops
+exported with the generic code of the converters (`generic_code` option)
+and with the code specialised by the data types of the pins.
+
+Only the main program of the scripts is timed.
+
+Usage:
+    python -m PyFlow.Packages.PythonExporter.benchmarks.bench_typed_paths [--repeat 5]
+"""
+import argparse
+import sys
+from typing import Optional
+
+from PyFlow import INITIALIZE
+
+from .bench_numpy_mode import export_script, time_main
+from ..Exporters.options import ExportOptions
+
+
+GRAPHS = {
+    'strings': 'typed_strings.pygraph',
+    'math': 'typed_math.pygraph',
+}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Runs the benchmark and prints the timings"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="the number of timed runs")
+    args = parser.parse_args(argv)
+    INITIALIZE([])
+
+    for graph_name, graph_fname in GRAPHS.items():
+        generic = time_main(export_script(graph_fname, ExportOptions(generic_code=True)),
+                            [], args.repeat)
+        typed = time_main(export_script(graph_fname, ExportOptions()), [], args.repeat)
+        print(f"{graph_name:8} generic: {generic*1000:10.2f} ms   typed: {typed*1000:10.2f} ms   "
+              f"speedup: {generic/typed:5.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
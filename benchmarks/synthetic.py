@@ -0,0 +1,294 @@
+"""Generators of synthetic graphs of configurable shape and size for the
+benchmarks. The graphs are built as the serialized data of PyFlow (the
+content of a .pygraph file), so they are loaded like the saved ones.
+
+The shapes (`SHAPES`):
+- `exec_chain`: a long chain of consoleOutput nodes
+- `sequence_fanout`: a Sequence with a consoleOutput on each of its outputs
+- `compound_nesting`: compounds nested into each other (size is the depth)
+- `function_references`: a chain of Function nodes calling the same compound
+- `compound_copies`: a chain of copy-pasted compounds (same inner graphs)
+- `python_nodes`: a chain of python nodes with the same code
+- `data_dag`: a large DAG of pure add nodes (each adds the two before it)
+"""
+import json
+import uuid
+from typing import Any, Callable, Optional
+
+
+NAMESPACE = uuid.UUID('6f2b7c1e-0000-4000-8000-000000000000')
+
+# the options of the pins as PyFlow saves them
+EXEC_INPUT_OPTIONS = [8, 256]
+DATA_OPTIONS = [256]
+GRAPH_PIN_OPTIONS = [32, 64, 256]
+
+# a pin description: (name, data type, value)
+PinSpec = tuple[str, str, Any]
+
+
+class GraphData:
+    """The serialized data of a graph under construction
+
+    Args:
+        name: the name of the graph
+        seed: makes the uuids of the graph unique and reproducible
+        parent: the name of the parent graph (None for the root graph)
+        depth: the depth of the graph (1 for the root graph)
+    """
+
+    def __init__(self, name: str = 'root', seed: str = 'graph',
+                 parent: Optional[str] = None, depth: int = 1):
+        self.name = name
+        self.seed = seed
+        self.parent = parent
+        self.depth = depth
+        self.nodes: dict[str, dict] = {}
+
+    def uid(self, *parts: str) -> str:
+        """A reproducible uuid of a part of the graph"""
+        return str(uuid.uuid5(NAMESPACE, '/'.join((self.seed, self.name) + parts)))
+
+    def node(self,
+             node_type: str,
+             name: str,
+             inputs: list[PinSpec],
+             outputs: list[PinSpec],
+             lib: Optional[str] = None,
+             package: str = 'PyFlowBase',
+             pin_options: Optional[list[int]] = None) -> str:
+        """Adds a node with its pins (in the order PyFlow creates them)"""
+        node = {'package': package, 'lib': lib, 'type': node_type,
+                'owningGraphName': self.name, 'name': name, 'uuid': self.uid(name),
+                'inputs': [], 'outputs': [],
+                'meta': {'var': {}, 'label': name},
+                'wrapper': {'collapsed': False, 'headerHtml': name,
+                            'exposeInputsToCompound': False,
+                            'groups': {'input': {}, 'output': {}}},
+                'x': 100.0 * len(self.nodes), 'y': 0.0}
+        for key, pins, direction in (('inputs', inputs, 0), ('outputs', outputs, 1)):
+            for index, (pin_name, data_type, value) in enumerate(pins):
+                if pin_options is not None:
+                    options = pin_options
+                elif data_type == 'ExecPin' and direction == 0:
+                    options = EXEC_INPUT_OPTIONS
+                else:
+                    options = DATA_OPTIONS
+                node[key].append({
+                    'name': pin_name, 'package': 'PyFlowBase', 'fullName': f"{name}_{pin_name}",
+                    'dataType': data_type, 'direction': direction, 'value': json.dumps(value),
+                    'uuid': self.uid(name, key, pin_name), 'linkedTo': [], 'pinIndex': index+1,
+                    'options': options, 'structure': 0,
+                    'alwaysList': False, 'alwaysSingle': False, 'alwaysDict': False,
+                    'wrapper': {'bLabelHidden': False, 'displayName': pin_name, 'wires': {}}})
+        self.nodes[name] = node
+        return name
+
+    def compound(self, name: str, inputs: list[PinSpec], outputs: list[PinSpec]) -> "GraphData":
+        """Adds a compound node and returns its inner graph (with its
+        graphInputs and graphOutputs nodes having the same pins)"""
+        self.node('compound', name, inputs, outputs)
+        inner = GraphData(name, self.seed, self.name, self.depth+1)
+        inner.node('graphInputs', 'graphInputs', [], inputs, pin_options=GRAPH_PIN_OPTIONS)
+        inner.node('graphOutputs', 'graphOutputs', outputs, [], pin_options=GRAPH_PIN_OPTIONS)
+        self.nodes[name]['graphData'] = inner
+        return inner
+
+    def _pin(self, node: str, key: str, pin_name: str) -> dict:
+        for pin in self.nodes[node][key]:
+            if pin['name'] == pin_name:
+                return pin
+        raise KeyError(f"{node}.{pin_name}")
+
+    def link(self, src: str, src_pin: str, dst: str, dst_pin: str):
+        """Connects an output pin to an input pin"""
+        out_pin = self._pin(src, 'outputs', src_pin)
+        in_pin = self._pin(dst, 'inputs', dst_pin)
+        link = {'lhsNodeName': src, 'outPinId': out_pin['pinIndex'],
+                'rhsNodeName': dst, 'inPinId': in_pin['pinIndex'],
+                'lhsNodeUid': self.nodes[src]['uuid'], 'rhsNodeUid': self.nodes[dst]['uuid']}
+        out_pin['linkedTo'].append(link)
+        in_pin['linkedTo'].append(dict(link))
+
+    def to_json(self) -> dict:
+        """The serialized graph (what `GraphManager.deserialize` takes for
+        the root graph)"""
+        nodes = []
+        for node in self.nodes.values():
+            if isinstance(node.get('graphData'), GraphData):
+                node = {**node, 'graphData': node['graphData'].to_json()}
+            nodes.append(node)
+        data = {'name': self.name, 'category': '', 'vars': [], 'nodes': nodes,
+                'depth': self.depth, 'isRoot': self.parent is None,
+                'parentGraphName': str(self.parent)}
+        if self.parent is None:
+            data.update({'fileVersion': '3.0.0', 'activeGraph': self.name})
+        return data
+
+
+# the code of the python nodes of the `python_nodes` shape (adding one)
+PYTHON_NODE_CODE = '''def prepareNode(node):
+    node.createInputPin('a', 'IntPin')
+    node.createOutputPin('out', 'IntPin')
+
+
+def compute(node):
+    node.setData('out', node.getData('a') + 1)
+
+
+def func_python(exporter, node, *args, **kwargs):
+    return '    return a + 1'
+'''
+
+
+# node templates (the pins in PyFlow's creation order)
+def console_output(graph: GraphData, name: str, entity: Any = None) -> str:
+    """Adds a consoleOutput node"""
+    return graph.node('consoleOutput', name,
+                      [('inExec', 'ExecPin', None), ('entity', 'AnyPin', entity)],
+                      [('outExec', 'ExecPin', None)])
+
+
+def make_int(graph: GraphData, name: str, value: int = 0) -> str:
+    """Adds a makeInt node"""
+    return graph.node('makeInt', name, [('i', 'IntPin', value)], [('out', 'IntPin', value)],
+                      lib='DefaultLib')
+
+
+def add(graph: GraphData, name: str) -> str:
+    """Adds an add node"""
+    return graph.node('add', name, [('a', 'AnyPin', 0), ('b', 'AnyPin', 0)],
+                      [('out', 'AnyPin', 0)], lib='MathAbstractLib')
+
+
+# the generators of the shapes
+def exec_chain(size: int) -> dict:
+    """consoleOutput nodes chained by their exec pins"""
+    graph = GraphData(seed='exec_chain')
+    for i in range(size):
+        console_output(graph, f"consoleOutput{i}", i)
+        if i>0:
+            graph.link(f"consoleOutput{i-1}", 'outExec', f"consoleOutput{i}", 'inExec')
+    return graph.to_json()
+
+
+def sequence_fanout(size: int) -> dict:
+    """A Sequence with `size` outputs, each printing a value"""
+    graph = GraphData(seed='sequence_fanout')
+    graph.node('sequence', 'sequence', [('inExec', 'ExecPin', None)],
+               [(str(i+1), 'ExecPin', None) for i in range(size)])
+    for i in range(size):
+        console_output(graph, f"consoleOutput{i}", i)
+        graph.link('sequence', str(i+1), f"consoleOutput{i}", 'inExec')
+    return graph.to_json()
+
+
+def compound_nesting(size: int) -> dict:
+    """`size` compounds nested into each other passing a number down to the
+    innermost one (which adds one to it) and the result back up"""
+    root = GraphData(seed='compound_nesting')
+    make_int(root, 'makeInt', 1)
+    console_output(root, 'consoleOutput')
+    graph = root
+    for level in range(size):
+        inner = graph.compound(f"compound{level}", [('value', 'IntPin', 0)],
+                               [('result', 'IntPin', 0)])
+        source = ('makeInt', 'out') if level == 0 else ('graphInputs', 'value')
+        graph.link(*source, f"compound{level}", 'value')
+        if level == 0:
+            graph.link(f"compound{level}", 'result', 'consoleOutput', 'entity')
+        else:
+            graph.link(f"compound{level}", 'result', 'graphOutputs', 'result')
+        graph = inner
+    add(graph, 'add')
+    make_int(graph, 'makeInt', 1)
+    graph.link('graphInputs', 'value', 'add', 'a')
+    graph.link('makeInt', 'out', 'add', 'b')
+    graph.link('add', 'out', 'graphOutputs', 'result')
+    return root.to_json()
+
+
+def function_references(size: int) -> dict:
+    """`size` Function nodes calling the same compound one after the other"""
+    root = GraphData(seed='function_references')
+    functions = root.compound('functions', [], [])
+    inner = functions.compound('add_one', [('num', 'IntPin', 0)], [('new_num', 'IntPin', 0)])
+    add(inner, 'add')
+    make_int(inner, 'makeInt', 1)
+    inner.link('graphInputs', 'num', 'add', 'a')
+    inner.link('makeInt', 'out', 'add', 'b')
+    inner.link('add', 'out', 'graphOutputs', 'new_num')
+    make_int(root, 'makeInt', 0)
+    console_output(root, 'consoleOutput')
+    source = ('makeInt', 'out')
+    for i in range(size):
+        root.node('Function', f"Function{i}",
+                  [('function', 'StringPin', 'functions.add_one'), ('num', 'IntPin', 0)],
+                  [('new_num', 'IntPin', 0)], package='PythonExporter')
+        root.link(*source, f"Function{i}", 'num')
+        source = (f"Function{i}", 'new_num')
+    root.link(*source, 'consoleOutput', 'entity')
+    return root.to_json()
+
+
+def compound_copies(size: int) -> dict:
+    """`size` copies of a compound adding one to a number, chained (the
+    inner nodes are renamed in each copy, like when they are pasted)"""
+    root = GraphData(seed='compound_copies')
+    make_int(root, 'makeInt', 0)
+    console_output(root, 'consoleOutput')
+    source = ('makeInt', 'out')
+    for i in range(size):
+        inner = root.compound(f"compound{i}", [('num', 'IntPin', 0)], [('new_num', 'IntPin', 0)])
+        add(inner, f"add{i}")
+        make_int(inner, f"makeInt{i}", 1)
+        inner.link('graphInputs', 'num', f"add{i}", 'a')
+        inner.link(f"makeInt{i}", 'out', f"add{i}", 'b')
+        inner.link(f"add{i}", 'out', 'graphOutputs', 'new_num')
+        root.link(*source, f"compound{i}", 'num')
+        source = (f"compound{i}", 'new_num')
+    root.link(*source, 'consoleOutput', 'entity')
+    return root.to_json()
+
+
+def python_nodes(size: int) -> dict:
+    """`size` python nodes with the same code adding one to a number, chained"""
+    graph = GraphData(seed='python_nodes')
+    make_int(graph, 'makeInt', 0)
+    source = ('makeInt', 'out')
+    for i in range(size):
+        graph.node('pythonNode', f"pythonNode{i}", [('a', 'IntPin', 0)], [('out', 'IntPin', 0)])
+        graph.nodes[f"pythonNode{i}"]['nodeData'] = PYTHON_NODE_CODE
+        graph.link(*source, f"pythonNode{i}", 'a')
+        source = (f"pythonNode{i}", 'out')
+    console_output(graph, 'consoleOutput')
+    graph.link(*source, 'consoleOutput', 'entity')
+    return graph.to_json()
+
+
+def data_dag(size: int) -> dict:
+    """`size` add nodes, each adding the results of the two before it
+    (Fibonacci-like), printed at the end"""
+    graph = GraphData(seed='data_dag')
+    make_int(graph, 'makeInt0', 0)
+    make_int(graph, 'makeInt1', 1)
+    sources = [('makeInt0', 'out'), ('makeInt1', 'out')]
+    for i in range(size):
+        add(graph, f"add{i}")
+        graph.link(*sources[-2], f"add{i}", 'a')
+        graph.link(*sources[-1], f"add{i}", 'b')
+        sources.append((f"add{i}", 'out'))
+    console_output(graph, 'consoleOutput')
+    graph.link(*sources[-1], 'consoleOutput', 'entity')
+    return graph.to_json()
+
+
+SHAPES: dict[str, Callable[[int], dict]] = {
+    'exec_chain': exec_chain,
+    'sequence_fanout': sequence_fanout,
+    'compound_nesting': compound_nesting,
+    'function_references': function_references,
+    'compound_copies': compound_copies,
+    'python_nodes': python_nodes,
+    'data_dag': data_dag,
+}
@@ -5,31 +5,48 @@ from typing import Callable, NamedTuple
 import pytest
 
 from PyFlow import INITIALIZE, GET_PACKAGES
-from PyFlow.Core.GraphManager import GraphManagerSingleton
+from PyFlow.Core.GraphManager import GraphManager
 from PyFlow.App import PyFlow as PyFlowApp
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def testfolder():
     """Gets the folder where the tests live"""
     return os.path.abspath(os.path.dirname(__file__))
 
 
-MockPyFlowApp = NamedTuple('MockPyFlowApp', [
-    ('graphManager', GraphManagerSingleton)
-])
-
-@pytest.fixture
-def pyflowapp(testfolder):  # pylint: disable=redefined-outer-name
-    """Initialize pyflow with ourselves as an additional module
+@pytest.fixture(scope='session')
+def pyflow_packages(testfolder):  # pylint: disable=redefined-outer-name
+    """Initialize pyflow with ourselves as an additional module, once per
+    process (each pytest-xdist worker has its own)
     WARNING: if there is another package in the folder structure
     we cannot prevent it being loaded
     """
     pkgpath = os.path.abspath(os.path.join(testfolder, "../../../../.."))
     INITIALIZE([pkgpath])
-    gman = GraphManagerSingleton()
-    app = MockPyFlowApp(graphManager=gman)
-    return app
+    return GET_PACKAGES()
+
+
+class IsolatedGraphManager:
+    """A graph manager of one test with the interface of
+    `GraphManagerSingleton`, so the tests don't share their graphs"""
+
+    def __init__(self):
+        self._graph_manager = GraphManager()
+
+    def get(self) -> GraphManager:
+        """Gets the graph manager"""
+        return self._graph_manager
+
+
+MockPyFlowApp = NamedTuple('MockPyFlowApp', [
+    ('graphManager', IsolatedGraphManager)
+])
+
+@pytest.fixture
+def pyflowapp(pyflow_packages):  # pylint: disable=redefined-outer-name,unused-argument
+    """A PyFlow application stand-in with a new graph manager"""
+    return MockPyFlowApp(graphManager=IsolatedGraphManager())
 
 
 PyCnvTest = NamedTuple('PyCnvTest', [
@@ -45,7 +62,7 @@ def pycnv(pyflowapp):  # pylint: disable=redefined-outer-name
     pkg = pkgs["PythonExporter"]
     exporter_class = pkg.GetExporters()['PythonExporter']
 
-    def graphLoader(gman: GraphManagerSingleton) -> Callable[[str], None]:  # type: ignore # pylint: disable=invalid-name
+    def graphLoader(gman: IsolatedGraphManager) -> Callable[[str], None]:  # type: ignore # pylint: disable=invalid-name
         def loader(fname: str):
             with open(fname, "r", encoding='utf8') as f:
                 data = json.load(f)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""This file was auto-generated by PyFlow exporter
+    'Python exporter v1.0.0'
+    Created: 11:48AM on October 19, 2026
+"""
+
+EXPORTER_NAME = 'Python exporter'
+EXPORTER_VERSION = '1.0.0'
+
+
+# ======================== VARIABLES AND PARAMETERS SETUP =========================
+VARS = {}
+
+
+# ================================ PACKAGE IMPORTS ================================
+# pylint: disable=wrong-import-position
+
+# pylint: enable=wrong-import-position
+
+# ================================= PACKAGE SETUPS ================================
+
+
+# ================================ SYSTEM FUNCTIONS ===============================
+
+
+
+
+
+
+# ============================== GRAPH IMPLEMENTATION =============================
+
+def compound(in1):
+    makeInt5_out = 2
+    multiply_out = (makeInt5_out * in1)
+    return multiply_out
+
+def compound2(in1):
+    makeInt7_out = 3
+    multiply2_out = (makeInt7_out * in1)
+    return multiply2_out
+
+
+# ================================== MAIN PROGRAM =================================
+
+
+# ------- consoleOutput0_inExec -------
+makeInt_out = 10
+compound_out = compound(makeInt_out)
+print(compound_out)
+compound1_out = compound(compound_out)
+print(compound1_out)
+compound2_out = compound2(makeInt_out)
+print(compound2_out)
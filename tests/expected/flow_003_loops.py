@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+"""This file was auto-generated by PyFlow exporter
+    'Python exporter v1.0.0'
+    Created: 11:10AM on October 19, 2026
+"""
+
+EXPORTER_NAME = 'Python exporter'
+EXPORTER_VERSION = '1.0.0'
+
+
+# ======================== VARIABLES AND PARAMETERS SETUP =========================
+VARS = {}
+
+
+# ================================ PACKAGE IMPORTS ================================
+# pylint: disable=wrong-import-position
+
+# pylint: enable=wrong-import-position
+
+# ================================= PACKAGE SETUPS ================================
+
+
+# ================================ SYSTEM FUNCTIONS ===============================
+def setVar(varname, value):
+    VARS[varname] = value
+    return value
+
+
+def getVar(varname):
+    return VARS[varname]
+
+
+
+
+# ============================== GRAPH IMPLEMENTATION =============================
+
+
+# ================================== MAIN PROGRAM =================================
+
+
+# ------- forLoop_inExec -------
+makeInt_out = 2
+multiply_out = (makeInt_out * 5)
+for forLoop_Index in range(0, 3):
+    add_out = (forLoop_Index + multiply_out)
+    print(add_out)
+forLoopWithBreak_Break = False
+for forLoopWithBreak_Index in range(0, 10):
+    if forLoopWithBreak_Break:
+        break
+    print(forLoopWithBreak_Index)
+    notEqual_out = (forLoopWithBreak_Index != 2)
+    if notEqual_out:
+      pass
+    else:
+        forLoopWithBreak_Break = True
+setVar_value = setVar('counter', 0)
+getVar_value = getVar('counter')
+notEqual1_out = (getVar_value != 3)
+while notEqual1_out:
+    add1_out = (getVar_value + 1)
+    setVar1_value = setVar('counter', add1_out)
+    print(setVar1_value)
+    getVar_value = getVar('counter')
+    notEqual1_out = (getVar_value != 3)
+print('done')
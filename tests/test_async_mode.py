@@ -0,0 +1,113 @@
+"""Tests of the asyncio output mode"""
+import json
+import os
+import subprocess
+import sys
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.options import (  # pylint: disable=import-error,no-name-in-module
+    ExportOptions
+)
+from PyFlow.Packages.PythonExporter.benchmarks.synthetic import (  # pylint: disable=import-error,no-name-in-module
+    GraphData, console_output, make_int
+)
+
+
+def _export(pycnv, testfolder, tmp_path, test_name, options=ExportOptions(async_mode=True)):
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', test_name+'.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(),
+                    collect_converters(),
+                    options=options)
+    fname = str(tmp_path / (test_name+'.py'))
+    job.save(fname, "")
+    with open(fname, 'r', encoding='utf8') as f:
+        script = f.read()
+    return job, fname, script
+
+
+def test_independent_start_pins_are_gathered(pycnv, testfolder, tmp_path):
+    """Each start pin is a coroutine, the I/O nodes are awaited on threads"""
+    job, fname, script = _export(pycnv, testfolder, tmp_path, 'async_001_start_pins')
+    (tmp_path / 'a.txt').write_text('A', encoding='utf8')
+    (tmp_path / 'b.txt').write_text('B', encoding='utf8')
+    assert job.diagnostics == []
+    assert 'async def main():' in script and script.endswith('asyncio.run(main())\n')
+    assert "await asyncio.to_thread(readAllText, 'a.txt', 'utf-8')" in script
+    # the lines are printed on the event loop, not mixed by threads
+    assert "    print(readAllText_out)" in script
+    assert "await asyncio.gather(readAllText_inExec(), readAllText1_inExec(), " \
+           "setVar_inExec())" in script
+    # the pure node stays synchronous
+    assert "    setVar_value = setVar('x', 3)" in script
+    result = subprocess.run([sys.executable, fname], cwd=tmp_path,
+                            capture_output=True, text=True, check=True)
+    assert sorted(result.stdout.split()) == ['3', 'A', 'B']
+
+
+def test_dependent_start_pins_stay_sequential(pycnv, testfolder, tmp_path):
+    """Start pins writing the same variable run one after the other"""
+    job, fname, script = _export(pycnv, testfolder, tmp_path, 'async_002_shared')
+    assert 'gather' not in script
+    assert any("both write variable 'x'" in diagnostic for diagnostic in job.diagnostics)
+    result = subprocess.run([sys.executable, fname], capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['2']
+
+
+def test_compound_is_awaited(pycnv, testfolder, tmp_path):
+    """A compound with exec pins is a coroutine, awaited where it is called"""
+    _, fname, script = _export(pycnv, testfolder, tmp_path, 'compound_001_simple')
+    assert 'async def compound(in1):' in script
+    assert 'compound_out4 = await compound(makeInt_out)' in script
+    result = subprocess.run([sys.executable, fname], capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['done']
+
+
+def _pure_compound_awaiting() -> dict:
+    """A compound without exec pins reads the output of a nested compound
+    with exec pins (printing its input)"""
+    g = GraphData(seed='pure_awaiting')
+    make_int(g, 'makeInt', 2)
+    outer = g.compound('outer', [('a', 'IntPin', 0)], [('result', 'IntPin', 0)])
+    inner = outer.compound('inner', [('inExec', 'ExecPin', None), ('value', 'IntPin', 0)],
+                           [('outExec', 'ExecPin', None), ('result', 'IntPin', 0)])
+    console_output(inner, 'consoleOutput')
+    inner.link('graphInputs', 'inExec', 'consoleOutput', 'inExec')
+    inner.link('graphInputs', 'value', 'consoleOutput', 'entity')
+    inner.link('consoleOutput', 'outExec', 'graphOutputs', 'outExec')
+    inner.link('graphInputs', 'value', 'graphOutputs', 'result')
+    outer.link('graphInputs', 'a', 'inner', 'value')
+    outer.link('inner', 'result', 'graphOutputs', 'result')
+    console_output(g, 'consoleOutput')
+    g.link('makeInt', 'out', 'outer', 'a')
+    g.link('outer', 'result', 'consoleOutput', 'entity')
+    return g.to_json()
+
+
+def test_pure_compound_awaiting_is_awaited(pyflowapp, tmp_path):
+    """A compound without exec pins awaiting a nested coroutine is a
+    coroutine too (no `await` in a plain function)"""
+    graph_manager = pyflowapp.graphManager.get()
+    graph_manager.deserialize(_pure_compound_awaiting())
+    job = ExportJob(graph_manager.findRootGraph(), collect_converters(),
+                    options=ExportOptions(async_mode=True))
+    fname = str(tmp_path / 'script.py')
+    job.save(fname, "")
+    with open(fname, 'r', encoding='utf8') as f:
+        script = f.read()
+    assert 'async def outer(a):' in script
+    assert 'inner_result = await inner(a)' in script
+    assert 'outer_result = await outer(makeInt_out)' in script
+    result = subprocess.run([sys.executable, fname], capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['2', '2']
+
+
+def test_async_batch_mode(pycnv, testfolder, tmp_path):
+    """In batch mode each row runs the graph coroutine"""
+    _, fname, script = _export(pycnv, testfolder, tmp_path, 'batch_001_inputs',
+                               ExportOptions(batch_mode=True, async_mode=True))
+    assert 'async def run_graph(a, b):' in script
+    result = subprocess.run([sys.executable, fname], input='{"a": 2, "b": 3}\n',
+                            capture_output=True, text=True, check=True)
+    assert [json.loads(line) for line in result.stdout.splitlines()] == [15]
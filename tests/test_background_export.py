@@ -0,0 +1,166 @@
+"""Runs the export on a worker thread (headless, with the offscreen Qt platform)"""
+import os
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from qtpy.QtCore import QEventLoop, QTimer  # pylint: disable=no-name-in-module,wrong-import-position
+from qtpy.QtWidgets import QApplication  # pylint: disable=no-name-in-module,wrong-import-position
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module,wrong-import-position
+    collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.export_worker import (  # pylint: disable=import-error,no-name-in-module,wrong-import-position
+    ExportController, ExportOnEdit, ExportWorker, run_in_thread
+)
+from PyFlow.Packages.PythonExporter.Exporters.python_exporter import (  # pylint: disable=import-error,no-name-in-module,wrong-import-position
+    PythonExporter
+)
+
+
+@pytest.fixture
+def qapp():
+    """A (headless) Qt application for the event loop"""
+    return QApplication.instance() or QApplication([])
+
+
+def run_worker(worker: ExportWorker) -> dict:
+    """Runs the worker on its thread and collects its signals"""
+    results = {'progress': [], 'saved': [], 'failed': [], 'cancelled': []}
+    worker.progress.connect(lambda *args: results['progress'].append(args))
+    worker.saved.connect(results['saved'].append)
+    worker.failed.connect(results['failed'].append)
+    worker.cancelled.connect(lambda: results['cancelled'].append(True))
+    loop = QEventLoop()
+    thread = run_in_thread(worker)
+    thread.finished.connect(loop.quit)
+    if not thread.isFinished():
+        loop.exec_()
+    thread.wait()
+    return results
+
+
+def test_background_export(qapp, pycnv, testfolder, tmp_path):  # pylint: disable=unused-argument
+    """The worker writes the same script as the foreground export"""
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'flow_001_branch_sequence.pygraph'))
+    fname_fg = str(tmp_path / 'foreground.py')
+    fname_bg = str(tmp_path / 'background.py')
+    pycnv.exporter(pycnv.app, fname_fg)
+
+    worker = ExportWorker(pycnv.app.graphManager.get().serialize(),
+                          collect_converters(), fname_bg, "")
+    worker.progress_interval = 0.0
+    results = run_worker(worker)
+
+    assert results['failed'] == []
+    assert results['saved'] == [fname_bg]
+    assert len(results['progress']) > 0
+    start_index, start_count, nodes, start_name = results['progress'][-1]
+    assert (start_index, start_count, start_name) == (0, 1, 'branch_In')
+    assert nodes > 0
+    with open(fname_fg, 'r', encoding='utf8') as f1, \
+         open(fname_bg, 'r', encoding='utf8') as f2:
+        # the background export was called with an empty header
+        assert f1.read().endswith(f2.read())
+
+
+def test_background_export_cancel(qapp, pycnv, testfolder, tmp_path):  # pylint: disable=unused-argument
+    """A cancelled export doesn't write the file"""
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'flow_001_branch_sequence.pygraph'))
+    fname = str(tmp_path / 'cancelled.py')
+
+    worker = ExportWorker(pycnv.app.graphManager.get().serialize(),
+                          collect_converters(), fname, "")
+    worker.cancel()
+    results = run_worker(worker)
+
+    assert results['cancelled'] == [True]
+    assert results['saved'] == []
+    assert not os.path.exists(fname)
+
+
+def test_export_controller(qapp, pycnv, testfolder, tmp_path):  # pylint: disable=unused-argument
+    """The controller of the menu action runs the export to its end and
+    cleans up after it"""
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'flow_001_branch_sequence.pygraph'))
+    fname = str(tmp_path / 'controlled.py')
+    worker = ExportWorker(pycnv.app.graphManager.get().serialize(),
+                          collect_converters(), fname, "")
+    loop = QEventLoop()
+    controller = ExportController.start(None, worker)
+    # connected after the controller: runs after its cleanup
+    worker.done.connect(loop.quit)
+    QTimer.singleShot(5000, loop.quit)
+    loop.exec_()
+
+    assert controller not in ExportController._running  # pylint: disable=protected-access
+    assert controller._thread.isFinished()  # pylint: disable=protected-access
+    assert os.path.exists(fname)
+
+
+class EditSignal:
+    """A stand-in for the signals of PyFlow (`connect`, `disconnect`, `send`)"""
+
+    def __init__(self):
+        self.receivers = []
+
+    def connect(self, receiver):
+        """Adds a receiver"""
+        self.receivers.append(receiver)
+
+    def disconnect(self, receiver):
+        """Removes a receiver"""
+        self.receivers.remove(receiver)
+
+    def send(self, *args):
+        """Calls the receivers"""
+        for receiver in self.receivers:
+            receiver(*args)
+
+
+def test_export_on_edit(qapp, pycnv, testfolder, tmp_path):  # pylint: disable=unused-argument
+    """A burst of edits is exported once, after the debounce time"""
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'flow_001_branch_sequence.pygraph'))
+    fname = str(tmp_path / 'watched.py')
+    watch = ExportOnEdit(pycnv.app.graphManager.get(), collect_converters(), fname,
+                         lambda: "", debounce=0.05)
+    exported = []
+    loop = QEventLoop()
+    watch.exported.connect(lambda path, seconds: (exported.append(path), loop.quit()))
+    edited = EditSignal()
+    watch.start(edited)
+    for _ in range(5):
+        edited.send('state')
+    QTimer.singleShot(5000, loop.quit)
+    loop.exec_()
+    # nothing more is coming
+    QTimer.singleShot(200, loop.quit)
+    loop.exec_()
+    watch.stop()
+
+    assert exported == [fname]
+    assert edited.receivers == []
+    assert os.path.exists(fname)
+
+
+def test_toggle_watch_on_editor_history(qapp, pycnv, testfolder, tmp_path):  # pylint: disable=unused-argument
+    """The watch mode of the editor exports after the states pushed into
+    the editor history until it's toggled off"""
+    editor_history = pytest.importorskip("PyFlow.UI.EditorHistory")
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'flow_001_branch_sequence.pygraph'))
+    fname = str(tmp_path / 'watched.py')
+    assert PythonExporter.toggleWatch(pycnv.app, fname)
+    exported = []
+    loop = QEventLoop()
+    PythonExporter.watch.exported.connect(lambda path, seconds: (exported.append(path), loop.quit()))
+    # the first export right away
+    QTimer.singleShot(5000, loop.quit)
+    loop.exec_()
+    os.remove(fname)
+    editor_history.EditorHistory(pycnv.app).statePushed.send('state')
+    QTimer.singleShot(5000, loop.quit)
+    loop.exec_()
+    assert not PythonExporter.toggleWatch(pycnv.app, fname)
+
+    assert exported == [fname, fname]
+    assert os.path.exists(fname)
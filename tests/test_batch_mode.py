@@ -0,0 +1,48 @@
+"""Tests of the batch mode of the generated scripts"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.options import (  # pylint: disable=import-error,no-name-in-module
+    ExportOptions
+)
+
+
+@pytest.fixture
+def batch_script(pycnv, testfolder, tmp_path):
+    """Exports the batch test graph in batch mode"""
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'batch_001_inputs.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(),
+                    collect_converters(),
+                    options=ExportOptions(batch_mode=True))
+    fname = str(tmp_path / 'batch.py')
+    job.save(fname, "")
+    return fname
+
+
+def _run(args, stdin=''):
+    result = subprocess.run([sys.executable]+args, input=stdin,
+                            capture_output=True, text=True, check=True)
+    return [json.loads(line) for line in result.stdout.splitlines()]
+
+
+def test_batch_jsonl_stdin(batch_script):
+    """Rows from stdin, missing inputs get the defaults of the graph"""
+    rows = '{"a": 2, "b": 3}\n{"a": 0.5}\n\n{"b": 10}\n'
+    assert _run([batch_script], rows) == [15, 5.0, 110.0]
+
+
+def test_batch_csv_pool(batch_script, tmp_path):
+    """CSV rows on a process pool keep the order of the input"""
+    fname_csv = tmp_path / 'rows.csv'
+    fname_out = tmp_path / 'results.jsonl'
+    fname_csv.write_text('a,b\n' + ''.join(f"{i},{i}\n" for i in range(20)), encoding='utf8')
+    _run([batch_script, str(fname_csv), '-o', str(fname_out), '-j', '2', '--chunksize', '3'])
+    results = [json.loads(line) for line in fname_out.read_text(encoding='utf8').splitlines()]
+    assert results == [(i+i)*i for i in range(20)]
@@ -0,0 +1,40 @@
+"""Tests of the byte code and zipapp bundles of the scripts"""
+import os
+import subprocess
+import sys
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.options import (  # pylint: disable=import-error,no-name-in-module
+    ExportOptions
+)
+from PyFlow.Packages.PythonExporter.Exporters.bundle import (  # pylint: disable=import-error,no-name-in-module
+    bundle_is_current
+)
+
+
+def _run(fname):
+    return subprocess.run([sys.executable, fname], capture_output=True, text=True, check=True)
+
+
+def test_bundles_run_like_the_script(pycnv, testfolder, tmp_path):
+    """The byte code and the zipapp run the script until it changes: then
+    they are stale and the zipapp runs the changed script"""
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'flow_002_function.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(),
+                    collect_converters(),
+                    options=ExportOptions(bundle='zipapp'))
+    fname = str(tmp_path / 'flow.py')
+    job.save(fname, "")
+    for bundle in ['flow.pyc', 'flow.pyz']:
+        assert bundle_is_current(fname, str(tmp_path / bundle))
+        assert _run(str(tmp_path / bundle)).stdout.split() == ['121.0']
+
+    with open(fname, 'a', encoding='utf8') as f:
+        f.write("print('changed')\n")
+    assert not bundle_is_current(fname, str(tmp_path / 'flow.pyc'))
+    assert not bundle_is_current(fname, str(tmp_path / 'flow.pyz'))
+    result = _run(str(tmp_path / 'flow.pyz'))
+    assert result.stdout.split() == ['121.0', 'changed']
+    assert result.stderr.startswith('stale bundle:')
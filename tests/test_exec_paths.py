@@ -0,0 +1,147 @@
+"""Tests of the exec flows reached from several places and of the compounds
+with several exec pins"""
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters, find_start_pins
+)
+from PyFlow.Packages.PythonExporter.Exporters.exec_paths import (  # pylint: disable=import-error,no-name-in-module
+    analyse_body, shared_chain_call
+)
+from PyFlow.Packages.PythonExporter.Exporters.graph_index import (  # pylint: disable=import-error,no-name-in-module
+    GraphIndex
+)
+from PyFlow.Packages.PythonExporter.Exporters.options import (  # pylint: disable=import-error,no-name-in-module
+    ExportOptions
+)
+from PyFlow.Packages.PythonExporter.benchmarks.synthetic import (  # pylint: disable=import-error,no-name-in-module
+    GraphData, console_output, make_int
+)
+
+OPTIONS = [ExportOptions(), ExportOptions(type_annotations=True),
+           ExportOptions(async_mode=True), ExportOptions(runtime_profile=True)]
+
+
+def _fan_in() -> str:
+    """Two pins of a sequence enter the same loop, the third pin prints the
+    last index of the loop"""
+    g = GraphData(seed='fan_in')
+    g.node('sequence', 'sequence', [('inExec', 'ExecPin', None)],
+           [(str(i), 'ExecPin', None) for i in (1, 2, 3)])
+    g.node('forLoop', 'forLoop', [('inExec', 'ExecPin', None), ('Start', 'IntPin', 0),
+                                  ('Stop', 'IntPin', 2), ('Step', 'IntPin', 1)],
+           [('LoopBody', 'ExecPin', None), ('Index', 'IntPin', 0), ('Completed', 'ExecPin', None)])
+    console_output(g, 'consoleOutput')
+    console_output(g, 'consoleOutput1')
+    g.link('sequence', '1', 'forLoop', 'inExec')
+    g.link('sequence', '2', 'forLoop', 'inExec')
+    g.link('forLoop', 'LoopBody', 'consoleOutput', 'inExec')
+    g.link('forLoop', 'Index', 'consoleOutput', 'entity')
+    g.link('sequence', '3', 'consoleOutput1', 'inExec')
+    g.link('forLoop', 'Index', 'consoleOutput1', 'entity')
+    return g.to_json()
+
+
+def _exits() -> str:
+    """A compound with two input and two output exec pins, the flows of
+    both outputs join again"""
+    g = GraphData(seed='exits')
+    g.node('sequence', 'sequence', [('inExec', 'ExecPin', None)],
+           [(str(i), 'ExecPin', None) for i in (1, 2)])
+    make_int(g, 'makeInt', 5)
+    inner = g.compound('choose', [('in1', 'ExecPin', None), ('in2', 'ExecPin', None), ('value', 'IntPin', 0)],
+                       [('big', 'ExecPin', None), ('small', 'ExecPin', None), ('result', 'IntPin', 0)])
+    inner.link('graphInputs', 'in1', 'graphOutputs', 'big')
+    inner.link('graphInputs', 'in2', 'graphOutputs', 'small')
+    inner.link('graphInputs', 'value', 'graphOutputs', 'result')
+    console_output(g, 'consoleOutput', 'big')
+    console_output(g, 'consoleOutput1', 'small')
+    console_output(g, 'consoleOutput2')
+    g.link('sequence', '1', 'choose', 'in1')
+    g.link('sequence', '2', 'choose', 'in2')
+    g.link('makeInt', 'out', 'choose', 'value')
+    g.link('choose', 'big', 'consoleOutput', 'inExec')
+    g.link('choose', 'small', 'consoleOutput1', 'inExec')
+    g.link('consoleOutput', 'outExec', 'consoleOutput2', 'inExec')
+    g.link('consoleOutput1', 'outExec', 'consoleOutput2', 'inExec')
+    g.link('choose', 'result', 'consoleOutput2', 'entity')
+    return g.to_json()
+
+
+def _export(pyflowapp, tmp_path, graph: str, options: ExportOptions):
+    graph_manager = pyflowapp.graphManager.get()
+    graph_manager.deserialize(graph)
+    job = ExportJob(graph_manager.findRootGraph(), collect_converters(), options=options)
+    fname = str(tmp_path / 'script.py')
+    job.save(fname, "")
+    with open(fname, 'r', encoding='utf8') as f:
+        script = f.read()
+    result = subprocess.run([sys.executable, fname], capture_output=True, text=True, check=True)
+    return script, result.stdout.split()
+
+
+@pytest.mark.parametrize('options', OPTIONS)
+def test_fan_in_is_converted_once(pyflowapp, tmp_path, options):
+    """The loop entered from two pins is a local function called twice,
+    its index is still read after the calls"""
+    script, output = _export(pyflowapp, tmp_path, _fan_in(), options)
+    assert output == ['0', '1', '0', '1', '1']
+    assert script.count('def forLoop_inExec(') == 1
+    assert script.count('forLoop_inExec()\n') == 2
+    assert re.search(r'(global|nonlocal) forLoop_Index', script)
+
+
+@pytest.mark.parametrize('options', OPTIONS)
+def test_compound_entries_and_exits(pyflowapp, tmp_path, options):
+    """The compound runs the flow of the entry given by the caller and the
+    flow after the call goes on from the exit it returns"""
+    script, output = _export(pyflowapp, tmp_path, _exits(), options)
+    assert output == ['big', '5', 'small', '5']
+    assert "choose(makeInt_out, 'in1')" in script
+    assert "choose(makeInt_out, 'in2')" in script
+    assert "if choose_exit == 'big':" in script
+    assert script.count('def consoleOutput2_inExec(') == 1
+
+
+def test_unconnected_entries_are_start_pins(pyflowapp, tmp_path):
+    """Each unconnected input exec pin entering a node is a start pin, not
+    only the first one"""
+    g = GraphData(seed='entries')
+    inner = g.compound('twice', [('in1', 'ExecPin', None), ('in2', 'ExecPin', None)], [])
+    console_output(inner, 'consoleOutput', 'one')
+    console_output(inner, 'consoleOutput1', 'two')
+    inner.link('graphInputs', 'in1', 'consoleOutput', 'inExec')
+    inner.link('graphInputs', 'in2', 'consoleOutput1', 'inExec')
+    graph_manager = pyflowapp.graphManager.get()
+    graph_manager.deserialize(g.to_json())
+    starts = find_start_pins(graph_manager.findRootGraph(), collect_converters())
+    assert [pin.getFullName() for pin in starts] == ['twice_in1', 'twice_in2']
+
+    script, output = _export(pyflowapp, tmp_path, g.to_json(), ExportOptions())
+    assert output == ['one', 'two']
+    assert "twice('in1')" in script and "twice('in2')" in script
+
+
+def test_break_pin_is_no_start_pin(pycnv, testfolder):
+    """The Break pin of a loop acts on the running loop (it has an
+    `execin_` converter), it doesn't start the export"""
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'flow_003_loops.pygraph'))
+    root_graph = pycnv.app.graphManager.get().findRootGraph()
+    loop = root_graph.findNode('forLoopWithBreak')
+    assert [pin.name for pin in GraphIndex(root_graph).entry_pins(loop)] == ['inExec', 'Break']
+    assert [pin.name for pin in GraphIndex(root_graph, collect_converters()).entry_pins(loop)] == ['inExec']
+
+
+def test_analyse_body():
+    """The names written into the scope, the awaits and the returns"""
+    info = analyse_body("    a = 1\n    _t = 2\n    if a:\n        return await f(lambda b: b)\n")
+    assert info.assigned == ['a'] and info.awaits
+    assert not info.returns and info.returns_on_some_paths
+    assert shared_chain_call('g', info) == \
+        "if (g_result := await g()) is not None:\n    return g_result"
+    assert shared_chain_call('g', analyse_body("x = 1\nreturn x")) == "return g()"
@@ -0,0 +1,38 @@
+"""Tests of the index of the graphs built for their export"""
+import os
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.graph_index import (  # pylint: disable=import-error,no-name-in-module
+    GraphIndex
+)
+
+
+def test_index_of_the_graph_and_its_compounds(pycnv, testfolder):
+    """The index holds the links, the start pins and the graphInputs and
+    graphOutputs nodes, each graph is indexed once per export"""
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'compound_001_simple.pygraph'))
+    root_graph = pycnv.app.graphManager.get().findRootGraph()
+    index = GraphIndex(root_graph)
+    compound = root_graph.findNode('compound')
+    console = root_graph.findNode('consoleOutput3')
+
+    assert [pin.getFullName() for pin in index.start_pins] == ['compound_in']
+    assert index.node_class(compound) == 'compound'
+    assert index.nodes[index.node_id(console)] is console
+    assert [pin.name for pin in index.exec_inputs(console)] == ['inExec']
+    entity = index.input_pin(console, 'entity')
+    assert index.sources(entity) == tuple(entity.affected_by)
+    assert index.owner(index.sources(entity)[0]) is root_graph.findNode('makeString')
+    assert index.is_connected(entity) and not index.is_exec(entity)
+    assert index.output_pin(console, 'entity') is None
+
+    inner_index = GraphIndex(compound.rawGraph)
+    assert [node.__class__.__name__ for node in inner_index.graph_inputs] == ['graphInputs']
+    assert [node.__class__.__name__ for node in inner_index.graph_outputs] == ['graphOutputs']
+
+    job = ExportJob(root_graph, collect_converters())
+    exporter = job.run()
+    assert set(exporter.graph_indexes) == {id(root_graph), id(compound.rawGraph)}
+    assert exporter.graph_index is exporter.index_of(root_graph)
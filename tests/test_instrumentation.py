@@ -0,0 +1,39 @@
+"""Tests of the exporter instrumentation"""
+import os
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.options import (  # pylint: disable=import-error,no-name-in-module
+    ExportOptions
+)
+
+
+def test_profile_export(pycnv, testfolder, tmp_path):
+    """The profile has all the categories and is written next to the script"""
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'flow_002_function.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(),
+                    collect_converters(),
+                    options=ExportOptions(profile_export=True))
+    job.run()
+    fname = str(tmp_path / 'script.py')
+    job.save(fname, "")
+
+    report = job.profiler.report()  # type: ignore
+    assert report['statements'] > 0
+    assert 'Function.to_python' in report['converter']
+    assert 'PyCnvMathAbstractLib.call_add' in report['converter']
+    assert report['node']['makeFloat']['calls'] == 3
+    assert set(report['subexporter']) == {'add_one', 'square'}
+    assert 'consoleOutput_inExec' in report['start pin']
+    assert report['assembly']['write_script']['calls'] == 1
+    assert os.path.exists(fname+'.profile.txt')
+
+
+def test_profile_export_off(pycnv, testfolder):
+    """Without the option there is no profiler at all"""
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'flow_002_function.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(), collect_converters())
+    exporter = job.run()
+    assert job.profiler is None
+    assert exporter.profiler is None
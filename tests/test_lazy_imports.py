@@ -0,0 +1,50 @@
+"""Tests of the lazy imports of the generated scripts"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.options import (  # pylint: disable=import-error,no-name-in-module
+    ExportOptions
+)
+
+
+def _export(pycnv, testfolder, tmp_path, test_name, options):
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', test_name+'.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(),
+                    collect_converters(),
+                    options=options)
+    fname = str(tmp_path / (test_name+'.py'))
+    job.save(fname, "")
+    with open(fname, 'r', encoding='utf8') as f:
+        script = f.read()
+    return fname, script
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_branch_not_taken_skips_its_imports(pycnv, testfolder, tmp_path, lazy):
+    """NumPy is imported for the branch which is not taken only if the
+    imports are eager"""
+    pytest.importorskip('numpy')
+    fname, script = _export(pycnv, testfolder, tmp_path, 'lazy_001_branch',
+                            ExportOptions(numpy_arrays=True, lazy_imports=lazy))
+    assert ("np = _lazy_import('numpy', bind_top_level=False)" in script) == lazy
+    result = subprocess.run([sys.executable, '-X', 'importtime', fname],
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['skipped']
+    imported = {line.rsplit('|', 1)[-1].strip() for line in result.stderr.splitlines()}
+    assert ('numpy' in imported) != lazy
+
+
+def test_lazy_modules_load_on_use(pycnv, testfolder, tmp_path):
+    """The modules used by the run are loaded when they are accessed"""
+    fname, script = _export(pycnv, testfolder, tmp_path, 'general_001_general',
+                            ExportOptions(lazy_imports=True))
+    assert "platform = _lazy_import('platform')" in script
+    result = subprocess.run([sys.executable, fname], capture_output=True, text=True, check=True)
+    # (the output starts with the escape codes of clearing the console)
+    assert result.stdout.endswith('hello from converted world!\nTrue\n')
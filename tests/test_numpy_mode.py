@@ -0,0 +1,55 @@
+"""Tests of the vectorised NumPy output mode"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.options import (  # pylint: disable=import-error,no-name-in-module
+    ExportOptions
+)
+
+
+def _export_and_run(pycnv, testfolder, tmp_path, test_name, options):
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', test_name+'.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(),
+                    collect_converters(),
+                    options=options)
+    fname = str(tmp_path / (test_name+'.py'))
+    job.save(fname, "")
+    with open(fname, 'r', encoding='utf8') as f:
+        script = f.read()
+    result = subprocess.run([sys.executable, fname], capture_output=True, text=True, check=True)
+    return script, result.stdout.splitlines()
+
+
+@pytest.mark.parametrize('test_name, output', [
+    ('numpy_001_vectorised', ['4.0', '6.0', '7.0']),
+    ('numpy_002_scalar_loop', ['3.0', '5.0', '7.0', '10.0']),
+])
+def test_numpy_mode_matches_default_mode(pycnv, testfolder, tmp_path, test_name, output):
+    """The same graph prints the same in both modes, the elementwise math
+    of the loop body is computed on the whole array before the loop"""
+    pytest.importorskip('numpy')
+    script, vectorised = _export_and_run(pycnv, testfolder, tmp_path, test_name,
+                                         ExportOptions(numpy_arrays=True))
+    default_script, scalar = _export_and_run(pycnv, testfolder, tmp_path, test_name,
+                                             ExportOptions())
+    assert vectorised == scalar == output
+    assert 'import numpy as np' in script and 'numpy' not in default_script
+    assert 'multiply_out_array = np.multiply(forEachLoop_element_array, 2.0)' in script
+    assert 'add_out_array = np.add(multiply_out_array, 1.0)' in script
+    assert 'add_out_array.tolist()' in script
+
+
+def test_numpy_mode_keeps_lists(pycnv, testfolder, tmp_path):
+    """The arrays stay lists (`+` concatenates them, `*` repeats them),
+    only the math on their elements is vectorised"""
+    pytest.importorskip('numpy')
+    script, _ = _export_and_run(pycnv, testfolder, tmp_path, 'numpy_001_vectorised',
+                                ExportOptions(numpy_arrays=True))
+    assert 'makeArray_out, makeArray_result = [' in script
+    assert 'np.add(makeArray' not in script
@@ -0,0 +1,99 @@
+"""Tests of the parallel Sequence branches"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.options import (  # pylint: disable=import-error,no-name-in-module
+    ExportOptions
+)
+from PyFlow.Packages.PythonExporter.benchmarks.synthetic import (  # pylint: disable=import-error,no-name-in-module
+    GraphData, console_output
+)
+
+
+def _export(pycnv, testfolder, tmp_path, test_name):
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', test_name+'.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(),
+                    collect_converters(),
+                    options=ExportOptions(parallel_sequences=True))
+    fname = str(tmp_path / (test_name+'.py'))
+    job.save(fname, "")
+    with open(fname, 'r', encoding='utf8') as f:
+        script = f.read()
+    result = subprocess.run([sys.executable, fname], capture_output=True, text=True, check=True)
+    return job, script, result.stdout.splitlines()
+
+
+def test_independent_branches(pycnv, testfolder, tmp_path):
+    """Independent branches run on a thread pool, the shared pure input is
+    computed before them"""
+    job, script, output = _export(pycnv, testfolder, tmp_path, 'parallel_001_independent')
+    assert job.diagnostics == []
+    assert 'ThreadPoolExecutor(max_workers=3)' in script
+    for branch in ['sequence_1', 'sequence_2', 'sequence_3']:
+        assert f"def {branch}():" in script
+        assert f"sequence_executor.submit({branch})" in script
+    assert script.index('makeInt_out = 10') < script.index('def sequence_1():')
+    assert sorted(output) == ['11', '20']
+
+
+def test_shared_state_is_diagnosed(pycnv, testfolder, tmp_path):
+    """Branches writing the same variable or using each other's outputs
+    stay sequential with the reasons reported"""
+    job, script, output = _export(pycnv, testfolder, tmp_path, 'parallel_002_shared')
+    assert 'concurrent' not in script
+    assert output == ['1']
+    assert any("both write variable 'x'" in diagnostic for diagnostic in job.diagnostics)
+    assert any("uses the outputs of node setVar" in diagnostic for diagnostic in job.diagnostics)
+    assert all(diagnostic.startswith('root|sequence: ') for diagnostic in job.diagnostics)
+
+
+def _branch_outputs_read_after() -> str:
+    """The first branch of a parallel Sequence runs a loop, the flow after
+    the Sequence prints the last index of the loop"""
+    g = GraphData(seed='branch_outputs')
+    for name in ('sequence', 'sequence1'):
+        g.node('sequence', name, [('inExec', 'ExecPin', None)],
+               [('1', 'ExecPin', None), ('2', 'ExecPin', None)])
+    g.node('forLoop', 'forLoop', [('inExec', 'ExecPin', None), ('Start', 'IntPin', 0),
+                                  ('Stop', 'IntPin', 2), ('Step', 'IntPin', 1)],
+           [('LoopBody', 'ExecPin', None), ('Index', 'IntPin', 0), ('Completed', 'ExecPin', None)])
+    console_output(g, 'consoleOutput')
+    console_output(g, 'consoleOutput1', 'x')
+    console_output(g, 'consoleOutput2')
+    g.link('sequence', '1', 'sequence1', 'inExec')
+    g.link('sequence1', '1', 'forLoop', 'inExec')
+    g.link('forLoop', 'LoopBody', 'consoleOutput', 'inExec')
+    g.link('forLoop', 'Index', 'consoleOutput', 'entity')
+    g.link('sequence1', '2', 'consoleOutput1', 'inExec')
+    g.link('sequence', '2', 'consoleOutput2', 'inExec')
+    g.link('forLoop', 'Index', 'consoleOutput2', 'entity')
+    return g.to_json()
+
+
+@pytest.mark.parametrize('options', [ExportOptions(parallel_sequences=True),
+                                     ExportOptions(parallel_sequences=True, async_mode=True),
+                                     ExportOptions(parallel_sequences=True, type_annotations=True)])
+def test_branch_outputs_are_read_after_the_join(pyflowapp, tmp_path, options):
+    """The values assigned in a branch function are declared global (or
+    nonlocal), so the flow after the branches reads them"""
+    graph_manager = pyflowapp.graphManager.get()
+    graph_manager.deserialize(_branch_outputs_read_after())
+    job = ExportJob(graph_manager.findRootGraph(), collect_converters(), options=options)
+    fname = str(tmp_path / 'script.py')
+    job.save(fname, "")
+    with open(fname, 'r', encoding='utf8') as f:
+        script = f.read()
+    result = subprocess.run([sys.executable, fname], capture_output=True, text=True, check=True)
+    output = result.stdout.split()
+
+    assert 'def sequence1_1()' in script
+    assert 'global forLoop_Index' in script or 'nonlocal forLoop_Index' in script
+    assert sorted(output[:-1]) == ['0', '1', 'x']
+    assert output[-1] == '1'
+
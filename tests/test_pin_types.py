@@ -0,0 +1,51 @@
+"""Tests of the type-specialised code and the embedded constants"""
+import os
+import subprocess
+import sys
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.options import (  # pylint: disable=import-error,no-name-in-module
+    ExportOptions
+)
+from PyFlow.Packages.PythonExporter.Exporters.pin_types import (  # pylint: disable=import-error,no-name-in-module
+    literal_expr
+)
+
+
+def test_literal_expr():
+    """Constants are embedded as literals if they have one"""
+    assert literal_expr([1, 'a', (2.5,), None]) == "[1, 'a', (2.5,), None]"
+    assert literal_expr({'k': [True], 1: {}}) == "{'k': [True], 1: {}}"
+    assert literal_expr(float('inf')) == "float('inf')"
+    assert literal_expr([object()]) is None
+
+
+def _export(pycnv, testfolder, tmp_path, options):
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'typed_001_fast_paths.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(),
+                    collect_converters(),
+                    options=options)
+    fname = str(tmp_path / 'typed.py')
+    job.save(fname, "")
+    with open(fname, 'r', encoding='utf8') as f:
+        script = f.read()
+    result = subprocess.run([sys.executable, fname], capture_output=True, text=True, check=True)
+    return script, result.stdout.splitlines()
+
+
+def test_typed_code(pycnv, testfolder, tmp_path):
+    """Strings are not converted, integers are raised to integer powers and
+    the list/dict constants are embedded; the generic code gives the same"""
+    script, output = _export(pycnv, testfolder, tmp_path, ExportOptions())
+    assert "concat_out = makeString_out + makeString1_out" in script
+    assert "concat1_out = str(makeInt1_out) + '!'" in script
+    assert "power_out, power_result = (makeInt_out ** 4), True" in script
+    assert "print([1, 'two', [3.5]])" in script
+    assert output == ['abcdef', '81', '5!', "[1, 'two', [3.5]]", "{'a': 1, 'b': [True, None]}"]
+    generic_script, generic_output = _export(pycnv, testfolder, tmp_path,
+                                             ExportOptions(generic_code=True))
+    assert "concat_out = str(makeString_out) + str(makeString1_out)" in generic_script
+    assert "math.pow(makeInt_out, 4)" in generic_script
+    assert generic_output == ['abcdef', '81.0'] + output[2:]
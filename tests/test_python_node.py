@@ -0,0 +1,62 @@
+"""Tests of the python nodes: the cache of their compiled code and their
+shared functions"""
+import subprocess
+import sys
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.code_cache import (  # pylint: disable=import-error,no-name-in-module
+    PYTHON_NODE_CODE, CompiledCodeCache
+)
+from PyFlow.Packages.PythonExporter.benchmarks.synthetic import (  # pylint: disable=import-error,no-name-in-module
+    PYTHON_NODE_CODE as ADD_ONE_CODE, python_nodes
+)
+
+
+def _export(pyflowapp, tmp_path, data):
+    graph_manager = pyflowapp.graphManager.get()
+    graph_manager.deserialize(data)
+    job = ExportJob(graph_manager.findRootGraph(), collect_converters())
+    fname = str(tmp_path / 'python_nodes.py')
+    job.save(fname, "")
+    with open(fname, 'r', encoding='utf8') as f:
+        script = f.read()
+    result = subprocess.run([sys.executable, fname], capture_output=True, text=True, check=True)
+    return script, result.stdout.split()
+
+
+def test_same_code_compiled_once_and_shared(pyflowapp, tmp_path):
+    """The nodes with the same code are compiled once (also across the
+    exports) and call one function"""
+    PYTHON_NODE_CODE.clear()
+    script, output = _export(pyflowapp, tmp_path, python_nodes(3))
+    _export(pyflowapp, tmp_path, python_nodes(3))
+    assert (PYTHON_NODE_CODE.misses, PYTHON_NODE_CODE.hits) == (1, 5)
+    assert script.count('def pythonNode') == 1
+    assert 'pythonNode2_out = pythonNode0(pythonNode1_out)' in script
+    assert output == ['3']
+
+
+def test_different_body_gets_its_function(pyflowapp, tmp_path):
+    """A node generating another body has its own function"""
+    data = python_nodes(3)
+    data['nodes'][2]['nodeData'] = ADD_ONE_CODE.replace("'    return a + 1'", "'    return a + 10'")
+    script, output = _export(pyflowapp, tmp_path, data)
+    assert script.count('def pythonNode') == 2
+    assert 'pythonNode1_out = pythonNode1(pythonNode0_out)' in script
+    assert 'pythonNode2_out = pythonNode0(pythonNode1_out)' in script
+    assert output == ['12']
+
+
+def test_least_recently_used_code_is_evicted():
+    """The cache keeps the `maxsize` most recently used namespaces"""
+    cache = CompiledCodeCache(maxsize=2)
+    first = cache.namespace('x = 1')
+    cache.namespace('x = 2')
+    assert cache.namespace('x = 1') is first
+    cache.namespace('x = 3')
+    assert len(cache) == 2
+    assert cache.namespace('x = 1') is first
+    cache.namespace('x = 2')
+    assert (cache.misses, cache.hits) == (4, 2)
@@ -0,0 +1,36 @@
+"""Tests of the runtime benchmark of the generated scripts"""
+import pytest
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    collect_converters
+)
+from PyFlow.Packages.PythonExporter.benchmarks.bench_runtime import (  # pylint: disable=import-error,no-name-in-module
+    Case, graph_cases, measure
+)
+
+
+@pytest.fixture
+def cases(pyflow_packages):  # pylint: disable=unused-argument
+    """The cases of the test graphs by their names"""
+    return {case.name: case for case in graph_cases()}
+
+
+def test_script_runs_are_measured(cases, tmp_path):
+    """The first run is the startup, the others are the steady state"""
+    result = measure(cases['batch_001_inputs'], collect_converters(), str(tmp_path),
+                     runs=3, processes=2, timeout=60)
+    assert result['name'] == 'batch_001_inputs'
+    assert 0 < result['steady_seconds'] < result['startup_seconds']
+    assert result['peak_rss_kb'] > 0
+    # one line per input row, sorted
+    assert result['output'] == ['110.0', '15', '5.0']
+
+
+def test_failing_script_is_a_result(cases, tmp_path):
+    """A script failing (here reading a missing file) gets
+    the last line of its error"""
+    case = cases['stream_002_chunks']
+    result = measure(Case(case.name, case.data, case.options), collect_converters(),
+                     str(tmp_path), runs=1, processes=1, timeout=60)
+    assert result == {'name': 'stream_002_chunks',
+                      'error': "FileNotFoundError: [Errno 2] No such file or directory: 'small.txt'"}
@@ -0,0 +1,64 @@
+"""Tests of the runtime profiler built into the generated scripts"""
+import json
+import os
+import subprocess
+import sys
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.options import (  # pylint: disable=import-error,no-name-in-module
+    ExportOptions
+)
+
+
+def test_runtime_profile(pycnv, testfolder, tmp_path):
+    """The generated script dumps the per-node table at exit"""
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'flow_002_function.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(),
+                    collect_converters(),
+                    options=ExportOptions(runtime_profile=True))
+    fname = str(tmp_path / 'script.py')
+    fname_prof = str(tmp_path / 'profile.json')
+    job.save(fname, "")
+
+    result = subprocess.run([sys.executable, fname],
+                            env=dict(os.environ, PYFLOW_PROFILE_OUT=fname_prof),
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '121.0'
+
+    with open(fname_prof, 'r', encoding='utf8') as f:
+        table = json.load(f)
+    paths = list(table.keys())
+    for node_name in ['consoleOutput', 'Function', 'Function5', 'add', 'power', 'makeFloat']:
+        assert any(path.split('|')[-1] == node_name for path in paths), node_name
+    for stat in table.values():
+        assert stat['calls'] == 1
+        assert stat['total_ns'] >= 0
+
+
+def test_runtime_profile_async(pycnv, testfolder, tmp_path):
+    """The awaited statements of the async mode are measured too, each
+    coroutine in its own start time variable"""
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'async_001_start_pins.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(),
+                    collect_converters(),
+                    options=ExportOptions(runtime_profile=True, async_mode=True))
+    fname = str(tmp_path / 'script.py')
+    fname_prof = str(tmp_path / 'profile.json')
+    job.save(fname, "")
+    (tmp_path / 'a.txt').write_text('A', encoding='utf8')
+    (tmp_path / 'b.txt').write_text('B', encoding='utf8')
+    with open(fname, 'r', encoding='utf8') as f:
+        script = f.read()
+    assert "_prof_t0 = _prof_clock()\n        readAllText_out, readAllText_error = await " in script
+
+    result = subprocess.run([sys.executable, fname], cwd=tmp_path,
+                            env=dict(os.environ, PYFLOW_PROFILE_OUT=fname_prof),
+                            capture_output=True, text=True, check=True)
+    assert sorted(result.stdout.split()) == ['3', 'A', 'B']
+
+    with open(fname_prof, 'r', encoding='utf8') as f:
+        table = json.load(f)
+    names = [path.split('|')[-1] for path in table]
+    assert 'readAllText' in names and 'readAllText1' in names
@@ -0,0 +1,58 @@
+"""Tests of the streaming script writer"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from PyFlow.Packages.PythonExporter.Exporters.script_writer import (  # pylint: disable=import-error,no-name-in-module
+    atomic_open
+)
+
+
+def test_atomic_open_keeps_old_file(tmp_path):
+    """A failing write leaves the previous file (and no temporary file) behind"""
+    fname = tmp_path / 'script.py'
+    fname.write_text("old", encoding='utf8')
+    with pytest.raises(RuntimeError):
+        with atomic_open(str(fname)) as f:
+            f.write("partial")
+            raise RuntimeError("export failed")
+    assert fname.read_text(encoding='utf8') == "old"
+    assert os.listdir(tmp_path) == ['script.py']
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="POSIX permissions")
+def test_atomic_open_keeps_permissions(tmp_path):
+    """The replaced file keeps its mode (e.g. an executable script)"""
+    fname = tmp_path / 'script.py'
+    fname.write_text("old", encoding='utf8')
+    fname.chmod(0o750)
+    with atomic_open(str(fname)) as f:
+        f.write("new")
+    assert fname.read_text(encoding='utf8') == "new"
+    assert fname.stat().st_mode & 0o777 == 0o750
+
+
+def test_cli_does_not_import_qt():
+    """The command line interface and its script header work without Qt"""
+    code = ("import sys; "
+            "from PyFlow.Packages.PythonExporter.Exporters import cli; "
+            "from PyFlow.Packages.PythonExporter.Exporters.export_job import script_header; "
+            "assert 'EXPORTER_VERSION = ' in script_header(); "
+            "assert 'qtpy' not in sys.modules, 'qtpy imported'")
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_export_to_stdout(pycnv, testfolder, tmp_path, capsys):
+    """Exporting to '-' writes the same script to the standard output"""
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'compound_001_simple.pygraph'))
+    fname = tmp_path / 'script.py'
+    pycnv.exporter(pycnv.app, str(fname))
+    capsys.readouterr()
+    pycnv.exporter(pycnv.app, '-')
+    out = capsys.readouterr().out
+    expected = fname.read_text(encoding='utf8').splitlines()
+    result = out.splitlines()[:len(expected)]
+    # line 4 contains the date
+    assert result[:4] + result[5:] == expected[:4] + expected[5:]
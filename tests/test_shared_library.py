@@ -0,0 +1,66 @@
+"""Tests of the shared library of the exported scripts"""
+import os
+import subprocess
+import sys
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.options import (  # pylint: disable=import-error,no-name-in-module
+    ExportOptions
+)
+from PyFlow.Packages.PythonExporter.Exporters.source_map import (  # pylint: disable=import-error,no-name-in-module
+    cut_spans
+)
+
+
+def _export(pycnv, testfolder, tmp_path, name, **options):
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', name+'.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(),
+                    collect_converters(),
+                    options=ExportOptions(shared_library='flowlib', **options))
+    fname = str(tmp_path / (name+'.py'))
+    job.save(fname, "")
+    with open(fname, 'r', encoding='utf8') as f:
+        script = f.read()
+    result = subprocess.run([sys.executable, fname], capture_output=True, text=True, check=True,
+                            cwd=str(tmp_path))
+    return job, script, result.stdout.split()
+
+
+def test_scripts_import_the_shared_modules(pycnv, testfolder, tmp_path):
+    """The definitions move into the library (the variables bound by the
+    script), the scripts with the same definitions share their modules"""
+    job, script, output = _export(pycnv, testfolder, tmp_path, 'flow_003_loops')
+    assert 'def getVar' not in script and 'def setVar' not in script
+    assert len(job.shared_modules) == 2
+    for module in job.shared_modules:
+        assert f"{module}.VARS = VARS" in script
+    assert output[-2:] == ['3', 'done']
+
+    modules = sorted(os.listdir(tmp_path / 'flowlib'))
+    again, _, _ = _export(pycnv, testfolder, tmp_path, 'flow_003_loops')
+    assert again.shared_modules == job.shared_modules
+    assert sorted(os.listdir(tmp_path / 'flowlib')) == modules
+
+    _, script, output = _export(pycnv, testfolder, tmp_path, 'compound_002_copies')
+    assert 'def compound' not in script
+    assert output == ['20', '40', '30']
+
+
+def test_definitions_using_the_setups_stay(pycnv, testfolder, tmp_path):
+    """The compounds wrapped into the runtime profile use its setup: they
+    stay in the script"""
+    job, script, output = _export(pycnv, testfolder, tmp_path, 'compound_002_copies',
+                                  runtime_profile=True)
+    assert job.shared_modules == {}
+    assert 'def compound(' in script
+    assert output[:3] == ['20', '40', '30']
+
+
+def test_cut_spans():
+    """The origin of removed lines goes on after them"""
+    spans = [(0, 'a'), (2, 'b'), (3, 'c'), (6, 'd')]
+    assert cut_spans(spans, 2, 5) == [(0, 'a'), (2, 'c'), (3, 'd')]
+    assert cut_spans(spans, 0, 7) == [(0, 'd')]
+    assert cut_spans(None, 0, 1) == []
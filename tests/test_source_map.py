@@ -0,0 +1,59 @@
+"""Tests of the source map of the generated scripts"""
+import os
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.options import (  # pylint: disable=import-error,no-name-in-module
+    ExportOptions
+)
+from PyFlow.Packages.PythonExporter.Exporters.source_map import (  # pylint: disable=import-error,no-name-in-module
+    SourceMap, attribute_traceback
+)
+
+
+def _export(pycnv, testfolder, tmp_path, options):
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', 'flow_002_function.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(),
+                    collect_converters(),
+                    options=options)
+    fname = str(tmp_path / 'script.py')
+    job.save(fname, "")
+    with open(fname, 'r', encoding='utf8') as f:
+        return fname, f.read().splitlines()
+
+
+def test_source_map(pycnv, testfolder, tmp_path):
+    """The lines of the script are mapped to their nodes, even inside the
+    functions of compounds"""
+    fname, lines = _export(pycnv, testfolder, tmp_path, ExportOptions(source_map=True))
+    source_map = SourceMap.load(fname+'.map.json')
+    assert source_map.is_script(fname)
+
+    def line_of(text):
+        return next(index+1 for index, line in enumerate(lines) if line.strip() == text)
+
+    def origin_of(text):
+        return source_map.lookup(line_of(text))
+
+    origin = origin_of('add_out = (num + makeFloat1_out)')
+    assert origin is not None
+    assert origin.node_path.split('|')[-1] == 'add'
+    assert origin.converter.endswith('call_add')
+    assert origin_of('def add_one(num):').node_path.split('|')[-1] == 'Function'
+    assert origin_of('print(Function5_new_num)').node_path.split('|')[-1] == 'consoleOutput'
+
+    traceback_text = f'Traceback (most recent call last):\n' \
+                     f'  File "{fname}", line {line_of("print(Function5_new_num)")}, in main\n' \
+                     f'ValueError: boom'
+    attributed = attribute_traceback(traceback_text, source_map).splitlines()
+    assert attributed[1].endswith('(PyCnvConsoleFunctions.consoleOutput)]')
+    assert '|consoleOutput' in attributed[1]
+    assert attributed[2] == 'ValueError: boom'
+
+
+def test_source_map_keeps_script(pycnv, testfolder, tmp_path):
+    """The source map doesn't change the script"""
+    _, lines_mapped = _export(pycnv, testfolder, tmp_path, ExportOptions(source_map=True))
+    _, lines = _export(pycnv, testfolder, tmp_path, ExportOptions())
+    assert lines_mapped == lines
@@ -0,0 +1,58 @@
+"""Tests of the concurrent start pins on thread and process pools"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.options import (  # pylint: disable=import-error,no-name-in-module
+    ExportOptions
+)
+
+
+def _export(pycnv, testfolder, tmp_path, test_name, pool):
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', test_name+'.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(),
+                    collect_converters(),
+                    options=ExportOptions(start_pin_pool=pool))
+    fname = str(tmp_path / (test_name+'.py'))
+    job.save(fname, "")
+    with open(fname, 'r', encoding='utf8') as f:
+        script = f.read()
+    return job, fname, script
+
+
+@pytest.mark.parametrize('pool, executor', [('thread', 'ThreadPoolExecutor'),
+                                            ('process', 'ProcessPoolExecutor')])
+def test_independent_start_pins_run_on_pool(pycnv, testfolder, tmp_path, pool, executor):
+    """Each section is a function submitted to the pool"""
+    job, fname, script = _export(pycnv, testfolder, tmp_path, 'pool_001_independent', pool)
+    (tmp_path / 'a.txt').write_text('A', encoding='utf8')
+    assert job.diagnostics == []
+    assert f"concurrent.futures.{executor}(max_workers=3)" in script
+    for section in ['setVar0_inExec', 'setVar1_inExec', 'readAllText_inExec']:
+        assert f"def {section}():" in script
+        assert f"start_pin_executor.submit({section})" in script
+    assert ("if __name__ == '__main__':" in script) == (pool == 'process')
+    result = subprocess.run([sys.executable, fname], cwd=tmp_path,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['45']
+
+
+def test_shared_file_and_console_are_diagnosed(pycnv, testfolder, tmp_path):
+    """Sections writing a file read by another one, or both printing, stay
+    sequential with the reasons reported"""
+    job, fname, script = _export(pycnv, testfolder, tmp_path, 'pool_002_shared', 'thread')
+    (tmp_path / 'data.txt').write_text('old', encoding='utf8')
+    assert 'concurrent' not in script
+    assert any("both access file 'data.txt' and one of them writes it" in diagnostic
+               for diagnostic in job.diagnostics)
+    assert any("readAllText_inExec, writeLines_inExec all write to the console" in diagnostic
+               for diagnostic in job.diagnostics)
+    result = subprocess.run([sys.executable, fname], cwd=tmp_path,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['old', 'written']
+    assert (tmp_path / 'data.txt').read_text(encoding='utf8') == 'x\n'
@@ -0,0 +1,78 @@
+"""Tests of the streaming file reading nodes and the string nodes mapped
+over their streams"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+
+# runs a script and reports its peak memory use (in kilobytes on Linux)
+MEASURED_RUN = "import resource, runpy, sys; " \
+               "runpy.run_path(sys.argv[1], run_name='__main__'); " \
+               "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, file=sys.stderr)"
+
+
+def _export(pycnv, testfolder, tmp_path, test_name, node_types=None):
+    fname_graph = os.path.join(testfolder, 'graphs', test_name+'.pygraph')
+    if node_types:
+        # the same graph with other (compatible) node types
+        with open(fname_graph, 'r', encoding='utf8') as f:
+            data = json.load(f)
+        for node in data['nodes']:
+            node['type'] = node_types.get(node['type'], node['type'])
+        fname_graph = str(tmp_path / (test_name+'.pygraph'))
+        with open(fname_graph, 'w', encoding='utf8') as f:
+            json.dump(data, f)
+    pycnv.graphLoader(fname_graph)
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(), collect_converters())
+    fname = str(tmp_path / (test_name+'.py'))
+    job.save(fname, "")
+    with open(fname, 'r', encoding='utf8') as f:
+        script = f.read()
+    return fname, script
+
+
+def _run(fname, cwd):
+    result = subprocess.run([sys.executable, '-c', MEASURED_RUN, fname], cwd=cwd,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.splitlines(), int(result.stderr.split()[-1])
+
+
+def test_read_whole_and_in_chunks(pycnv, testfolder, tmp_path):
+    """readAllText keeps the text as it is, the concat is mapped over the chunks"""
+    pytest.importorskip('resource')
+    (tmp_path / 'small.txt').write_text('line1\nline2', encoding='utf8')
+    fname, script = _export(pycnv, testfolder, tmp_path, 'stream_002_chunks')
+    assert 'f.read()' in script and 'readlines' not in script
+    assert "(str(item_0) + '|' for item_0 in readChunks_out)" in script
+    output, _ = _run(fname, tmp_path)
+    chunks = ['line', '1\nli', 'ne2']
+    assert output == ('line1\nline2\n' + ''.join(chunk+'|\n' for chunk in chunks)).splitlines()
+
+
+@pytest.mark.parametrize('stream_node', ['readLines', 'mmapLines'])
+def test_large_file_is_streamed(pycnv, testfolder, tmp_path, stream_node):
+    """The lines of a file much larger than the memory used by the script
+    are counted through a stream of startsWith results"""
+    pytest.importorskip('resource')
+    line_count = 1 << 20
+    with open(tmp_path / 'big.log', 'w', encoding='utf8') as f:
+        for i in range(line_count):
+            f.write(f"{'ERR ' if i%8==0 else 'INFO'} {i:010d} {'.'*40}\n")
+    file_kb = os.path.getsize(tmp_path / 'big.log') // 1024
+    fname, script = _export(pycnv, testfolder, tmp_path, 'stream_001_lines',
+                            {'readLines': stream_node})
+    assert f"readLines_out = {stream_node}('big.log', 'utf-8')" in script
+    assert "(item_0.startswith('ERR') for item_0 in readLines_out)" in script
+    (tmp_path / 'empty.py').write_text('', encoding='utf8')
+    _, baseline_kb = _run(str(tmp_path / 'empty.py'), tmp_path)
+    output, peak_kb = _run(fname, tmp_path)
+    assert output == [str(line_count//8)]
+    if stream_node == 'readLines':
+        # (the pages of a memory mapped file count as used while they are cached)
+        assert peak_kb - baseline_kb < file_kb // 8
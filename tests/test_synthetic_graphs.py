@@ -0,0 +1,72 @@
+"""Tests of the synthetic graphs of the export benchmark"""
+import subprocess
+import sys
+
+import pytest
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.benchmarks.synthetic import (  # pylint: disable=import-error,no-name-in-module
+    SHAPES
+)
+from PyFlow.Packages.PythonExporter.benchmarks.bench_export import (  # pylint: disable=import-error,no-name-in-module
+    compare
+)
+
+
+@pytest.mark.parametrize('shape, output', [
+    ('exec_chain', ['0', '1', '2']),
+    ('sequence_fanout', ['0', '1', '2']),
+    ('compound_nesting', ['2']),
+    ('function_references', ['3']),
+    ('compound_copies', ['3']),
+    ('python_nodes', ['3']),
+    ('data_dag', ['3']),
+])
+def test_synthetic_graph_runs(pyflowapp, tmp_path, shape, output):
+    """The generated graphs load, export and run"""
+    graph_manager = pyflowapp.graphManager.get()
+    graph_manager.deserialize(SHAPES[shape](3))
+    job = ExportJob(graph_manager.findRootGraph(), collect_converters())
+    fname = str(tmp_path / (shape+'.py'))
+    job.save(fname, "")
+    result = subprocess.run([sys.executable, fname], capture_output=True, text=True, check=True)
+    assert result.stdout.split() == output
+
+
+def test_long_exec_chain_exports(pyflowapp):
+    """The traversal recurses per node of an exec chain: a chain far longer
+    than the default recursion limit exports (and the limit is restored)"""
+    limit = sys.getrecursionlimit()
+    graph_manager = pyflowapp.graphManager.get()
+    graph_manager.deserialize(SHAPES['exec_chain'](2000))
+    job = ExportJob(graph_manager.findRootGraph(), collect_converters())
+    job.run()
+    assert job.render("").count('print(') == 2000
+    assert sys.getrecursionlimit() == limit
+
+
+def test_compare_with_baseline():
+    """The metrics growing beyond the threshold (and its slack) and the
+    new failures are regressions"""
+    baseline = [
+        {'name': 'a[1]', 'seconds': 0.1, 'peak_bytes': 1000000, 'output_bytes': 100},
+        {'name': 'b[1]', 'seconds': 0.1, 'peak_bytes': 1000000, 'output_bytes': 100},
+        {'name': 'c[1]', 'error': 'RecursionError'},
+    ]
+    results = [
+        {'name': 'a[1]', 'seconds': 0.12, 'peak_bytes': 1000000, 'output_bytes': 101},
+        {'name': 'b[1]', 'error': 'RecursionError'},
+        {'name': 'c[1]', 'seconds': 0.1, 'peak_bytes': 1000000, 'output_bytes': 100},
+    ]
+    assert compare([results[0], results[2]], baseline, 0.25) == []
+    results[0]['seconds'] = 0.2
+    regressions = compare(results, baseline, 0.0)
+    assert regressions[0].startswith('a[1]: seconds')
+    assert regressions[1] == 'a[1]: output_bytes 100 -> 101 (+1%)'
+    assert regressions[2] == 'b[1]: fails with RecursionError'
+    # a changed output of a script
+    assert compare([{'name': 'd[1]', 'output': ['None'], 'seconds': 0.1}],
+                   [{'name': 'd[1]', 'output': ['B'], 'seconds': 0.1}], 0.0, {'seconds': 0}) == \
+        ["d[1]: output ['B'] -> ['None']"]
@@ -0,0 +1,62 @@
+"""Tests of the type-annotated scripts (the mypyc target)"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from PyFlow.Packages.PythonExporter.Exporters.export_job import (  # pylint: disable=import-error,no-name-in-module
+    ExportJob, collect_converters
+)
+from PyFlow.Packages.PythonExporter.Exporters.options import (  # pylint: disable=import-error,no-name-in-module
+    ExportOptions
+)
+from tests import testhelper  # pylint: disable=import-error
+
+
+GOLDEN_NAMES = [f"{category}_{name}"
+                for category in ['flow', 'general', 'compound']
+                for name in testhelper.get_test_names(category)]
+
+
+def _export(pycnv, testfolder, fname, test_name, options):
+    pycnv.graphLoader(os.path.join(testfolder, 'graphs', test_name+'.pygraph'))
+    job = ExportJob(pycnv.app.graphManager.get().findRootGraph(),
+                    collect_converters(),
+                    options=options)
+    job.save(fname, "")
+    with open(fname, 'r', encoding='utf8') as f:
+        return job, f.read()
+
+
+def test_golden_graphs_type_check(pycnv, testfolder, tmp_path):
+    """The annotated scripts of the golden graphs pass `mypy --strict`"""
+    mypy_api = pytest.importorskip('mypy.api')
+    fnames = []
+    for test_name in GOLDEN_NAMES:
+        fnames.append(str(tmp_path / (test_name+'.py')))
+        _export(pycnv, testfolder, fnames[-1], test_name, ExportOptions(type_annotations=True))
+    stdout, stderr, status = mypy_api.run(['--strict', '--cache-dir', str(tmp_path / 'cache')]
+                                          + fnames)
+    assert status == 0, stdout + stderr
+
+
+@pytest.mark.parametrize('test_name', ['flow_002_function', 'flow_003_loops'])
+def test_annotated_script_runs_the_same(pycnv, testfolder, tmp_path, test_name):
+    """The functions are annotated, the outputs declared once and the main
+    program is a function printing the same as the plain script"""
+    fname = str(tmp_path / 'annotated.py')
+    _, script = _export(pycnv, testfolder, fname, test_name, ExportOptions(type_annotations=True))
+    plain_fname = str(tmp_path / 'plain.py')
+    _export(pycnv, testfolder, plain_fname, test_name, ExportOptions())
+    assert "def main() -> None:" in script
+    if test_name == 'flow_002_function':
+        assert "def add_one(num: float) -> float:" in script
+        assert "    Function_new_num: float\n" in script
+    else:
+        assert "def getVar(varname: str) -> Any:" in script
+        assert script.count("getVar_value: int\n") == 1
+    outputs = [subprocess.run([sys.executable, path], capture_output=True, text=True,
+                              check=True).stdout
+               for path in [fname, plain_fname]]
+    assert outputs[0] == outputs[1]
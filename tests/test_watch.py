@@ -0,0 +1,74 @@
+"""Tests of the watch mode of the command line interface"""
+import os
+
+from PyFlow.Packages.PythonExporter.Exporters.watch import (  # pylint: disable=import-error,no-name-in-module
+    GraphWatcher
+)
+
+
+def _touch(path, content):
+    with open(path, 'w', encoding='utf8') as f:
+        f.write(content)
+    # a new modification time even on coarse file systems
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_changed_graphs_exported_after_the_burst(tmp_path):
+    """Only the changed graph is exported, once its edits stopped for the
+    debounce time"""
+    graphs = [str(tmp_path / 'a.pygraph'), str(tmp_path / 'b.pygraph')]
+    for fname in graphs:
+        _touch(fname, '{}')
+    exported = []
+    watcher = GraphWatcher(exported.append, graphs, debounce=1.0)
+    assert watcher.poll(0.0) == []
+
+    _touch(graphs[0], '{"a": 1}')
+    assert watcher.poll(1.0) == []
+    _touch(graphs[0], '{"a": 2}')
+    assert watcher.poll(1.5) == []
+    assert watcher.poll(2.0) == []
+    assert watcher.poll(2.5) == [graphs[0]]
+    assert watcher.poll(10.0) == []
+    assert exported == [graphs[0]]
+
+
+def test_failed_export_waits_for_the_next_change(tmp_path):
+    """A graph which fails to export (e.g. saved half-way) is exported
+    again after its next change"""
+    fname = str(tmp_path / 'a.pygraph')
+    _touch(fname, '{}')
+    failures = []
+
+    def export(path):
+        with open(path, 'r', encoding='utf8') as f:
+            if f.read() == 'broken':
+                raise ValueError('broken graph')
+
+    watcher = GraphWatcher(export, [fname], debounce=0.0,
+                           on_failed=lambda path, e: failures.append(str(e)))
+    _touch(fname, 'broken')
+    assert watcher.poll(0.0) == []
+    assert watcher.poll(1.0) == []
+    assert watcher.poll(2.0) == []
+    assert failures == ['broken graph']
+    _touch(fname, '{}')
+    watcher.poll(3.0)
+    assert watcher.poll(4.0) == [fname]
+
+
+def test_export_all_reports_the_failures(tmp_path):
+    """The first export of the watch doesn't stop at a failing graph"""
+    graphs = [str(tmp_path / 'a.pygraph'), str(tmp_path / 'b.pygraph')]
+    for fname in graphs:
+        _touch(fname, '{}')
+    failures = []
+
+    def export(path):
+        if path == graphs[0]:
+            raise ValueError('half-saved')
+
+    watcher = GraphWatcher(export, graphs, on_failed=lambda path, e: failures.append(path))
+    assert watcher.export_all() == [graphs[1]]
+    assert failures == [graphs[0]]
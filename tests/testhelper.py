@@ -9,12 +9,13 @@ def get_test_names(category: str):
     return tnames
 
 
-def run_export_and_compare(pycnv, testfolder, test_name):
-    """Loads the graph, runs an export on it, compares the file to the
-    expected, prints the diff and asserts equality.
+def run_export_and_compare(pycnv, testfolder, test_name, result_folder):
+    """Loads the graph, runs an export on it into the result folder (a
+    temporary one of the test, so tests can run in parallel), compares the
+    file to the expected, prints the diff and asserts equality.
     """
     fname_graph = os.path.join(testfolder, 'graphs', test_name+'.pygraph')
-    fname_result = os.path.join(testfolder, 'results', test_name+'.py')
+    fname_result = os.path.join(result_folder, test_name+'.py')
     fname_expected = os.path.join(testfolder, 'expected', test_name+'.py')
 
     pycnv.graphLoader(fname_graph)